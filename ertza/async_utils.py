@@ -4,6 +4,10 @@ from inspect import isgenerator
 from threading import Lock
 
 
+def _iscoroutine(coro):
+    return isgenerator(coro) or isinstance(coro, LockedCoroutine)
+
+
 def coroutine(func):
     def wrapper(*args, **kwargs):
         generator = func(*args, **kwargs)
@@ -12,6 +16,24 @@ def coroutine(func):
     return wrapper
 
 
+class LockedCoroutine(object):
+    """
+    Serialize send() calls to a coroutine shared between threads.
+    """
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._lock = Lock()
+
+    def send(self, message):
+        with self._lock:
+            return self._coro.send(message)
+
+    def close(self):
+        with self._lock:
+            self._coro.close()
+
+
 class Channel(object):
     _Channels = {}
     _Lock = Lock()
@@ -28,7 +50,7 @@ class Channel(object):
             }
 
     def suscribe(self, coro):
-        if not isgenerator(coro):
+        if not _iscoroutine(coro):
             raise ValueError('Invalid coroutine specified')
 
         if id(coro) in self.coro_ids:
@@ -39,7 +61,7 @@ class Channel(object):
             self.coros[id(coro)] = coro
 
     def unsuscribe(self, coro):
-        if not isgenerator(coro):
+        if not _iscoroutine(coro):
             raise ValueError('Invalid coroutine specified')
 
         with self._Lock:
@@ -1,3 +1,4 @@
 from .abstract_commands import AbstractCommand, BufferedCommand, UnbufferedCommand, SyncedCommand
+from .abstract_commands import InlineCommand, SlowCommand, key_lane
 from .osc_command import OscCommand
 from .serial_command import SerialCommand
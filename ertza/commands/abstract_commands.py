@@ -3,7 +3,62 @@
 import operator
 
 
-class AbstractCommand(object):
+# Machine keys stopping the drive, executed before anything else
+SAFETY_KEYS = (
+    'command:stop',
+    'command:cancel',
+)
+
+# Machine keys disabling the drive when set to a false value, executed before
+# anything else. Enabling the drive is ordered with control commands.
+DISABLE_KEYS = (
+    'command:enable',
+)
+
+# Setpoints: only the last pending value of each key is executed. Other keys
+# are executed in order with setpoints.
+SETPOINT_KEYS = (
+    'jog',
+    'torque_ref',
+    'velocity_ref',
+    'position_ref',
+)
+
+
+def key_lane(key, value):
+    """
+    Return the processor lane for setting a machine key to value.
+    """
+
+    if key.startswith('machine:'):
+        key = key[8:]
+
+    if key in SAFETY_KEYS or (key in DISABLE_KEYS and not value):
+        return 'safety'
+    if key in SETPOINT_KEYS:
+        return 'setpoint'
+    return 'control'
+
+
+class CommandRegistry(type):
+    """
+    Register command classes by alias when they are defined.
+
+    Only classes setting alias to a string in their own body are registered,
+    abstract classes and mixins are left out without being instantiated.
+    """
+
+    Commands = {}
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+
+        alias = namespace.get('alias')
+        if isinstance(alias, str):
+            CommandRegistry.Commands[alias] = cls
+
+
+class AbstractCommand(object, metaclass=CommandRegistry):
     machine = None
 
     def __init__(self, outlet):
@@ -32,12 +87,33 @@ class AbstractCommand(object):
 
         return comp
 
+    def done_callback(self, c):
+        """
+        Return a callback for a background request (i.e. SaveRequest)
+        replying ok with its latency in seconds once done, or error.
+        """
+
+        def callback(request):
+            if request.error is not None:
+                self.error(c, str(request.error))
+            else:
+                self.ok(c, float(request.latency))
+
+        return callback
+
+    @classmethod
+    def registered(cls):
+        """
+        Return {alias: class} of the registered subclasses of this class.
+        """
+        return {a: c for a, c in CommandRegistry.Commands.items()
+                if issubclass(c, cls)}
+
     @property
     def alias(self):
         """
-        This should return an identifier for the processor.
-        i.e:
-            /path for OSC
+        Identifier of the command for the processor, i.e. /path for OSC.
+        Subclasses set it as a class attribute to be registered.
         """
         raise NotImplementedError
 
@@ -62,6 +138,28 @@ class AbstractCommand(object):
         """
         raise AttributeError
 
+    @property
+    def lane(self):
+        """
+        Processor lane executing the command:
+            inline: on the receiving thread, for short non-blocking commands
+            safety: high priority lane
+            sync: waits for the release time of synced commands
+            control: ordered lane for machine settings and sequencing
+            setpoint: control lane, only the latest pending value is kept
+            normal: default lane
+            buffered: bounded queue executed in order by a single worker
+            slow: configuration and I/O
+        """
+        return 'normal'
+
+    def lane_for(self, command):
+        """
+        Lane for a received command. Overrided by commands whose lane
+        depends on their arguments.
+        """
+        return self.lane
+
     def __repr__(self):
         if hasattr(self, 'args'):
             return '{0.alias} {0.args}'.format(self)
@@ -79,9 +177,33 @@ class BufferedCommand(AbstractCommand):
     def buffered(self):
         return True
 
+    @property
+    def lane(self):
+        return 'buffered'
+
+
+class InlineCommand(AbstractCommand):
+
+    @property
+    def lane(self):
+        return 'inline'
+
+
+class SlowCommand(AbstractCommand):
+
+    @property
+    def lane(self):
+        return 'slow'
+
 
 class SyncedCommand(AbstractCommand):
 
     @property
     def synced(self):
         return True
+
+    @property
+    def lane(self):
+        # Synced commands block until released: they are barriers in the
+        # control lane so nothing queued after them overtakes them
+        return 'control'
@@ -1,14 +1,6 @@
-import pkgutil
-import inspect
+from importlib import import_module
+from pkgutil import iter_modules
 
-__all__ = []
-
-for loader, name, is_pkg in pkgutil.walk_packages(__path__):
-    module = loader.find_module(name).load_module(name)
-
-    for name, value in inspect.getmembers(module):
-        if name.startswith('__'):
-            continue
-
-        globals()[name] = value
-        __all__.append(name)
+# Commands register themselves when their module is imported
+for loader, name, is_pkg in iter_modules(__path__):
+    import_module('{}.{}'.format(__name__, name))
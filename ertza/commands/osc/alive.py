@@ -3,12 +3,15 @@
 import logging
 
 from ertza.commands import UnbufferedCommand
+from ertza.commands import InlineCommand
 from ertza.commands import OscCommand
 
 logging = logging.getLogger('ertza.commands.osc')
 
 
-class AliveResp(OscCommand, UnbufferedCommand):
+class AliveResp(OscCommand, UnbufferedCommand, InlineCommand):
+    alias = '/alive'
+
     def execute(self, c):
         if not self.check_args(c, 'eq', 2, reply=False):
             logging.debug('Bad alive request received, ignoring.')
@@ -24,7 +27,3 @@ class AliveResp(OscCommand, UnbufferedCommand):
             return
 
         self.machine.alive_machines[new_sn] = new_ip
-
-    @property
-    def alias(self):
-        return '/alive'
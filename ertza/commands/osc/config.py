@@ -1,14 +1,17 @@
 # -*- coding: utf-8 -*-
 
 from ertza.commands import UnbufferedCommand
+from ertza.commands import SlowCommand
 from ertza.commands import OscCommand
 
 
-class ConfigProfileLoad(UnbufferedCommand, OscCommand):
+class ConfigProfileLoad(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Load existing profile found in _PROFILE_PATH (usually /etc/ertza/profiles)
     """
 
+    alias = '/config/profile/load'
+
     def execute(self, c):
         if not self.check_args(c, 'eq', 1):
             return
@@ -20,10 +23,6 @@ class ConfigProfileLoad(UnbufferedCommand, OscCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return '/config/profile/load'
-
     @property
     def help_text(self):
         return 'Load the specified PROFILE'
@@ -33,11 +32,13 @@ class ConfigProfileLoad(UnbufferedCommand, OscCommand):
         return 'PROFILE'
 
 
-class ConfigProfileUnload(UnbufferedCommand, OscCommand):
+class ConfigProfileUnload(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Unload loaded profile (if any)
     """
 
+    alias = '/config/profile/unload'
+
     def execute(self, c):
         try:
             self.machine.config.unload_profile()
@@ -45,20 +46,18 @@ class ConfigProfileUnload(UnbufferedCommand, OscCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return '/config/profile/unload'
-
     @property
     def help_text(self):
         return 'Unload the loaded profile (if any)'
 
 
-class ConfigProfileSet(UnbufferedCommand, OscCommand):
+class ConfigProfileSet(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Set value in profile (not in config)
     """
 
+    alias = '/config/profile/set'
+
     def execute(self, c):
         if not self.check_args(c, 'eq', 2):
             return
@@ -71,10 +70,6 @@ class ConfigProfileSet(UnbufferedCommand, OscCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return '/config/profile/set'
-
     @property
     def help_text(self):
         return 'Set the VALUE in SECTION:OPTION'
@@ -84,7 +79,7 @@ class ConfigProfileSet(UnbufferedCommand, OscCommand):
         return 'SECTION:OPTION VALUE'
 
 
-class ConfigProfileListOptions(UnbufferedCommand, OscCommand):
+class ConfigProfileListOptions(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Return a list of assignable options:
     /config/profile/list_options/reply SECTION:OPTION
@@ -92,6 +87,9 @@ class ConfigProfileListOptions(UnbufferedCommand, OscCommand):
     The command always send a ok reply at the end of the dump:
     /config/profile/list_options/ok done
     """
+
+    alias = '/config/profile/list_options'
+
     def execute(self, c):
 
         try:
@@ -107,19 +105,18 @@ class ConfigProfileListOptions(UnbufferedCommand, OscCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return '/config/profile/list_options'
-
     @property
     def help_text(self):
         return 'Return a list of options that can be saved into a profile'
 
 
-class ConfigProfileClearOption(UnbufferedCommand, OscCommand):
+class ConfigProfileClearOption(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Clear an assigned option:
     """
+
+    alias = '/config/profile/clear_option'
+
     def execute(self, c):
 
         if not self.check_args(c, 'eq', 1):
@@ -133,10 +130,6 @@ class ConfigProfileClearOption(UnbufferedCommand, OscCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return '/config/profile/clear_option'
-
     @property
     def help_text(self):
         return 'Clear an assigned option SECTION:OPTION'
@@ -146,7 +139,7 @@ class ConfigProfileClearOption(UnbufferedCommand, OscCommand):
         return 'SECTION:OPTION'
 
 
-class ConfigProfileList(UnbufferedCommand, OscCommand):
+class ConfigProfileList(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Return a list of available profils:
     /config/profile/list/reply PROFILE
@@ -154,6 +147,9 @@ class ConfigProfileList(UnbufferedCommand, OscCommand):
     The command always send a ok reply at the end of the dump:
     /config/profile/list/ok done
     """
+
+    alias = '/config/profile/list'
+
     def execute(self, c):
 
         try:
@@ -166,15 +162,39 @@ class ConfigProfileList(UnbufferedCommand, OscCommand):
             self.error(c, str(e))
 
     @property
-    def alias(self):
-        return '/config/profile/list'
+    def help_text(self):
+        return 'Return a list of available profiles'
+
+
+class ConfigProfilePreload(UnbufferedCommand, SlowCommand, OscCommand):
+    """
+    Parse profiles in advance, loading them is then immediate:
+    /config/profile/preload [PROFILE...]
+
+    All profiles are preloaded if none is given. The ok reply lists the
+    preloaded profiles:
+    /config/profile/preload/ok PROFILE...
+    """
+
+    alias = '/config/profile/preload'
+
+    def execute(self, c):
+        try:
+            profiles = self.machine.config.preload_profiles(list(c.args))
+            self.ok(c, *profiles)
+        except Exception as e:
+            self.error(c, str(e))
 
     @property
     def help_text(self):
-        return 'Return a list of available profiles'
+        return 'Preload the specified PROFILES (or all of them)'
+
+    @property
+    def args(self):
+        return '[PROFILE...]'
 
 
-class ConfigProfileDump(UnbufferedCommand, OscCommand):
+class ConfigProfileDump(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Dump profile content:
     /config/profile/dump/reply SECTION:OPTION VALUE\r\n
@@ -182,6 +202,9 @@ class ConfigProfileDump(UnbufferedCommand, OscCommand):
     The command always send a ok reply at the end of the dump:
     /config/profile/dump/ok done\r\n
     """
+
+    alias = '/config/profile/dump'
+
     def execute(self, c):
         if not self.check_args(c, 'le', 1):
             return
@@ -200,40 +223,34 @@ class ConfigProfileDump(UnbufferedCommand, OscCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return '/config/profile/dump'
-
     @property
     def help_text(self):
         return 'Dump actual profile values '
 
 
-class ConfigProfileSave(UnbufferedCommand, OscCommand):
+class ConfigProfileSave(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Save profile to a file in _PROFILE_PATH.
     If PROFILE is empty, overwrites the loaded profile
+
+    The file is written in the background, the ok reply is sent once it's
+    written with the time it took in seconds:
+    /config/profile/save/ok LATENCY
     """
 
+    alias = '/config/profile/save'
+
     def execute(self, c):
         if not self.check_args(c, 'le', 1):
             return
 
         try:
-            try:
-                profile = c.args[0]
-                self.machine.config.save_profile(profile)
-            except KeyError:
-                self.machine.config.save_profile()
-
-            self.ok(c)
+            profile = c.args[0] if c.args else None
+            self.machine.config.save_profile(profile,
+                                             callback=self.done_callback(c))
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return '/config/profile/save'
-
     @property
     def help_text(self):
         return 'Save the specified PROFILE (or the loaded one if unspecified)'
@@ -243,36 +260,39 @@ class ConfigProfileSave(UnbufferedCommand, OscCommand):
         return '[PROFILE]'
 
 
-class ConfigSave(UnbufferedCommand, OscCommand):
+class ConfigSave(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Save config to custom.conf including the loaded profile name
+
+    The file is written in the background, the ok reply is sent once it's
+    written with the time it took in seconds:
+    /config/save/ok LATENCY
     """
 
+    alias = '/config/save'
+
     def execute(self, c):
         if not self.check_args(c, 'eq', 0):
             return
 
         try:
-            self.machine.config.save()
-            self.ok(c)
+            self.machine.config.save(callback=self.done_callback(c))
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return '/config/save'
-
     @property
     def help_text(self):
         return 'Save the current config into the custom config file'
 
 
-class ConfigGet(UnbufferedCommand, OscCommand):
+class ConfigGet(UnbufferedCommand, SlowCommand, OscCommand):
     """
     Returns the value of SECTION:OPTION. This allow to verify the behaviour of the config.
     This behaviour can be changed by variant config or profile.
     """
 
+    alias = '/config/get'
+
     def execute(self, c):
         if not self.check_args(c, 'eq', 1):
             return
@@ -287,10 +307,6 @@ class ConfigGet(UnbufferedCommand, OscCommand):
         except Exception as e:
             self.error(c, k, str(e))
 
-    @property
-    def alias(self):
-        return '/config/get'
-
     @property
     def help_text(self):
         return 'Returns the value of SECTION:OPTION'
@@ -5,6 +5,7 @@ from ertza.commands import OscCommand
 
 
 class ListCommands(OscCommand, UnbufferedCommand):
+    alias = '/help/list'
 
     def execute(self, c):
         cmds = self.machine.processors['OSC'].available_commands
@@ -15,7 +16,3 @@ class ListCommands(OscCommand, UnbufferedCommand):
                 self.reply(c, repr(cmd))
 
         self.ok(c, 'done')
-
-    @property
-    def alias(self):
-        return '/help/list'
@@ -5,21 +5,15 @@ from ertza.commands import OscCommand
 
 
 class Identify(OscCommand, BufferedCommand):
+    alias = '/identify'
 
     def execute(self, c):
         self.ok(c, self.machine.serialnumber, self.machine.osc_address)
 
-    @property
-    def alias(self):
-        return '/identify'
-
 
 class Version(OscCommand, BufferedCommand):
+    alias = '/version'
 
     def execute(self, c):
         version = self.machine.version
         self.ok(c, version)
-
-    @property
-    def alias(self):
-        return '/version'
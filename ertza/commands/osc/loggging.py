@@ -1,47 +1,126 @@
 # -*- coding: utf-8 -*-
 
+import socket
 import logging
+from collections import deque
+from threading import Thread, Event
 
 from ertza.commands import UnbufferedCommand
 from ertza.commands import OscCommand
 
 from ertza.processors.osc import OscAddress
+from ertza.processors.osc.codec import encode_message, encode_bundle
 
 
 class OscLogHandler(logging.Handler):
+    """
+    Ship log records to target in OSC bundles of /log/entry messages.
 
-    def __init__(self, machine, target, port=None):
+    emit() formats and encodes the record, like QueueHandler.prepare(), and
+    appends the message to a ring buffer: records and their arguments are
+    not kept. Messages are sent by a background thread at most *rate* times
+    per second. When the buffer is full the oldest messages are dropped, the
+    number of dropped records is sent in a /log/dropped message.
+    """
+
+    # Keep bundles under the usual MTU
+    max_packet_size = 1400
+
+    def __init__(self, machine, target, port=None,
+                 buffer_size=1024, rate=10.):
         self.machine = machine
         self._target = OscAddress(hostname=target, port=port)
+        self.rate = rate
+
+        self._entries_buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self._reported_dropped = 0
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._running_event = Event()
+        self._thread = Thread(target=self._send_loop)
+        self._thread.daemon = True
 
         super().__init__()
+        self._thread.start()
 
     def emit(self, record):
         try:
-            self.send(self._target, '/log/entry', self.format(record),
-                      msg_type='log')
-        except Exception:   # This a log handler, we forgive everything
+            entry = encode_message('/log/entry', (self.format(record),))
+        except Exception:
+            self.handleError(record)
+            return
+
+        # Already held when called by handle()
+        with self.lock:
+            if len(self._entries_buffer) == self._entries_buffer.maxlen:
+                self.dropped += 1
+            self._entries_buffer.append(entry)
+
+    def _entries(self):
+        entries = []
+        with self.lock:
+            if self.dropped != self._reported_dropped:
+                self._reported_dropped = self.dropped
+                entries.append(encode_message('/log/dropped',
+                                              (self.dropped,)))
+
+            entries.extend(self._entries_buffer)
+            self._entries_buffer.clear()
+        return entries
+
+    def _send_loop(self):
+        address = (self._target.hostname, self._target.port)
+        while not self._running_event.wait(1. / self.rate):
+            batch, size = [], 16
+            for e in self._entries():
+                if batch and size + len(e) + 4 > self.max_packet_size:
+                    self._send(encode_bundle(batch), address)
+                    batch, size = [], 16
+                batch.append(e)
+                size += len(e) + 4
+
+            if batch:
+                self._send(encode_bundle(batch), address)
+
+    def _send(self, data, address):
+        try:
+            self._socket.sendto(data, address)
+        except OSError:
             pass
 
+    def close(self):
+        self._running_event.set()
+        self._thread.join()
+        self._socket.close()
+        super().close()
+
 
 class LogTo(OscCommand, UnbufferedCommand):
+    alias = '/log/to'
 
     def execute(self, c):
         if len(c.args) == 2:
             log_ip, log_port = c.args
         else:
             log_ip, log_port = c.args[0], None
-        self.machine.osc_loghandler = OscLogHandler(self.machine, log_ip, log_port)
         root_log = logging.getLogger()
+        old_handler = getattr(self.machine, 'osc_loghandler', None)
+        if old_handler is not None:
+            root_log.removeHandler(old_handler)
+            old_handler.close()
+
+        conf = self.machine.config
+        self.machine.osc_loghandler = OscLogHandler(
+            self.machine, log_ip, log_port,
+            buffer_size=conf.getint('osc', 'log_buffer_size', fallback=1024),
+            rate=conf.getfloat('osc', 'log_send_rate', fallback=10.))
         root_log.addHandler(self.machine.osc_loghandler)
         self.ok(c, 'Binding OSC log handler to %s:%s' % (log_ip, str(log_port)))
 
-    @property
-    def alias(self):
-        return '/log/to'
-
 
 class LogLevel(OscCommand, UnbufferedCommand):
+    alias = '/log/level'
 
     def execute(self, c):
         if not self.check_args(c, 'eq', 1):
@@ -56,24 +135,19 @@ class LogLevel(OscCommand, UnbufferedCommand):
         except Exception as e:
             self.error(c, 'Error while setting loglevel: {!r}'.format(e))
 
-    @property
-    def alias(self):
-        return '/log/level'
-
 
 class LogStop(OscCommand, UnbufferedCommand):
+    alias = '/log/stop'
 
     def execute(self, c):
         try:
             root_log = logging.getLogger()
             root_log.removeHandler(self.machine.osc_loghandler)
+            self.machine.osc_loghandler.close()
+            self.machine.osc_loghandler = None
             self.ok(c, 'Stopped log forwarding')
         except AttributeError:
             self.error(c, 'OSC log handler is not specified. '
                        'Run /log/to target prior to this command')
         except Exception as e:
             self.error(c, 'Error while setting loglevel: {!r}'.format(e))
-
-    @property
-    def alias(self):
-        return '/log/stop'
@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import time
+
 from ertza.commands import UnbufferedCommand
+from ertza.commands import SlowCommand
+from ertza.commands import SyncedCommand
+from ertza.commands import key_lane
 from ertza.commands import OscCommand
 
 
 class ListSlaves(OscCommand, UnbufferedCommand):
+    alias = '/machine/slaves'
 
     def execute(self, c):
         if not self.machine.slaves:
@@ -15,12 +21,52 @@ class ListSlaves(OscCommand, UnbufferedCommand):
 
         self.reply(c, *slaves)
 
+
+class SlavesState(OscCommand, UnbufferedCommand):
+    """
+    Return the mirrored telemetry of each slave (or only of slave SN):
+    /machine/slaves/state/reply SN KEY VALUE AGE KEY VALUE AGE ...
+
+    AGE is the time in seconds since the value was received.
+    The command always send a ok reply at the end of the dump:
+    /machine/slaves/state/ok done
+    """
+
+    alias = '/machine/slaves/state'
+
+    def execute(self, c):
+        if not self.check_args(c, 'le', 1):
+            return
+
+        mirror = self.machine.slaves_mirror
+        if mirror is None:
+            self.error(c, 'Slave telemetry mirror is not running')
+            return
+
+        try:
+            sn = c.args[0] if c.args else None
+            now = time.time()
+            for slave_sn, table in mirror.state(sn).items():
+                data = []
+                for key, (value, ts) in sorted(table.items()):
+                    data += [key, value, round(now - ts, 3)]
+                self.reply(c, slave_sn, *data, add_path='/reply')
+
+            self.ok(c, 'done')
+        except Exception as e:
+            self.error(c, str(e))
+
     @property
-    def alias(self):
-        return '/machine/slaves'
+    def help_text(self):
+        return 'Return the mirrored telemetry of slaves'
 
+    @property
+    def args(self):
+        return '[SN]'
 
-class AddSlave(OscCommand, UnbufferedCommand):
+
+class AddSlave(OscCommand, UnbufferedCommand, SlowCommand):
+    alias = '/machine/slave/add'
 
     def execute(self, c):
         if self.check_args(c, 'ne', 3):
@@ -34,12 +80,9 @@ class AddSlave(OscCommand, UnbufferedCommand):
         except Exception as e:
             self.error(c, e)
 
-    @property
-    def alias(self):
-        return '/machine/slave/add'
-
 
-class RemoveSlave(OscCommand, UnbufferedCommand):
+class RemoveSlave(OscCommand, UnbufferedCommand, SlowCommand):
+    alias = '/machine/slave/remove'
 
     def execute(self, c):
         if self.check_args(c, 'ne', 1):
@@ -52,12 +95,9 @@ class RemoveSlave(OscCommand, UnbufferedCommand):
         except Exception as e:
             self.error(c, e)
 
-    @property
-    def alias(self):
-        return '/machine/slave/remove'
-
 
 class SlaveMode(OscCommand, UnbufferedCommand):
+    alias = '/machine/slave/mode'
 
     def execute(self, c):
         if not self.check_args(c, 'eq', 1):
@@ -70,12 +110,9 @@ class SlaveMode(OscCommand, UnbufferedCommand):
         except Exception as e:
             self.error(c, e)
 
-    @property
-    def alias(self):
-        return '/machine/slave/mode'
-
 
 class MachineSet(OscCommand, UnbufferedCommand):
+    alias = '/machine/set'
 
     def execute(self, c):
         if len(c.args) < 2:
@@ -89,12 +126,106 @@ class MachineSet(OscCommand, UnbufferedCommand):
         except Exception as e:
             self.error(c, k, str(e))
 
+    def lane_for(self, c):
+        if len(c.args) < 2:
+            return 'normal'
+        return key_lane(str(c.args[0]), c.args[1])
+
+
+class MachineSubscribe(OscCommand, UnbufferedCommand):
+    """
+    Subscribe to machine keys, pushed at RATE Hz:
+    /machine/subscribe/reply KEY VALUE KEY VALUE ...
+
+    The reply gives the time to live of the subscription in seconds:
+    /machine/subscribe/ok TTL
+    Subscribing again before it expires renews the subscription. A sender
+    has only one subscription, subscribing to other keys replaces it.
+    """
+
+    alias = '/machine/subscribe'
+
+    def execute(self, c):
+        if not self.check_args(c, 'ge', 2):
+            return
+
+        subscriptions = self.machine.subscriptions
+        if subscriptions is None:
+            self.error(c, 'Subscriptions are not available')
+            return
+
+        try:
+            keys, rate = c.args[:-1], c.args[-1]
+            target = c.sender
+            subscriber = (target.hostname, target.port)
+
+            def push(values):
+                args = []
+                for k, v in values:
+                    args += [k, v]
+                self.send(target, self.alias + '/reply', *args)
+
+            ttl = subscriptions.subscribe(subscriber, keys, rate, push)
+            self.ok(c, ttl)
+        except Exception as e:
+            self.error(c, str(e))
+
     @property
-    def alias(self):
-        return '/machine/set'
+    def help_text(self):
+        return 'Receive machine keys at a fixed rate'
+
+    @property
+    def args(self):
+        return 'KEY [KEY ...] RATE'
+
+
+class MachineUnsubscribe(OscCommand, UnbufferedCommand):
+    alias = '/machine/unsubscribe'
+
+    def execute(self, c):
+        subscriptions = self.machine.subscriptions
+        if subscriptions is None:
+            self.error(c, 'Subscriptions are not available')
+            return
+
+        if subscriptions.unsubscribe((c.sender.hostname, c.sender.port)):
+            self.ok(c)
+        else:
+            self.error(c, 'No subscription')
+
+
+class MachineSyncSet(OscCommand, SyncedCommand):
+    """
+    Set keys on the machine and all its slaves at the same time:
+    /machine/sync/set KEY VALUE [KEY VALUE ...]
+
+    The reply gives the delay before the keys were set, in seconds:
+    /machine/sync/set/ok DELAY
+    """
+
+    alias = '/machine/sync/set'
+
+    def execute(self, c):
+        if not self.check_args(c, 'ge', 2):
+            return
+
+        try:
+            delay = self.machine.sync_set(*c.args)
+            self.ok(c, round(delay, 6))
+        except Exception as e:
+            self.error(c, str(e))
+
+    @property
+    def help_text(self):
+        return 'Set keys on the machine and its slaves at the same time'
+
+    @property
+    def args(self):
+        return 'KEY VALUE [KEY VALUE ...]'
 
 
 class MachineGet(OscCommand, UnbufferedCommand):
+    alias = '/machine/get'
 
     def execute(self, c):
         if not self.check_args(c, 'eq', 1):
@@ -107,6 +238,37 @@ class MachineGet(OscCommand, UnbufferedCommand):
         except Exception as e:
             self.error(c, k, str(e))
 
+
+class MachineGetMany(OscCommand, UnbufferedCommand):
+    """
+    Get several keys in one request:
+    /machine/get_many/ok KEY VALUE KEY VALUE ...
+
+    Keys that can't be read are reported before the ok reply:
+    /machine/get_many/error KEY REASON
+    """
+
+    alias = '/machine/get_many'
+
+    def execute(self, c):
+        if not self.check_args(c, 'ge', 1):
+            return
+
+        try:
+            data = []
+            for k, v in zip(c.args, self.machine.get_many(c.args)):
+                if isinstance(v, Exception):
+                    self.error(c, k, str(v))
+                else:
+                    data += [k, v]
+            self.ok(c, *data)
+        except Exception as e:
+            self.error(c, str(e))
+
+    @property
+    def help_text(self):
+        return 'Get several machine keys with one reply'
+
     @property
-    def alias(self):
-        return '/machine/get'
+    def args(self):
+        return 'KEY [KEY ...]'
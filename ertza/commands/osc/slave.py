@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import time
 import logging
 
 from ertza.commands import UnbufferedCommand
+from ertza.commands import InlineCommand
+from ertza.commands import key_lane
 from ertza.commands import OscCommand
 
 logging = logging.getLogger('ertza.commands.osc')
@@ -42,6 +45,8 @@ class SlaveGet(SlaveCommand, UnbufferedCommand):
     Received by a slave.
     """
 
+    alias = '/slave/get'
+
     def execute(self, c):
         uuid, *args = c.args
         if args[0] not in ('operating_mode', 'serialnumber') \
@@ -59,12 +64,9 @@ class SlaveGet(SlaveCommand, UnbufferedCommand):
             logging.error(repr(e))
             self.error(c, uuid, dst, repr(e))
 
-    @property
-    def alias(self):
-        return '/slave/get'
-
 
 class SlaveSet(SlaveCommand, UnbufferedCommand):
+    alias = '/slave/set'
 
     def execute(self, c):
         if not self.check_args(c, 'ge', 2) or \
@@ -98,12 +100,16 @@ class SlaveSet(SlaveCommand, UnbufferedCommand):
             args = values + [str(e),]
             self.error(c, uuid, key, *args)
 
-    @property
-    def alias(self):
-        return '/slave/set'
+    def lane_for(self, c):
+        # Replies are awaited by the master, setpoints can't be coalesced but
+        # are ordered with the other control commands and purged by safety
+        if len(c.args) > 2 and key_lane(str(c.args[1]), c.args[2]) == 'safety':
+            return 'safety'
+        return 'control'
 
 
 class SlaveRegister(SlaveCommand, UnbufferedCommand):
+    alias = '/slave/register'
 
     def execute(self, c):
         if not self.check_args(c, 'le', 1):
@@ -116,12 +122,9 @@ class SlaveRegister(SlaveCommand, UnbufferedCommand):
         except Exception as e:
             self.error(c, uuid, e)
 
-    @property
-    def alias(self):
-        return '/slave/register'
-
 
 class SlaveFree(SlaveCommand, UnbufferedCommand):
+    alias = '/slave/free'
 
     def execute(self, c):
         if not self.check_slave_mode(c, reply=False):
@@ -134,12 +137,65 @@ class SlaveFree(SlaveCommand, UnbufferedCommand):
         except Exception as e:
             self.error(c, uuid, e)
 
+
+class SlaveSyncArm(SlaveCommand, UnbufferedCommand, InlineCommand):
+    """
+    Received by a slave. Arm keys to be set on release of the sync TOKEN:
+    /slave/sync/arm UUID TOKEN KEY VALUE [KEY VALUE ...]
+    """
+
+    alias = '/slave/sync/arm'
+
+    def execute(self, c):
+        if not self.check_slave_mode(c):
+            return
+
+        if not self.check_args(c, 'ge', 3):
+            return
+
+        uuid, token, *args = c.args
+        if len(args) % 2:
+            self.error(c, uuid, token, 'Expected key value pairs')
+            return
+
+        pairs = list(zip(args[0::2], args[1::2]))
+        self.machine.sync_barrier.arm(token, self._set, pairs)
+        self.ok(c, uuid, token)
+
+    def _set(self, pairs):
+        for k, v in pairs:
+            self.machine.set(k, v, tick=True)
+
+
+class SlaveSyncRelease(SlaveCommand, UnbufferedCommand):
+    """
+    Received by a slave. Execute the sync TOKEN after DELAY seconds:
+    /slave/sync/release UUID TOKEN DELAY
+    """
+
+    alias = '/slave/sync/release'
+
+    def execute(self, c):
+        if not self.check_args(c, 'eq', 2):
+            return
+
+        uuid, token, delay = c.args
+        try:
+            at = time.monotonic() + float(delay)
+            self.machine.sync_barrier.release(token, at)
+            self.ok(c, uuid, token)
+        except Exception as e:
+            self.error(c, uuid, token, str(e))
+
     @property
-    def alias(self):
-        return '/slave/free'
+    def lane(self):
+        # Waits until the release time, on its own lane so that neither
+        # stops nor control commands are delayed or cancelled by the wait
+        return 'sync'
 
 
-class SlavePing(OscCommand, UnbufferedCommand):
+class SlavePing(OscCommand, UnbufferedCommand, InlineCommand):
+    alias = '/slave/ping'
 
     def execute(self, c):
         logging.info('Ping request from %s' % c.sender)
@@ -149,15 +205,11 @@ class SlavePing(OscCommand, UnbufferedCommand):
         else:
             self.ok(c)
 
-    @property
-    def alias(self):
-        return '/slave/ping'
-
 
 # -- Responses from slave --
 
 
-class SlaveResponse(OscCommand, UnbufferedCommand):
+class SlaveResponse(OscCommand, UnbufferedCommand, InlineCommand):
     def execute(self, c):
         sl = self.machine.get_slave(address=c.sender.hostname)
         if not sl:
@@ -169,36 +221,66 @@ class SlaveResponse(OscCommand, UnbufferedCommand):
 
 
 class SlaveRegisterResponse(SlaveResponse):
-    @property
-    def alias(self):
-        return '/slave/register/ok'
+    alias = '/slave/register/ok'
 
 
 class SlaveGetResponse(SlaveResponse):
-    @property
-    def alias(self):
-        return '/slave/get/ok'
+    alias = '/slave/get/ok'
 
 
 class SlaveGetError(SlaveResponse):
-    @property
-    def alias(self):
-        return '/slave/get/error'
+    alias = '/slave/get/error'
 
 
 class SlaveSetResponse(SlaveResponse):
-    @property
-    def alias(self):
-        return '/slave/set/ok'
+    alias = '/slave/set/ok'
 
 
 class SlaveSetError(SlaveResponse):
-    @property
-    def alias(self):
-        return '/slave/set/error'
+    alias = '/slave/set/error'
 
 
 class SlavePingResponse(SlaveResponse):
-    @property
-    def alias(self):
-        return '/slave/ping/ok'
+    alias = '/slave/ping/ok'
+
+
+class SlaveSyncArmResponse(SlaveResponse):
+    alias = '/slave/sync/arm/ok'
+
+
+class SlaveSyncArmError(SlaveResponse):
+    alias = '/slave/sync/arm/error'
+
+
+class SlaveSyncReleaseResponse(SlaveResponse):
+    alias = '/slave/sync/release/ok'
+
+
+class SlaveSyncReleaseError(SlaveResponse):
+    alias = '/slave/sync/release/error'
+
+
+class SlaveTelemetryPush(OscCommand, UnbufferedCommand, InlineCommand):
+    """
+    Pushed by a slave to update its mirrored telemetry:
+    /slave/telemetry KEY VALUE KEY VALUE ...
+    """
+
+    alias = '/slave/telemetry'
+
+    def execute(self, c):
+        mirror = self.machine.slaves_mirror
+        if mirror is None:
+            return
+
+        if len(c.args) % 2:
+            logging.error('Odd number of arguments in telemetry from {!s}'
+                          .format(c.sender))
+            return
+
+        sl = self.machine.get_slave(address=c.sender.hostname)
+        if not sl:
+            return
+
+        values = dict(zip(c.args[0::2], c.args[1::2]))
+        mirror.update(sl.serialnumber, values)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from ertza.commands import UnbufferedCommand
+from ertza.commands import OscCommand
+
+
+class ProcessorsStats(OscCommand, UnbufferedCommand):
+    """
+    Return statistics of each processor lane:
+    /processors/stats/reply PROCESSOR LANE DEPTH MAX_DEPTH PROCESSED DROPPED
+        COALESCED WAIT_AVG WAIT_MAX EXEC_AVG EXEC_MAX PURGED
+
+    PURGED counts commands cancelled by safety commands.
+
+    WAIT is the time spent in queue, EXEC the execution time, both in ms.
+    The command always send a ok reply at the end of the dump:
+    /processors/stats/ok done
+    """
+
+    alias = '/processors/stats'
+
+    def execute(self, c):
+        try:
+            for name, proc in sorted(self.machine.dispatcher.processors.items()):
+                for lane, (depth, st) in sorted(proc.stats().items()):
+                    self.reply(c, name, lane, depth, st.max_depth,
+                               st.processed, st.dropped, st.coalesced,
+                               round(st.wait_avg * 1e3, 3),
+                               round(st.wait_max * 1e3, 3),
+                               round(st.exec_avg * 1e3, 3),
+                               round(st.exec_max * 1e3, 3),
+                               st.purged,
+                               add_path='/reply')
+
+            self.ok(c, 'done')
+        except Exception as e:
+            self.error(c, str(e))
+
+    @property
+    def help_text(self):
+        return 'Return queue depth and latency of processor lanes'
+
+
+class AdmissionStats(OscCommand, UnbufferedCommand):
+    """
+    Return rate limiting counters of the OSC server:
+    /server/admission/stats/ok ADMITTED BYPASSED DROPPED REJECTED
+
+    DROPPED counts all over limit messages, REJECTED those answered with
+    an error busy reply.
+    """
+
+    alias = '/server/admission/stats'
+
+    def execute(self, c):
+        try:
+            st = self.machine.dispatcher.servers['OSC'].admission.stats
+            self.ok(c, st.admitted, st.bypassed, st.dropped, st.rejected)
+        except Exception as e:
+            self.error(c, str(e))
+
+    @property
+    def help_text(self):
+        return 'Return rate limiting counters of the OSC server'
@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 
 from ertza.commands import SerialCommand
+from ertza.commands import SlowCommand
 
 
-class ConfigProfileLoad(SerialCommand):
+class ConfigProfileLoad(SerialCommand, SlowCommand):
     """
     Load existing profile found in ``_PROFILE_PATH`` (usually /etc/ertza/profiles)
     """
 
+    alias = 'config.profile.load'
+
     def execute(self, c):
         if not self.check_args(c, 'eq', 1):
             return
@@ -19,10 +22,6 @@ class ConfigProfileLoad(SerialCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return 'config.profile.load'
-
     @property
     def help_text(self):
         return 'Load the specified PROFILE'
@@ -32,11 +31,13 @@ class ConfigProfileLoad(SerialCommand):
         return 'PROFILE'
 
 
-class ConfigProfileUnload(SerialCommand):
+class ConfigProfileUnload(SerialCommand, SlowCommand):
     """
     Unload loaded profile (if any)
     """
 
+    alias = 'config.profile.unload'
+
     def execute(self, c):
         try:
             self.machine.config.unload_profile()
@@ -44,20 +45,18 @@ class ConfigProfileUnload(SerialCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return 'config.profile.unload'
-
     @property
     def help_text(self):
         return 'Unload the loaded profile (if any)'
 
 
-class ConfigProfileSet(SerialCommand):
+class ConfigProfileSet(SerialCommand, SlowCommand):
     """
     Set value in profile (not in config)
     """
 
+    alias = 'config.profile.set'
+
     def execute(self, c):
         if not self.check_args(c, 'ne', 3):
             return
@@ -69,10 +68,6 @@ class ConfigProfileSet(SerialCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return 'config.profile.set'
-
     @property
     def help_text(self):
         return 'Set the VALUE in SECTION:OPTION'
@@ -82,7 +77,7 @@ class ConfigProfileSet(SerialCommand):
         return 'SECTION.OPTION VALUE'
 
 
-class ConfigProfileListOptions(SerialCommand):
+class ConfigProfileListOptions(SerialCommand, SlowCommand):
     """
     Return a list of assignable options:
     ExmEislaLLSSSSSSSSSSSSconfig.profile.list_options.reply:SECTION:OPTION\r\n
@@ -90,6 +85,9 @@ class ConfigProfileListOptions(SerialCommand):
     The command always send a ok reply at the end of the dump:
     ExmEislaLLSSSSSSSSSSSSconfig.profile.dump.ok\r\n
     """
+
+    alias = 'config.profile.list_options'
+
     def execute(self, c):
 
         try:
@@ -106,15 +104,42 @@ class ConfigProfileListOptions(SerialCommand):
             self.error(c, str(e))
 
     @property
-    def alias(self):
-        return 'config.profile.list_options'
+    def help_text(self):
+        return 'Return a list of options that can be saved into a profile'
+
+
+class ConfigProfilePreload(SerialCommand, SlowCommand):
+    """
+    Parse profiles in advance, loading them is then immediate:
+    ``config.profile.preload[:PROFILE...]``
+
+    All profiles are preloaded if none is given. The ok reply lists the
+    preloaded profiles:
+    ``config.profile.preload.ok:PROFILE...``
+    """
+
+    alias = 'config.profile.preload'
+
+    def execute(self, c):
+        try:
+            # Arguments after the first one are not split by the message
+            profiles = [p.decode() for p in b':'.join(c.args).split(b':')
+                        if p] if c.args else []
+            profiles = self.machine.config.preload_profiles(profiles)
+            self.ok(c, *profiles)
+        except Exception as e:
+            self.error(c, str(e))
 
     @property
     def help_text(self):
-        return 'Return a list of options that can be saved into a profile'
+        return 'Preload the specified PROFILES (or all of them)'
+
+    @property
+    def args(self):
+        return '[PROFILE...]'
 
 
-class ConfigProfileDump(SerialCommand):
+class ConfigProfileDump(SerialCommand, SlowCommand):
     """
     Dump profile content:
     ``ExmEislaLLSSSSSSSSSSSSconfig.profile.dump.reply:SECTION.OPTION:VALUE\r\n``
@@ -122,6 +147,9 @@ class ConfigProfileDump(SerialCommand):
     The command always send a ok reply at the end of the dump:
     ``ExmEislaLLSSSSSSSSSSSSconfig.profile.dump.ok\r\n``
     """
+
+    alias = 'config.profile.dump'
+
     def execute(self, c):
         if not self.check_args(c, 'le', 1):
             return
@@ -140,40 +168,34 @@ class ConfigProfileDump(SerialCommand):
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return 'config.profile.dump'
-
     @property
     def help_text(self):
         return 'Dump actual profile values '
 
 
-class ConfigProfileSave(SerialCommand):
+class ConfigProfileSave(SerialCommand, SlowCommand):
     """
     Save profile to a file in ``_PROFILE_PATH``.
     If ``PROFILE`` is empty, overwrites the loaded profile
+
+    The file is written in the background, the ok reply is sent once it's
+    written with the time it took in seconds:
+    ``config.profile.save.ok:LATENCY``
     """
 
+    alias = 'config.profile.save'
+
     def execute(self, c):
         if not self.check_args(c, 'le', 1):
             return
 
         try:
-            if c.args:
-                profile = c.args
-            else:
-                profile = None
-
-            self.machine.config.save_profile(profile)
-            self.ok(c)
+            profile = c.args[0].decode() if c.args else None
+            self.machine.config.save_profile(profile,
+                                             callback=self.done_callback(c))
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return 'config.profile.save'
-
     @property
     def help_text(self):
         return 'Save the specified PROFILE (or the loaded one if unspecified)'
@@ -183,33 +205,36 @@ class ConfigProfileSave(SerialCommand):
         return '[PROFILE]'
 
 
-class ConfigSave(SerialCommand):
+class ConfigSave(SerialCommand, SlowCommand):
     """
     Save config to custom.conf including the loaded profile name
+
+    The file is written in the background, the ok reply is sent once it's
+    written with the time it took in seconds:
+    ``config.save.ok:LATENCY``
     """
 
+    alias = 'config.save'
+
     def execute(self, c):
         try:
-            self.machine.config.save()
-            self.ok(c)
+            self.machine.config.save(callback=self.done_callback(c))
         except Exception as e:
             self.error(c, str(e))
 
-    @property
-    def alias(self):
-        return 'config.save'
-
     @property
     def help_text(self):
         return 'Save the current config into the custom config file'
 
 
-class ConfigGet(SerialCommand):
+class ConfigGet(SerialCommand, SlowCommand):
     """
     Returns the value of ``SECTION:OPTION``. This allow to verify the behaviour of the config.
     This behaviour can be changed by variant config or profile.
     """
 
+    alias = 'config.get'
+
     def execute(self, c):
         if len(c.args) != 1:
             self.error(c, 'Invalid number of arguments for %s' % self.alias)
@@ -223,10 +248,6 @@ class ConfigGet(SerialCommand):
         except Exception as e:
             self.error(c, k, str(e))
 
-    @property
-    def alias(self):
-        return 'config.get'
-
     @property
     def help_text(self):
         return 'Returns the value of SECTION:OPTION'
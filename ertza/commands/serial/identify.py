@@ -7,12 +7,9 @@ from ertza.commands import SerialCommand
 
 
 class Identify(SerialCommand, BufferedCommand):
+    alias = 'identify'
 
     def execute(self, c):
         logging.info('Found remote with S/N {}'.format(c.serial_number))
         data = ('identify', self.machine.serialnumber)
         self.send(*data)
-
-    @property
-    def alias(self):
-        return 'identify'
@@ -1,31 +1,98 @@
 # -*- coding: utf-8 -*-
 
-import struct
-
 from ertza.commands import SerialCommand
+from ertza.commands import key_lane
+from ertza.drivers.netdata_maps import MicroflexE100Map
+from ertza.processors.serial.message import SerialCommandString
+
+
+def value_codecs(netdata_map, prefix='machine:'):
+    """
+    Return {key: (Struct, type)} for the writable keys of a netdata map.
+
+    Values are decoded as packed by SerialCommandString: little endian
+    32-bit floats and signed ints, bools on one byte.
+    """
+
+    structs = {
+        float: SerialCommandString.Float,
+        int: SerialCommandString.Int,
+        bool: SerialCommandString.Bool,
+    }
+
+    codecs = {}
+    for k, p in netdata_map.items():
+        params = p.items() if isinstance(p, dict) else ((None, p),)
+        for sk, sp in params:
+            if 'w' not in sp.mode:
+                continue
+            key = prefix + k if sk is None else '{}{}:{}'.format(prefix, k, sk)
+            codecs[key] = (structs[sp.vtype], sp.vtype)
+    return codecs
 
 
 class MachineSet(SerialCommand):
-    _uint_keys = (
-        'machine:command:control_mode',
-        'machine:command:move_mode',
-    )
-    _float_keys = (
-        'machine:torque_ref',
-        'machine:velocity_ref',
-        'machine:position_ref',
-        'machine:acceleration',
-        'machine:deceleration',
-    )
-    _bool_keys = (
-        'machine:command:enable',
-        'machine:command:cancel',
-        'machine:command:reset',
-        'machine:command:go',
-        'machine:command:go_home',
-        'machine:command:set_home',
-        'machine:command:stop',
-    )
+    """
+    Set a machine key:
+    machine.set:KEY:VALUE
+
+    Writable keys of the drive are decoded to their type, other values are
+    given as is to the machine. The reply gives the value after the drive
+    limits are applied:
+    machine.set.ok:KEY:VALUE
+    """
+
+    alias = 'machine.set'
+
+    _codecs = value_codecs(MicroflexE100Map)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # {key: (value, clamped value)}, valid for a config version
+        self._echo = {}
+        self._echo_version = None
+
+    def _value_type(self, nk):
+        try:
+            return self._codecs[nk][1]
+        except KeyError:
+            return None
+
+    def _decode(self, nk, v):
+        try:
+            codec, vt = self._codecs[nk]
+        except KeyError:
+            return v, None
+        return vt(codec.unpack(v)[0]), vt
+
+    def _clamped(self, nk, v):
+        version = self.machine.config.version
+        if version != self._echo_version:
+            self._echo.clear()
+            self._echo_version = version
+
+        try:
+            cv, nv = self._echo[nk]
+            if cv == v and type(cv) is type(v):
+                return nv
+        except KeyError:
+            pass
+
+        k = nk.split(':', maxsplit=1)[1] if nk.startswith('machine:') else nk
+        frontend = self.machine.driver.frontend
+        nv = frontend.input_value(k, frontend.output_value(k, v))
+        self._echo[nk] = (v, nv)
+        return nv
+
+    def _set(self, k, nk, v, vt):
+        """
+        Set the key and return its clamped value.
+        """
+
+        self.machine[nk] = v
+        nv = self._clamped(nk, v)
+        return vt(nv) if vt is not None else nv
 
     def execute(self, c):
         if len(c.args) < 2:
@@ -35,34 +102,105 @@ class MachineSet(SerialCommand):
         try:
             k, v, = c.args
             nk = k.decode().replace('.', ':')
-            vt = None
-            if nk in self._float_keys:
-                v = struct.unpack('f', v)[0]
-                vt = float
-            elif nk in self._uint_keys:
-                v = struct.unpack('I', v)[0]
-                vt = int
-            elif nk in self._bool_keys:
-                v = struct.unpack('?', v)[0]
-                vt = bool
-
-            self.machine[nk] = v
-            nk = nk.split(':', maxsplit=1)[1] if nk.startswith('machine:') else nk
-            nv = self.machine.driver.frontend.input_value(
-                nk, self.machine.driver.frontend.output_value(nk, v))
-            if vt is not None:
-                self.ok(c, k, vt(nv))
-            else:
-                self.ok(c, k, nv)
+            v, vt = self._decode(nk, v)
+            self.ok(c, k, self._set(k, nk, v, vt))
         except Exception as e:
             self.error(c, k, str(e))
 
-    @property
-    def alias(self):
-        return 'machine.set'
+    def lane_for(self, c):
+        try:
+            k, v, = c.args
+            nk = k.decode().replace('.', ':')
+            v, vt = self._decode(nk, v)
+        except Exception:
+            return 'normal'     # Replied as an error by execute
+        return key_lane(nk, v)
+
+
+class MachineSetMany(MachineSet):
+    """
+    Set several keys in one frame:
+    machine.set_many:KEY:VALUE:KEY:VALUE...
+
+    Only typed keys are accepted, their values having a fixed size. Every
+    pair is decoded before anything is set: if one is invalid nothing is set
+    and the error names its key. Keys are then set in order and a single
+    reply gives the clamped values:
+    machine.set_many.ok:KEY:VALUE:KEY:VALUE...
+
+    If setting a key fails, the following keys are not set and the error
+    names the failed key.
+    """
+
+    alias = 'machine.set_many'
+
+    def parse(self, data):
+        """
+        Return [(key, normalized key, value, value type), ...] from data.
+        """
+
+        pairs = []
+        pos, end = 0, len(data)
+        while pos < end:
+            sep = data.find(b':', pos)
+            if sep < 0:
+                raise ValueError('Missing value for {}'.format(
+                    data[pos:].decode(errors='replace')))
+
+            k = data[pos:sep]
+            try:
+                nk = k.decode().replace('.', ':')
+            except UnicodeDecodeError:
+                raise ValueError('Invalid key {!r}'.format(k))
+            vt = self._value_type(nk)
+            if vt is None:
+                raise ValueError('{} is not a typed key'.format(nk))
+
+            pos = sep + 1 + self._codecs[nk][0].size
+            if pos > end or (pos < end and data[pos:pos + 1] != b':'):
+                raise ValueError('Invalid value for {}'.format(nk))
+
+            v, vt = self._decode(nk, data[sep + 1:pos])
+            pairs.append((k, nk, v, vt))
+            pos += 1
+
+        if not pairs:
+            raise ValueError('Expected KEY:VALUE pairs')
+        return pairs
+
+    def execute(self, c):
+        if not self.check_args(c, 'ge', 2):
+            return
+
+        try:
+            # Arguments after the first one are not split by the message
+            pairs = self.parse(b':'.join(c.args))
+        except Exception as e:
+            self.error(c, str(e))
+            return
+
+        data = []
+        for k, nk, v, vt in pairs:
+            try:
+                data += [k, self._set(k, nk, v, vt)]
+            except Exception as e:
+                self.error(c, k, str(e))
+                return
+        self.ok(c, *data)
+
+    def lane_for(self, c):
+        # Stopping the drive can't wait, other keys are set in order
+        try:
+            pairs = self.parse(b':'.join(c.args))
+        except Exception:
+            return 'normal'     # Replied as an error by execute
+        if any(key_lane(nk, v) == 'safety' for k, nk, v, vt in pairs):
+            return 'safety'
+        return 'control'
 
 
 class MachineGet(SerialCommand):
+    alias = 'machine.get'
 
     def execute(self, c):
         if not self.check_args(c, 'eq', 1):
@@ -79,6 +217,26 @@ class MachineGet(SerialCommand):
         except Exception as e:
             self.error(c, k, str(e))
 
-    @property
-    def alias(self):
-        return 'machine.get'
+
+class MachineGetMany(SerialCommand):
+    alias = 'machine.get_many'
+
+    def execute(self, c):
+        if not self.check_args(c, 'ge', 1):
+            return
+
+        try:
+            # Arguments after the first one are not split by the message
+            keys = b':'.join(c.args).split(b':')
+            nkeys = [k.decode().replace('.', ':') for k in keys]
+            data = []
+            for k, v in zip(keys, self.machine.get_many(nkeys)):
+                if isinstance(v, Exception):
+                    self.error(c, k, str(v))
+                elif v is None:
+                    self.error(c, k, 'Bad machine response: None')
+                else:
+                    data += [k, v]
+            self.ok(c, *data)
+        except Exception as e:
+            self.error(c, str(e))
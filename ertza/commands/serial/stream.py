@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import struct
+
+from ertza.commands import SerialCommand
+from ertza.commands import SlowCommand
+
+from ertza.processors.serial.stream import SerialStream
+
+
+class StreamStart(SerialCommand, SlowCommand):
+    """
+    Stream keys in binary frames at RATE Hz:
+    stream.start:KEY:KEY...:RATE
+
+    RATE is a float. The rate is limited to what the link can carry, the
+    reply gives the actual rate and the format of each field
+    (f: float, i: int):
+    stream.start.ok:RATE:FORMATS
+    """
+
+    alias = 'stream.start'
+
+    # Part of the link bandwidth left to streaming
+    link_usage = 0.8
+
+    def execute(self, c):
+        if not self.check_args(c, 'ge', 2):
+            return
+
+        try:
+            # Arguments after the first one are not split by the message
+            data = b':'.join(c.args)
+            rate, = struct.unpack('<f', data[-4:])
+            keys = [k.decode().replace('.', ':')
+                    for k in data[:-5].split(b':')]
+            if not keys or not all(keys) or rate <= 0:
+                raise ValueError('Expected KEY:KEY...:RATE')
+
+            baudrate = int(self.machine.config.get('serial', 'baudrate',
+                                                   fallback=57600))
+            # 10 bits per byte on the wire
+            max_rate = baudrate / 10 * self.link_usage / \
+                SerialStream.frame_size(len(keys))
+            rate = min(rate, max_rate)
+
+            values = self.machine.get_many(keys)
+            for k, v in zip(keys, values):
+                if isinstance(v, Exception):
+                    raise ValueError('Unable to read {}: {!s}'.format(k, v))
+            formats = ''.join(SerialStream.format_for(v) for v in values)
+
+            self._stop_stream()
+            stream = SerialStream(self.machine, self.outlet, keys, formats,
+                                  rate)
+            self.machine.serial_stream = stream
+            self.ok(c, float(rate), formats)
+            stream.start()
+        except Exception as e:
+            self.error(c, str(e))
+
+    def _stop_stream(self):
+        stream = getattr(self.machine, 'serial_stream', None)
+        if stream is not None:
+            stream.stop()
+            self.machine.serial_stream = None
+
+    @property
+    def help_text(self):
+        return 'Stream keys in binary frames'
+
+
+class StreamStop(StreamStart):
+    """
+    Stop streaming:
+    stream.stop
+    """
+
+    alias = 'stream.stop'
+
+    def execute(self, c):
+        try:
+            self._stop_stream()
+            self.ok(c)
+        except Exception as e:
+            self.error(c, str(e))
+
+    @property
+    def help_text(self):
+        return 'Stop streaming'
@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
 
+import io
 import logging
 import os
+import time
+import queue
+import tempfile
 from glob import glob
 import struct
 import configparser
 from configparser import Error, NoSectionError, NoOptionError, ParsingError
 from collections import ChainMap, namedtuple
+from threading import Event, Lock, Thread
+from types import MappingProxyType
 
 from .exceptions import AbstractErtzaException
 
@@ -89,11 +95,144 @@ class _ChainMap(ChainMap):
             return super().get(key)
 
 
+class _SectionView(_ChainMap):
+    """
+    Section over the variant, the profile and the config sections. Writes go
+    to the first of them and are notified to the parser.
+    """
+
+    def __init__(self, *maps, parser=None):
+        super().__init__(*maps)
+        self._parser = parser
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._parser.changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._parser.changed()
+
+
+class SaveRequest(object):
+    """
+    Config file write queued to the ConfigWriter. *latency* is the time
+    between the request and the end of the write, *error* the exception
+    raised by the write, if any.
+    """
+
+    def __init__(self, path, data, callback=None):
+        self.path = path
+        self.data = data
+        self.callback = callback
+
+        self.queued = time.monotonic()
+        self.latency = None
+        self.error = None
+        self._done_event = Event()
+
+    @property
+    def done(self):
+        return self._done_event.is_set()
+
+    def wait(self, timeout=None):
+        return self._done_event.wait(timeout)
+
+
+class ConfigWriter(object):
+    """
+    Write config files in order from a background thread.
+
+    Files are replaced atomically: data is written to a temporary file in
+    the same directory, synced to disk, then renamed over the file.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = Lock()
+
+    def put(self, path, data, callback=None):
+        """
+        Queue the write of data to path. callback(request) is called from
+        the writer thread once it's done.
+
+        :returns: The SaveRequest
+        """
+
+        request = SaveRequest(path, data, callback)
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._loop, name='config-writer')
+                self._thread.daemon = True
+                self._thread.start()
+        self._queue.put(request)
+        return request
+
+    @staticmethod
+    def write(path, data):
+        directory = os.path.dirname(path) or '.'
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix='.{}.'.format(os.path.basename(path)))
+        try:
+            with os.fdopen(fd, 'w') as tmp_file:
+                tmp_file.write(data)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            try:
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+            except OSError:
+                os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        # Make the rename durable
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+    def _loop(self):
+        while True:
+            request = self._queue.get()
+            try:
+                self.write(request.path, request.data)
+                logger.info('Saved {}'.format(request.path))
+            except Exception as e:
+                logger.error('Unable to save {}: {!s}'.format(request.path, e))
+                request.error = e
+
+            request.latency = time.monotonic() - request.queued
+            request._done_event.set()
+            if request.callback is not None:
+                try:
+                    request.callback(request)
+                except Exception as e:
+                    logger.error('Error in save callback: {!s}'.format(e))
+
+
+_writer = ConfigWriter()
+
+
 class AbstractConfigParser(configparser.ConfigParser):
     def __init__(self, *args, **kwargs):
+        # Incremented when a variant or a profile is (un)loaded or changed
+        self.version = 0
+
         super().__init__(interpolation=configparser.ExtendedInterpolation(), **kwargs)
 
         self.config_files = []
+        # [(path, {section: {option: raw value}})] of config_files
+        self._layers = []
         if args and not isinstance(args, (tuple, list)):
             args = (args,)
 
@@ -103,7 +242,7 @@ class AbstractConfigParser(configparser.ConfigParser):
                 self.config_files.append(real_path_cfg)
                 logger.debug("Found " + cfg)
                 try:
-                    self.read_file(open(real_path_cfg))
+                    self._read_layer(real_path_cfg)
                     logger.info("Parsed " + cfg)
                 except ParsingError:
                     logger.warn("Unable to parse config file %s" % real_path_cfg)
@@ -112,9 +251,57 @@ class AbstractConfigParser(configparser.ConfigParser):
 
         self._config_proxies = [None, None]
 
-    def save(self, nfile=None):
+    def _read_layer(self, path):
         """
-        Save config into a config file.
+        Read path into the config, keeping its own values to know what to
+        save later.
+        """
+
+        with open(path) as f:
+            data = f.read()
+
+        layer = configparser.RawConfigParser()
+        try:
+            layer.read_string(data, source=path)
+        except ParsingError:
+            pass    # Raised when read into the config
+        self._layers.append((path, {sec: dict(layer.items(sec, raw=True))
+                                    for sec in layer.sections()}))
+
+        self.read_string(data, source=path)
+
+    def saved_values(self):
+        """
+        Return a parser with the values to save in the last config file:
+        values that are not in the lower config files or differ from them.
+        """
+
+        lower = {}
+        for path, layer in self._layers[:-1]:
+            for sec, opts in layer.items():
+                lower.setdefault(sec, {}).update(opts)
+
+        saved = configparser.RawConfigParser()
+        for sec in self.sections():
+            lower_opts = lower.get(sec, {})
+            for opt, value in self.items(sec, raw=True):
+                if opt in lower_opts and lower_opts[opt] == value:
+                    continue
+                if not saved.has_section(sec):
+                    saved.add_section(sec)
+                saved.set(sec, opt, value)
+
+        return saved
+
+    def save(self, nfile=None, callback=None):
+        """
+        Save config into a config file, in the background.
+
+        Values to save are computed from the config in memory when called,
+        then the file is written by the config writer thread.
+        callback(request) is called from that thread once it's done.
+
+        :returns: The SaveRequest
         """
 
         save_to = nfile or self.config_files[-1]
@@ -122,13 +309,10 @@ class AbstractConfigParser(configparser.ConfigParser):
         if os.path.isfile(save_to):
             logger.info('{} already existing, overwriting'.format(save_to))
 
-        if len(self.config_files) > 1:
-            tmp_config = self - AbstractConfigParser(self.config_files[0:-1])
-        else:
-            tmp_config = self
+        data = io.StringIO()
+        self.saved_values().write(data)
 
-        with open(save_to, 'w') as sfile:
-            tmp_config.write(sfile)
+        return _writer.put(save_to, data.getvalue(), callback)
 
     def dump(self):
         dump = {}
@@ -214,6 +398,108 @@ class ProxyConfigParser(AbstractConfigParser):
         self.config_files[-1] = '{}/{}.conf'.format(self._basedir, name)
 
 
+class ProfileCache(object):
+    """
+    Parsed profiles by path, with their PROFILE_OPTIONS values converted to
+    their type. An entry is used as long as the modification time of its
+    file doesn't change.
+    """
+
+    _converters = {
+        'str': str,
+        'int': int,
+        'float': float,
+        # Same values as DriverFrontend
+        'bool': lambda v: v in ('True', 'true', 'y', '1'),
+    }
+
+    def __init__(self, options):
+        self.options = options
+        self._profiles = {}     # {path: (mtime, parser, values)}
+        self._lock = Lock()
+
+    @classmethod
+    def convert(cls, vtype, value):
+        """
+        Return value (str) converted to vtype, a PROFILE_OPTIONS type.
+
+        :raises ValueError: if value can't be converted
+        """
+
+        return cls._converters[vtype](value)
+
+    def _convert(self, parser):
+        values = {}
+        for sec, opts in self.options.items():
+            if not parser.has_section(sec):
+                continue
+            for opt, (vtype, unit) in opts.items():
+                if not parser.has_option(sec, opt):
+                    continue
+                try:
+                    values[(sec, opt)] = self.convert(vtype,
+                                                      parser.get(sec, opt))
+                except (Error, KeyError, ValueError) as e:
+                    logger.warn('Invalid value for {}:{} in {}: {!s}'.format(
+                        sec, opt, parser.name, e))
+        return values
+
+    def _entry(self, path, name):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # Not cached, ProxyConfigParser reports the missing file
+            parser = ProxyConfigParser(path, name)
+            return None, parser, self._convert(parser)
+
+        with self._lock:
+            entry = self._profiles.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry
+
+        parser = ProxyConfigParser(path, name)
+        entry = (mtime, parser, self._convert(parser))
+        with self._lock:
+            self._profiles[path] = entry
+        return entry
+
+    def get(self, path, name):
+        """
+        Return the ProxyConfigParser of the profile at path.
+        """
+
+        return self._entry(os.path.realpath(path), name)[1]
+
+    def values(self, path, name):
+        """
+        Return {(section, option): value} of the profile at path.
+        """
+
+        return self._entry(os.path.realpath(path), name)[2]
+
+    def parser_values(self, parser):
+        """
+        Return {(section, option): value} of a parser returned by get, or
+        None if it isn't cached anymore.
+        """
+
+        if not parser.config_files:
+            return None
+
+        with self._lock:
+            entry = self._profiles.get(parser.config_files[-1])
+        if entry is None or entry[1] is not parser:
+            return None
+        return entry[2]
+
+    def discard(self, path):
+        with self._lock:
+            self._profiles.pop(os.path.realpath(path), None)
+
+    def __contains__(self, path):
+        return os.path.realpath(path) in self._profiles
+
+
 class ConfigParser(AbstractConfigParser):
     """
     ConfigParser provides config interface. Its handle cascading config files.
@@ -224,6 +510,141 @@ class ConfigParser(AbstractConfigParser):
 
     PROFILE_OPTIONS = _PROFILE_OPTIONS
 
+    def __init__(self, *args, **kwargs):
+        self._view = None
+        self._section_views = {}
+        self._typed_values = {}
+
+        self.profiles = ProfileCache(self.PROFILE_OPTIONS)
+        self._profiles_list = None
+
+        super().__init__(*args, **kwargs)
+
+    def changed(self):
+        """
+        Increment version and drop the merged view, it's rebuilt on next
+        lookup. Called when a variant or a profile is (un)loaded and when a
+        value is set.
+        """
+
+        self.version += 1
+        self._view = None
+        self._section_views = {}
+        self._typed_values = {}
+
+    @property
+    def view(self):
+        """
+        Read-only {section: {option: value}} merging the config, the profile
+        and the variant, which has the highest priority.
+
+        The view is only rebuilt after a change: consumers caching values
+        derived from the config can compare *version* to the one they were
+        computed with to check they're still current.
+        """
+
+        view = self._view
+        if view is None:
+            # Don't keep a view built while the config was changed from
+            # another thread
+            version = self.version
+            view = self._build_view()
+            if version == self.version:
+                self._view = view
+        return view
+
+    def _build_view(self):
+        layers = [self] + [p for p in reversed(self._config_proxies)
+                           if p is not None]
+
+        merged = {}
+        for layer in layers:
+            for sec in layer.sections():
+                options = merged.setdefault(sec, {})
+                for opt in layer.options(sec):
+                    try:
+                        options[opt] = configparser.ConfigParser.get(
+                            layer, sec, opt)
+                    except Error:
+                        # Left to get() which raises the error
+                        options.pop(opt, None)
+
+        return MappingProxyType({sec: MappingProxyType(opts)
+                                 for sec, opts in merged.items()})
+
+    def typed_values(self, section):
+        """
+        Return {option: value} of the PROFILE_OPTIONS options of section
+        set in the view, converted to their type. Invalid values are left
+        out.
+
+        Values of the loaded profile were converted by the profile cache
+        when the profile was parsed, so switching to a cached profile doesn't
+        convert them again. The result is kept until the next change.
+        """
+
+        try:
+            return self._typed_values[section]
+        except KeyError:
+            pass
+
+        version = self.version
+        options = self.view.get(section, {})
+
+        profile = self._config_proxies[self.PROFILE_PRIORITY] \
+            if len(self._config_proxies) > self.PROFILE_PRIORITY else None
+        cached = self.profiles.parser_values(profile) \
+            if profile is not None else None
+        variant = self.variant
+
+        values = {}
+        for opt, (vtype, unit) in self.PROFILE_OPTIONS.get(section,
+                                                           {}).items():
+            if opt not in options:
+                continue
+
+            # The variant has priority over the profile
+            if cached and (section, opt) in cached and not (
+                    variant is not None and variant.has_option(section, opt)):
+                values[opt] = cached[(section, opt)]
+                continue
+
+            try:
+                values[opt] = ProfileCache.convert(vtype, options[opt])
+            except (KeyError, ValueError):
+                pass
+
+        if version == self.version:
+            self._typed_values[section] = values
+        return values
+
+    def get(self, section, option, **kwargs):
+        if not kwargs.get('raw') and kwargs.get('vars') is None:
+            try:
+                return self.view[section][self.optionxform(option)]
+            except KeyError:
+                pass
+
+        return super().get(section, option, **kwargs)
+
+    def set(self, section, option, value=None):
+        super().set(section, option, value)
+        self.changed()
+
+    def remove_option(self, section, option):
+        removed = super().remove_option(section, option)
+        self.changed()
+        return removed
+
+    def add_section(self, section):
+        super().add_section(section)
+        self.changed()
+
+    def remove_section(self, section):
+        removed = super().remove_section(section)
+        self.changed()
+        return removed
+
     def load_config(self, config_file):
         """
         Load config file appending to *config_files*.
@@ -237,7 +658,8 @@ class ConfigParser(AbstractConfigParser):
         logger.info("Loading config file: %s" % config_file)
         config_file = os.path.realpath(config_file)
         self.config_files.append(config_file)
-        self.read_file(open(config_file))
+        self._read_layer(config_file)
+        self.changed()
         return True
 
     def load_variant(self, variant=None, **kwargs):
@@ -278,6 +700,7 @@ class ConfigParser(AbstractConfigParser):
                 variant_config_file = os.path.join(_VARIANT_PATH, variant + ".conf")
 
             self._config_proxies[self.VARIANT_PRIORITY] = ProxyConfigParser(variant_config_file, variant)
+            self.changed()
 
             logger.info("Loaded variant config file: %s" % variant)
         except ParsingError as e:
@@ -308,17 +731,55 @@ class ConfigParser(AbstractConfigParser):
             else:
                 profile_config_path = os.path.join(_PROFILE_PATH, profile + ".conf")
 
-            self._config_proxies[self.PROFILE_PRIORITY] = ProxyConfigParser(profile_config_path, profile)
+            self._config_proxies[self.PROFILE_PRIORITY] = self.profiles.get(profile_config_path, profile)
+            self.changed()
             self['machine']['profile'] = profile
         except ParsingError as e:
             logger.warn("Couldn't load profile file {0}: {1!s}" % (self.profile_config_path, e))
 
+    def watch_paths(self):
+        """
+        Return the directories of variants and profiles.
+        """
+
+        paths = {_VARIANT_PATH, _PROFILE_PATH}
+        for cfp in self._config_proxies:
+            if cfp is not None and cfp.config_files:
+                paths.add(os.path.dirname(cfp.config_files[-1]))
+        return sorted(paths)
+
+    def reload_file(self, path):
+        """
+        Parse the variant or profile file at path again if it is loaded.
+
+        :returns: True if the file was loaded and has been parsed again
+        """
+
+        path = os.path.realpath(path)
+        for i, cfp in enumerate(self._config_proxies):
+            if cfp is None or not cfp.config_files or \
+                    cfp.config_files[-1] != path:
+                continue
+
+            try:
+                self._config_proxies[i] = ProxyConfigParser(path, cfp.name)
+            except Error as e:
+                logger.warn("Couldn't parse {}: {!s}".format(path, e))
+                return False
+
+            logger.info('Reloaded {}'.format(path))
+            self.changed()
+            return True
+
+        return False
+
     def unload_profile(self):
         try:
             del self['machine']['profile']
             del self._config_proxies[self.PROFILE_PRIORITY]
         except (IndexError, NoSectionError, NoOptionError):
             pass
+        self.changed()
 
     def dump_profile(self, profile=None):
         if not self.get('machine', 'profile', fallback=profile):
@@ -326,35 +787,78 @@ class ConfigParser(AbstractConfigParser):
 
         if profile:
             profile_path = '{}/{}.conf'.format(_PROFILE_PATH, profile)
-            profile_config = ProxyConfigParser(profile_path, profile)
-            return profile_config.dump()
+            return self.profiles.get(profile_path, profile).dump()
         else:
-            return self.profile_config.dump()
+            return self.profile.dump()
 
     def get_profile_options(self):
         return self.PROFILE_OPTIONS
 
-    def save_profile(self, profile=None):
+    def saved_values(self):
+        saved = super().saved_values()
+
+        profile = self._config_proxies[self.PROFILE_PRIORITY] \
+            if len(self._config_proxies) > self.PROFILE_PRIORITY else None
+        if profile is not None and profile.name:
+            if not saved.has_section('machine'):
+                saved.add_section('machine')
+            saved.set('machine', 'profile', profile.name)
+
+        return saved
+
+    def save_profile(self, profile=None, callback=None):
         if self.profile is None:
             raise ProfileError('No profile loaded')
 
         if profile:
-            self.profile.save('{}/{}.conf'.format(_PROFILE_PATH, profile))
+            return self.profile.save('{}/{}.conf'.format(_PROFILE_PATH, profile),
+                                     callback)
         else:
-            self.profile.save()
+            return self.profile.save(callback=callback)
 
     def get_profiles_list(self):
-        files = glob('{}/*.conf'.format(_PROFILE_PATH))
-        profiles = []
-        for f in files:
-            profiles.append(f.replace(_PROFILE_PATH + '/', '')[0:len('.conf') * -1])
+        try:
+            mtime = os.stat(_PROFILE_PATH).st_mtime_ns
+        except OSError:
+            return []
+
+        if self._profiles_list is None or self._profiles_list[0] != mtime:
+            files = glob('{}/*.conf'.format(_PROFILE_PATH))
+            profiles = []
+            for f in files:
+                profiles.append(f.replace(_PROFILE_PATH + '/', '')[0:len('.conf') * -1])
+            self._profiles_list = (mtime, profiles)
+
+        return list(self._profiles_list[1])
 
-        return profiles
+    def preload_profiles(self, profiles=None, **kwargs):
+        """
+        Parse profiles in advance so loading them doesn't read their file.
+
+        :param list profiles: Profiles to preload, all if not given
+        :returns: The list of preloaded profiles
+        """
+
+        profile_path = kwargs.get('profile_path', None) or _PROFILE_PATH
+        if not profiles:
+            profiles = self.get_profiles_list()
+
+        for profile in profiles:
+            path = os.path.join(profile_path, profile + ".conf")
+            if not os.path.isfile(path):
+                raise ProfileError('Profile {} not found'.format(profile))
+            self.profiles.get(path, profile)
+
+        return list(profiles)
 
     def profile_set(self, sec, opt, value):
         if not self.profile.has_section(sec):
             self.profile.add_section(sec)
         self.profile[sec][opt] = value
+        if self.profile.config_files:
+            # The cached profile is the one being modified
+            self.profiles.discard(self.profile.config_files[-1])
+        self.changed()
 
     def find_cape(self, partnumber='ARMAZCAPE'):
         capes = self.get_cape_infos()
@@ -415,6 +919,11 @@ class ConfigParser(AbstractConfigParser):
             return self._config_proxies[self.PROFILE_PRIORITY]
 
     def __getitem__(self, key):
+        try:
+            return self._section_views[key]
+        except KeyError:
+            pass
+
         childs_sec = []
         for cfp in self._config_proxies:
             if cfp is not None and key in cfp:
@@ -426,4 +935,6 @@ class ConfigParser(AbstractConfigParser):
         if len(childs_sec) == 0:
             raise KeyError
 
-        return _ChainMap(*childs_sec)
+        view = self._section_views[key] = _SectionView(*childs_sec,
+                                                       parser=self)
+        return view
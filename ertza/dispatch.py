@@ -72,6 +72,9 @@ class Dispatcher(object):
             logging.info('Stopping {} server.'.format(name))
             server.exit()
 
+        for name, proc in self._processors.items():
+            proc.exit()
+
     @coroutine
     def outlet(self, name):
         try:
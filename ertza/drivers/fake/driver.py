@@ -115,6 +115,26 @@ class FakeDriver(AbstractDriver):
 
         return self.frontend.input_value(key, vt(res[st]))
 
+    def get_many(self, keys):
+        values = []
+        for key in keys:
+            try:
+                values.append(self[key])
+            except FakeDriverError as e:
+                values.append(e)
+
+        return values
+
+    def set_many(self, pairs):
+        results = []
+        for key, value in pairs:
+            try:
+                self[key] = value
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+        return results
+
     def __getitem__(self, key):
         try:
             if len(key.split(':')) == 2:
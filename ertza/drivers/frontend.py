@@ -65,14 +65,22 @@ class DriverFrontend(object):
                          'position', 'position_target', 'position_remaining')
 
     DEFAULTS_KEYS = ('acceleration', 'deceleration', 'torque_rise_time', 'torque_fall_time')
+    # Parameters written as is to the drive
+    DRIVE_KEYS = DEFAULTS_KEYS + ('entq_kp', 'entq_kp_vel', 'entq_ki', 'entq_kd')
 
     def __init__(self):
         self.frontend_config = {}
         self.frontend_section = None
 
+        # Converted values, valid for a config version
+        self._values = {}
+        self._values_version = None
+
     def load_config(self, config, section='motor'):
         self.frontend_config = config
         self.frontend_section = section
+        self._values = {}
+        self._values_version = None
 
     @property
     def gearbox_ratio(self):
@@ -181,6 +189,31 @@ class DriverFrontend(object):
         except KeyError:
             raise AttributeError('{} does not exist as a valid frontend key'.format(key))
 
+        # Configs with a version are only read again when changed
+        version = getattr(self.frontend_config, 'version', None)
+        if version is not None:
+            if version != self._values_version:
+                self._values = {}
+                self._values_version = version
+            try:
+                return self._values[key]
+            except KeyError:
+                pass
+
+        value = self._config_value(key, vtype, fallback)
+        if version is not None:
+            self._values[key] = value
+        return value
+
+    def _config_value(self, key, vtype, fallback):
+        # Profile options are converted once by the config
+        typed_values = getattr(self.frontend_config, 'typed_values', None)
+        if typed_values is not None:
+            try:
+                return typed_values(self.frontend_section)[key]
+            except KeyError:
+                pass
+
         try:
             if vtype == bool:
                 return True if self.frontend_config[self.frontend_section][key] \
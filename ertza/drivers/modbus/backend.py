@@ -2,6 +2,7 @@
 
 import logging
 import bitstring
+from threading import RLock
 
 from pylibmodbus import ModbusTcp as ModbusClient
 from pylibmodbus import ModbusException
@@ -32,6 +33,8 @@ class ModbusBackend(object):
     min_netdata = 0
     max_netdata = 999
     register_nb_by_netdata = 2
+    max_registers_by_read = 124     # Modbus allows 125 registers by request
+    max_registers_by_write = 122    # and 123 by write request
 
     def __init__(self, target_addr, target_port, target_nodeid):
         ModbusCommunicationError._trigger = self.reconnect
@@ -42,6 +45,9 @@ class ModbusBackend(object):
 
         self.connected = False
 
+        # Commands are executed from several processor lanes
+        self._lock = RLock()
+
         self._end = ModbusClient(self.address, self.port)
         self._end.set_response_timeout(1)
 
@@ -76,6 +82,23 @@ class ModbusBackend(object):
 
         return self.wmr(start, data)
 
+    def write_netdata_range(self, netdata, data, formats):
+        """
+        Write len(formats) contiguous netdata in one request, starting at
+        netdata. data is a list of value tuples, one per netdata.
+        """
+
+        self._check_netdata(netdata)
+        self._check_netdata(netdata + len(formats) - 1)
+        start = netdata * self.register_nb_by_netdata
+
+        words = []
+        for values, fmt in zip(data, formats):
+            words.extend(bitstring.pack(fmt, *values)
+                         .unpack('uintbe:16,uintbe:16'))
+
+        return self.wmr(start, words)
+
     def read_netdata(self, netdata, fmt):
         self._check_netdata(netdata)
         start = netdata * self.register_nb_by_netdata
@@ -90,8 +113,36 @@ class ModbusBackend(object):
             raise ModbusBackendError('Unexpected error: {!s}'.format(e))
         return res
 
-    def _read_holding_registers(self, address):
-        nb = self.register_nb_by_netdata
+    def read_netdata_range(self, netdata, formats):
+        """
+        Read len(formats) contiguous netdata in one request, starting at
+        netdata. Returns a list of unpacked values, one tuple per netdata.
+        """
+
+        self._check_netdata(netdata)
+        self._check_netdata(netdata + len(formats) - 1)
+        start = netdata * self.register_nb_by_netdata
+        nb = len(formats) * self.register_nb_by_netdata
+
+        try:
+            response = self.rhr(start, nb)
+            if response is None or len(response) < nb:
+                raise ModbusCommunicationError('No data in response.')
+
+            res = []
+            for i, fmt in enumerate(formats):
+                words = response[i * self.register_nb_by_netdata:
+                                 (i + 1) * self.register_nb_by_netdata]
+                res.append(bitstring.pack('uintbe:16, uintbe:16', *words)
+                           .unpack(fmt))
+        except Exception as e:
+            logging.error('Unexpected error: {!s}'.format(e))
+            raise ModbusBackendError('Unexpected error: {!s}'.format(e))
+        return res
+
+    def _read_holding_registers(self, address, nb=None):
+        if nb is None:
+            nb = self.register_nb_by_netdata
         rpt = self._analyze_response(self._end.read_registers, address, nb)
         return rpt
 
@@ -122,12 +173,13 @@ class ModbusBackend(object):
         """
 
         try:
-            if not self.connected:
-                logging.info("Not connected, connecting...")
-                if not self.connect():
-                    raise ModbusBackendError('Unable to connect.')
+            with self._lock:
+                if not self.connected:
+                    logging.info("Not connected, connecting...")
+                    if not self.connect():
+                        raise ModbusBackendError('Unable to connect.')
 
-            rpt = rq_func(*args)
+                rpt = rq_func(*args)
             return rpt
         except ModbusException as e:
             raise ModbusCommunicationError('Error while executing {}: {!s}'.format(rq_func, e))
@@ -5,7 +5,7 @@ import logging
 from ..abstract_driver import AbstractDriver
 from ..exceptions import AbstractDriverError
 from ..frontend import DriverFrontend
-from ..netdata_maps import MicroflexE100Map
+from ..netdata_maps import MicroflexE100Map, netdata_ranges
 
 from .backend import ModbusBackend, ModbusBackendError
 
@@ -96,6 +96,111 @@ class ModbusDriver(AbstractDriver):
             raise ModbusDriverError('No data returned from backend '
                                     'for {}: {!s}'.format(key, e))
 
+    def get_many(self, keys):
+        """
+        Read several keys. Keys sharing a netdata are decoded from a single
+        read and contiguous netdata are read in one request.
+
+        Returns values in the order of keys. Keys that can't be read are
+        returned as ModbusDriverError instances.
+        """
+
+        values = [None] * len(keys)
+        by_netdata = {}
+
+        for i, key in enumerate(keys):
+            try:
+                seckey, _, subkey = key.partition(':')
+                if seckey not in self.netdata_map:
+                    raise KeyError(seckey)
+
+                ndk = self.netdata_map[seckey]
+                if type(ndk) == dict:
+                    if not subkey:
+                        values[i] = self[key]
+                        continue
+                    if subkey not in ndk:
+                        raise KeyError(subkey)
+                    ndk = ndk[subkey]
+
+                if 'r' not in ndk.mode:
+                    raise ReadOnlyError(key)
+
+                by_netdata.setdefault(ndk.netdata, []).append((i, ndk, seckey))
+            except Exception as e:
+                values[i] = e if isinstance(e, ModbusDriverError) \
+                    else ModbusDriverError(e)
+
+        max_length = self.back.max_registers_by_read // \
+            self.back.register_nb_by_netdata
+        for first, run in netdata_ranges(by_netdata.keys(), max_length):
+            try:
+                res = self.back.read_netdata_range(first, [nd.fmt for nd in run])
+            except ModbusBackendError as e:
+                for nd in run:
+                    for i, ndk, seckey in by_netdata[nd]:
+                        values[i] = ModbusDriverError(e)
+                continue
+
+            for nd, r in zip(run, res):
+                for i, ndk, seckey in by_netdata[nd]:
+                    try:
+                        values[i] = self.frontend.input_value(
+                            seckey, ndk.vtype(r[ndk.start]))
+                    except Exception as e:
+                        values[i] = ModbusDriverError(e)
+
+        return values
+
+    def set_many(self, pairs):
+        """
+        Write several (key, value) pairs. Values of keys owning a whole
+        netdata are written in one request for contiguous netdata, other
+        keys are written one by one, after them.
+
+        Returns a list with None for each written key, or the
+        ModbusDriverError raised while writing it.
+        """
+
+        results = [None] * len(pairs)
+        by_netdata = {}
+        others = []
+
+        for i, (key, value) in enumerate(pairs):
+            ndk = self.netdata_map.get(key)
+            if ndk is None or type(ndk) == dict:
+                others.append(i)
+                continue
+            if 'w' not in ndk.mode:
+                results[i] = WriteOnlyError(key)
+                continue
+
+            try:
+                data = (self.frontend.output_value(key, ndk.vtype(value)),)
+                by_netdata[ndk.netdata] = (i, data)
+            except Exception as e:
+                results[i] = ModbusDriverError(e)
+
+        max_length = self.back.max_registers_by_write // \
+            self.back.register_nb_by_netdata
+        for first, run in netdata_ranges(by_netdata.keys(), max_length):
+            try:
+                self.back.write_netdata_range(
+                    first, [by_netdata[nd][1] for nd in run],
+                    [nd.fmt for nd in run])
+            except Exception as e:
+                for nd in run:
+                    results[by_netdata[nd][0]] = ModbusDriverError(e)
+
+        for i in others:
+            try:
+                self[pairs[i][0]] = pairs[i][1]
+            except Exception as e:
+                results[i] = e if isinstance(e, ModbusDriverError) \
+                    else ModbusDriverError(e)
+
+        return results
+
     def __getitem__(self, key):
         try:
             if len(key.split(':')) == 2:
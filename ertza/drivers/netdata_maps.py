@@ -6,6 +6,27 @@ _n = namedtuple('netdata', ['addr', 'fmt'])
 _p = namedtuple('parameter', ['netdata', 'start', 'vtype', 'mode'])
 
 
+def netdata_ranges(netdata, max_length=None):
+    """
+    Split netdata into runs of contiguous addresses.
+
+    Returns a list of (first address, [netdata, ...]) tuples. Runs are
+    limited to max_length netdata.
+    """
+
+    ranges = []
+    for nd in sorted(set(netdata), key=lambda n: n.addr):
+        if ranges:
+            first, run = ranges[-1]
+            if nd.addr == run[-1].addr + 1 and \
+                    (max_length is None or len(run) < max_length):
+                run.append(nd)
+                continue
+        ranges.append((nd.addr, [nd]))
+
+    return ranges
+
+
 _mfe100 = {
     'status':               _n(0, 'pad:24,bool,bool,bool,bool,'
                                'bool,bool,bool,bool'),
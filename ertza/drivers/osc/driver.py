@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
-import liblo as lo
 import logging
+import socket
 from threading import Event
 from threading import Timer
 from threading import Lock
@@ -14,13 +14,16 @@ from ..exceptions import AbstractDriverError
 from ...machine.slave import SlaveRequest
 from ...processors.osc import OscAddress, OscMessage
 
-from ...async_utils import coroutine
+from ...async_utils import coroutine, LockedCoroutine
 
 logging = logging.getLogger('ertza.driver.osc')
 
 
 class OscDriver(AbstractDriver):
 
+    # One UDP socket shared by every slave driver
+    _socket = None
+
     def __init__(self, config, machine):
         self.target_address = config.get("target_address")
         self.target_port = int(config.get("target_port"))
@@ -40,9 +43,17 @@ class OscDriver(AbstractDriver):
         self.fault_event = Event()
         self.timeout_event = OscDriverTimeout.timeout_event
 
+    @classmethod
+    def get_socket(cls):
+        if cls._socket is None:
+            cls._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        return cls._socket
+
     def init_pipes(self):
-        self.outlet = self.gen_future(self._send(), self.gen_timeout_timer())
-        self.inlet = self.inlet_pipe(self.update_latency())
+        # Shared by the processor threads and the slave machine threads
+        self.outlet = LockedCoroutine(
+            self.gen_future(self._send(), self.gen_timeout_timer()))
+        self.inlet = LockedCoroutine(self.inlet_pipe(self.update_latency()))
 
     def connect(self):
         self.init_pipes()
@@ -111,7 +122,8 @@ class OscDriver(AbstractDriver):
                 if not request.uuid:
                     request.uuid = uuid.uuid4().hex
 
-                timer = Timer(self.timeout, self.timeout_cb, args=(request,))
+                timer = Timer(request.poll_timeout or self.timeout,
+                              self.timeout_cb, args=(request,))
                 with self._timers_lock:
                     self._timeout_timers[request.uuid] = timer
                 timer.start()
@@ -175,9 +187,13 @@ class OscDriver(AbstractDriver):
     def timeout_cb(self, request):
         request.exception = OscDriverTimeout('Timeout', request)
         request.timeout = True
-        self.timeout_event.set()
-        logging.error('Timeout for request {!s}'.format(request))
-        self._timeout_timers.pop(request.uuid, None)
+        if request.poll_timeout:
+            logging.debug('Timeout for poll {!s}'.format(request))
+        else:
+            self.timeout_event.set()
+            logging.error('Timeout for request {!s}'.format(request))
+        with self._timers_lock:
+            self._timeout_timers.pop(request.uuid, None)
         orphan_future = self._waiting_futures.pop(request.uuid, None)
         if orphan_future:
             logging.debug('Removed orphan future: {!s}'.format(orphan_future))
@@ -203,6 +219,7 @@ class OscDriver(AbstractDriver):
 
             if block:
                 return self.wait_for_reply(rq)
+            return rq
 
         except OscDriverError as e:
             logging.error(e)
@@ -239,8 +256,8 @@ class OscDriver(AbstractDriver):
                         raise ValueError('Unable to guess path from request')
 
                 m = self.message(path, request.uuid, *request.args)
-                m.receiver = self.target
-                lo.send((m.receiver.hostname, m.receiver.port), m.message)
+                self.get_socket().sendto(
+                    m.encode(), (self.target.hostname, self.target.port))
             except OSError as e:
                 raise OscDriverError(str(e), request)
 
@@ -8,25 +8,26 @@ import os
 import os.path
 import sys
 import signal
+import time
+from contextlib import contextmanager
 from threading import Thread
 import queue
 
+_import_start = time.perf_counter()
+
 from .configparser import ConfigParser, ProfileError
 from .machine import Machine
 from .machine import AbstractMachineError
 
 from .dispatch import Dispatcher
+from .events import EventLogger
 
 from .processors import OscProcessor, SerialProcessor
 
-from .processors.osc.server import OscServer
-from .processors.serial.server import SerialServer
-from .processors.serial.message import SerialCommandString
-
 from .commands import OscCommand, SerialCommand
 
 from .pwm import PWM
-from .thermistor import Thermistor
+from .thermistor import Thermistor, ADCSampler
 
 from .fan import Fan
 from .switch import Switch, SwitchException
@@ -35,6 +36,8 @@ from .led import Led
 
 from .network_utils import EthernetInterface
 
+_import_time = time.perf_counter() - _import_start
+
 version = '0.1.0~Siderunner'
 
 _DEFAULT_CONF = '/etc/ertza/default.conf'
@@ -51,6 +54,34 @@ logger.addHandler(console_logger)
 console_logger.setFormatter(console_formatter)
 
 
+class StartupProfile(object):
+    '''
+    Time spent in each startup phase.
+    '''
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = [('imports', _import_time)]
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self):
+        if not self.enabled:
+            return
+
+        logger.info('Startup profile:')
+        for name, duration in self.phases:
+            logger.info('  {:<20} {:8.1f} ms'.format(name, duration * 1000))
+        logger.info('  {:<20} {:8.1f} ms'.format(
+            'total', sum(d for n, d in self.phases) * 1000))
+
+
 class Ertza(object):
     '''
     Main class for ertza.
@@ -64,6 +95,36 @@ class Ertza(object):
         logger.setLevel(15)
         logger.info('Ertza initializing. Version: {}'.format(version))
 
+        self.profile = StartupProfile(kwargs.get('startup_profile', False))
+        with self.profile.phase('config'):
+            self._init_config(**kwargs)
+
+        with self.profile.phase('network'):
+            self._config_network()
+
+        with self.profile.phase('driver'):
+            self.machine.init_driver()
+
+        with self.profile.phase('peripherals'):
+            self._config_thermistors()
+            self._config_fans()
+
+            if not self.machine.config.get('switches', 'disable',
+                                           fallback=False):
+                self._config_external_switches()
+
+        # Create dispatcher
+        self.machine.dispatcher = Dispatcher()
+
+        if not self.machine.config.get('osc', 'disable', fallback=False):
+            with self.profile.phase('osc'):
+                self._config_osc()
+
+        if not self.machine.config.get('serial', 'disable', fallback=False):
+            with self.profile.phase('serial'):
+                self._config_serial()
+
+    def _init_config(self, **kwargs):
         machine = Machine()
         self.machine = machine
         machine.version = version
@@ -93,12 +154,17 @@ class Ertza(object):
             logger.setLevel(level)
             logger.info('Log level set to {}'.format(level))
 
+        # Debug events sampling: SUBSYSTEM:N, log one event in N
+        for s in self.machine.config.get('system', 'event_sampling',
+                                         fallback='').split():
+            subsystem, n = s.rsplit(':', maxsplit=1)
+            EventLogger.set_sampling(subsystem, int(n))
+
         machine.cape_infos = machine.config.find_cape('ARMAZCAPE')
 
         if machine.cape_infos:
             name = machine.cape_infos['name']
             logger.info('Found cape {} with S/N {}'.format(name, machine.serialnumber))
-            SerialCommandString.SerialNumber = machine.serialnumber
 
         machine.config.load_variant()
         try:
@@ -106,6 +172,8 @@ class Ertza(object):
         except ProfileError as e:
             logger.info('Unable to load profile: {!s}'.format(e))
 
+    def _config_network(self):
+        machine = self.machine
         try:
             i = machine.config.get('machine', 'interface', fallback='eth1')
             logger.info('Configuring {} interface'.format(i))
@@ -136,42 +204,52 @@ class Ertza(object):
         except IndexError:
             logger.warn('No IP address found')
 
-        machine.init_driver()
-
-        self._config_thermistors()
-        self._config_fans()
+    def _config_osc(self):
+        machine = self.machine
+        dispatcher = machine.dispatcher
+
+        # Transports are only imported when enabled
+        backend = machine.config.get('osc', 'backend', fallback='liblo')
+        if backend == 'asyncio':
+            from .processors.osc.aioserver import AsyncOscServer as OscServer
+        else:
+            from .processors.osc.server import OscServer
+        logger.info('Using {} OSC backend'.format(backend))
+
+        ident = OscServer.identifier
+        osc_conf = machine.config['osc'] \
+            if machine.config.has_section('osc') else None
+        server = OscServer(dispatcher.inlet, osc_conf)
+        server.admission.is_trusted = machine.is_peer
+        dispatcher.add_processor(OscProcessor(dispatcher.outlet))
+        dispatcher.add_server(server)
+        OscProcessor.outlet = dispatcher.outlet(ident)
+        OscCommand.machine = machine
+
+    def _config_serial(self):
+        machine = self.machine
+        dispatcher = machine.dispatcher
+
+        from .processors.serial.server import SerialServer
+        from .processors.serial.message import SerialCommandString
 
-        if not machine.config.get('switches', 'disable', fallback=False):
-            self._config_external_switches()
+        if machine.cape_infos:
+            SerialCommandString.SerialNumber = machine.serialnumber
 
-        # Create dispatcher
-        dispatcher = Dispatcher()
-
-        if not machine.config.get('osc', 'disable', fallback=False):
-            ident = OscServer.identifier
-            osc_conf = machine.config['osc'] \
-                if machine.config.has_section('osc') else None
-            dispatcher.add_processor(OscProcessor(dispatcher.outlet))
-            dispatcher.add_server(OscServer(dispatcher.inlet, osc_conf))
-            OscProcessor.outlet = dispatcher.outlet(ident)
-            OscCommand.machine = machine
-
-        if not machine.config.get('serial', 'disable', fallback=False):
-            ident = SerialServer.identifier
-            serial_conf = machine.config['serial'] \
-                if machine.config.has_section('serial') else None
-            dispatcher.add_processor(SerialProcessor(dispatcher.outlet))
-            dispatcher.add_server(SerialServer(dispatcher.inlet, serial_conf))
-            SerialProcessor.outlet = dispatcher.outlet(ident)
-            SerialCommand.machine = machine
-
-        self.machine.dispatcher = dispatcher
+        ident = SerialServer.identifier
+        serial_conf = machine.config['serial'] \
+            if machine.config.has_section('serial') else None
+        dispatcher.add_processor(SerialProcessor(dispatcher.outlet))
+        dispatcher.add_server(SerialServer(dispatcher.inlet, serial_conf))
+        SerialProcessor.outlet = dispatcher.outlet(ident)
+        SerialCommand.machine = machine
 
     def start(self):
         ''' Start the processes '''
         self.running = True
 
-        self.machine.start()
+        with self.profile.phase('machine start'):
+            self.machine.start()
 
         try:
             if self.machine.switches is not None:
@@ -181,20 +259,26 @@ class Ertza(object):
             logger.error('Error while starting switch thread: {!s}'.format(e))
             sys.exit(1)
 
-        self.machine.dispatcher.start()
+        with self.profile.phase('dispatcher start'):
+            self.machine.dispatcher.start()
 
-        try:
-            self.machine.load_startup_mode()
-        except AbstractMachineError as e:
-            logger.error(str(e))
+        with self.profile.phase('startup mode'):
+            try:
+                self.machine.load_startup_mode()
+            except AbstractMachineError as e:
+                logger.error(str(e))
 
         Led.set_status_leds('blink', 50)
 
         logger.info('Ertza ready')
+        self.profile.report()
 
     def exit(self):
         self.machine.exit()
 
+        if self.machine.adc_sampler is not None:
+            self.machine.adc_sampler.stop()
+
         self.running = False
 
         for f in self.machine.fans:
@@ -206,7 +290,9 @@ class Ertza(object):
 
         # Get available thermistors
         self.machine.thermistors = []
+        self.machine.adc_sampler = None
         if self.machine.config.getboolean('thermistors', 'got_thermistors'):
+            channels = []
             th_p = 0
 
             while self.machine.config.has_option('thermistors',
@@ -216,10 +302,24 @@ class Ertza(object):
                     'thermistors', 'port_{}'.format(th_n)))
                 therm = Thermistor(adc_channel, th_n)
                 self.machine.thermistors.append(therm)
+                channels.append(adc_channel)
                 logger.debug('Found thermistor {} at ADC channel {}'
                              .format(th_n, adc_channel))
                 th_p += 1
 
+            # All thermistors are read by a single sampler
+            sampler = ADCSampler(
+                channels,
+                interval=float(self.machine.config.get(
+                    'thermistors', 'sample_interval', fallback=1)),
+                oversampling=int(self.machine.config.get(
+                    'thermistors', 'oversampling', fallback=5)))
+            Thermistor.lut()
+            sampler.start()
+            for therm in self.machine.thermistors:
+                therm.sampler = sampler
+            self.machine.adc_sampler = sampler
+
     def _config_fans(self):
         self.machine.fans = []
 
@@ -244,7 +344,6 @@ class Ertza(object):
             f.set_value(1)
 
         th_cf = self.machine.config['thermistors']
-        tw_cf = self.machine.config['temperature_watchers']
 
         # Connect fans to thermistors
         if self.machine.fans:
@@ -252,8 +351,9 @@ class Ertza(object):
 
             for t, therm in enumerate(self.machine.thermistors):
                 for f, fan in enumerate(self.machine.fans):
-                    if tw_cf.getboolean('connect_TH{}_to_F{}'.format(t, f),
-                                        fallback=False):
+                    if self.machine.config.getboolean(
+                            'temperature_watchers',
+                            'connect_TH{}_to_F{}'.format(t, f), fallback=False):
                         tw = TempWatcher(therm, fan,
                                          'TempWatcher-{}-{}'.format(t, f))
                         tw.set_target_temperature(float(
@@ -331,6 +431,8 @@ def main(parent_args=None):
 
     parser = argparse.ArgumentParser(prog='ertza')
     parser.add_argument('--config', nargs=1, help='use CONFIG as custom config file')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='report time spent in each startup phase')
 
     if parent_args:
         args, args_remaining = parser.parse_known_args(parent_args)
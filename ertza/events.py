@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+Structured debug events for hot paths.
+
+    events = EventLogger('ertza.processors.osc.server')
+    events.debug('received', message=m, sender=m.sender)
+
+The level is checked before anything else, and the event is only formatted
+as 'received message=... sender=...' if a handler emits the record, so a
+disabled event costs a level check. Subsystems can be sampled to log one
+event in N of each kind, see :meth:`EventLogger.set_sampling`.
+"""
+
+import logging
+from logging import DEBUG, INFO
+from threading import Lock
+
+
+class _Event(object):
+    __slots__ = ('name', 'fields')
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __str__(self):
+        if not self.fields:
+            return self.name
+        return '{} {}'.format(self.name, ' '.join(
+            '{}={!s}'.format(k, v) for k, v in sorted(self.fields.items())))
+
+
+class EventLogger(object):
+    # {subsystem: N}, log one event in N in subsystem and its children
+    Sampling = {}
+
+    def __init__(self, name):
+        self.name = name
+        self.logger = logging.getLogger(name)
+        self._counts = {}
+        self._counts_lock = Lock()
+
+    @classmethod
+    def set_sampling(cls, subsystem, n):
+        """
+        Log one event in n of each kind for loggers named subsystem or
+        subsystem.*. n <= 1 logs every event.
+        """
+
+        if n > 1:
+            cls.Sampling[subsystem] = int(n)
+        else:
+            cls.Sampling.pop(subsystem, None)
+
+    def _sample_rate(self):
+        rate, length = 1, -1
+        for subsystem, n in self.Sampling.items():
+            if len(subsystem) > length and (
+                    self.name == subsystem or
+                    self.name.startswith(subsystem + '.')):
+                rate, length = n, len(subsystem)
+        return rate
+
+    def _sampled(self, event):
+        rate = self._sample_rate()
+        if rate <= 1:
+            return True
+
+        # Events of a logger are logged from several threads
+        with self._counts_lock:
+            count = self._counts.get(event, 0)
+            self._counts[event] = count + 1
+        return count % rate == 0
+
+    def enabled(self, level=DEBUG):
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level, event, **fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        if self.Sampling and not self._sampled(event):
+            return
+        self.logger.log(level, _Event(event, fields))
+
+    def debug(self, event, **fields):
+        self.log(DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(INFO, event, **fields)
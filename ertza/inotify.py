@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+Minimal inotify binding through ctypes.
+
+    watcher = Inotify()
+    watcher.add_watch('/etc/ertza/profiles', IN_CLOSE_WRITE | IN_MOVED_TO)
+    for path, mask, name in watcher.read(timeout=1):
+        ...
+"""
+
+import os
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_IGNORED = 0x00008000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                            use_errno=True)
+        _libc.inotify_init1.argtypes = (ctypes.c_int,)
+        _libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p,
+                                            ctypes.c_uint32)
+        _libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+    return _libc
+
+
+def _error(path=None):
+    e = ctypes.get_errno()
+    return OSError(e, os.strerror(e), path)
+
+
+class Inotify(object):
+    # struct inotify_event: wd, mask, cookie, len, then name
+    Event = struct.Struct('iIII')
+
+    # Enough for 16 events with the longest names
+    read_size = 16 * (Event.size + 256)
+
+    def __init__(self):
+        self._libc = _load_libc()
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise _error()
+
+        self._watches = {}  # {wd: path}
+
+    def add_watch(self, path, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise _error(path)
+
+        self._watches[wd] = path
+        return wd
+
+    def rm_watch(self, wd):
+        self._watches.pop(wd, None)
+        if self._libc.inotify_rm_watch(self.fd, wd) < 0:
+            raise _error()
+
+    def read(self, timeout=None):
+        """
+        Wait up to timeout seconds for events and return them as a list of
+        (watched path, mask, file name) tuples.
+        """
+
+        r, _, _ = select.select((self.fd,), (), (), timeout)
+        if not r:
+            return []
+
+        try:
+            data = os.read(self.fd, self.read_size)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EINTR):
+                return []
+            raise
+
+        events = []
+        pos, size = 0, self.Event.size
+        while pos + size <= len(data):
+            wd, mask, cookie, length = self.Event.unpack_from(data, pos)
+            pos += size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b'\0'))
+            pos += length
+
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            events.append((self._watches.get(wd), mask, name))
+
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
@@ -1,6 +1,9 @@
 from .abstract_machine import AbstractMachine
 from .machine import Machine
 from .slave import Slave, SlaveMachine, SlaveRequest, SlaveKey
+from .mirror import SlaveTelemetryMirror
+from .subscriptions import TelemetrySubscriptions
+from .sync import SyncBarrier
 
 from .exceptions import AbstractMachineError
 from .exceptions import AbstractMachineTimeoutError, AbstractMachineFatalError
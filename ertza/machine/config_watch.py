@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+import os
+import logging
+from threading import Thread, Event
+
+from ..inotify import Inotify, IN_CLOSE_WRITE, IN_MOVED_TO
+
+logging = logging.getLogger('ertza.machine.config_watch')
+
+
+class ConfigWatcher(object):
+    """
+    Reload the loaded variant and profile when their file is written and
+    push the drive parameters it changes.
+
+    Drive parameters are compared on the values sent to the drive, so a
+    change of a limit or a coefficient pushes the parameters it affects.
+    Changed parameters are written in one set_many call, from the watcher
+    thread.
+    """
+
+    # Wait for other writes after the first event, editors often write twice
+    settle_time = 0.1
+
+    def __init__(self, machine, paths):
+        self.machine = machine
+        self.paths = paths
+
+        self._inotify = None
+        self._thread = None
+        self._running_event = Event()
+
+    def start(self):
+        self._inotify = Inotify()
+        for path in self.paths:
+            try:
+                self._inotify.add_watch(path, IN_CLOSE_WRITE | IN_MOVED_TO)
+            except OSError as e:
+                logging.warn('Unable to watch {}: {!s}'.format(path, e))
+
+        self._running_event.clear()
+        self._thread = Thread(target=self._loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    exit = stop
+
+    def drive_values(self):
+        """
+        Return {key: value sent to the drive} of drive parameters.
+        """
+
+        frontend = self.machine.driver.frontend
+        values = {}
+        for k in frontend.DRIVE_KEYS:
+            try:
+                values[k] = frontend.output_value(k, frontend[k])
+            except Exception as e:
+                logging.error('Unable to compute {}: {!s}'.format(k, e))
+        return values
+
+    def reload(self, files):
+        """
+        Reload files (paths), push changed drive parameters and return them
+        as a list of keys.
+        """
+
+        before = self.drive_values()
+        if not any([self.machine.config.reload_file(f) for f in files]):
+            return []
+
+        after = self.drive_values()
+        changed = [k for k in sorted(after) if before.get(k) != after[k]]
+        if not changed:
+            return []
+
+        frontend = self.machine.driver.frontend
+        results = self.machine.driver.set_many(
+            [(k, frontend[k]) for k in changed])
+        for k, r in zip(changed, results):
+            if r is not None:
+                logging.error('Unable to push {}: {!s}'.format(k, r))
+
+        logging.info('Pushed {}'.format(', '.join(changed)))
+        return changed
+
+    def _loop(self):
+        while not self._running_event.is_set():
+            try:
+                events = self._inotify.read(timeout=0.5)
+                if not events:
+                    continue
+
+                # Gather the writes following the first one
+                while not self._running_event.is_set():
+                    more = self._inotify.read(timeout=self.settle_time)
+                    if not more:
+                        break
+                    events += more
+
+                files = {os.path.join(path, name) for path, mask, name
+                         in events if path and name.endswith('.conf')}
+                if files:
+                    self.reload(sorted(files))
+            except Exception as e:
+                logging.error('Error while reloading config: {!s}'.format(e))
@@ -1,17 +1,24 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import time
 from datetime import datetime
 import logging
+import uuid
 
-from threading import Event, Thread
+from threading import Event, Thread, Lock
 
 from .abstract_machine import AbstractMachine
 from .slave import Slave, SlaveMachine, SlaveRequest
+from .mirror import SlaveTelemetryMirror
+from .subscriptions import TelemetrySubscriptions
+from .sync import SyncBarrier
+from .config_watch import ConfigWatcher
 
 from .modes import StandaloneMachineMode
 from .modes import MasterMachineMode
 from .modes import SlaveMachineMode
+from .modes.abstract_machinemode import MachineModeException
 
 from ..drivers import Driver
 from ..drivers import AbstractDriverError
@@ -22,13 +29,13 @@ from .exceptions import SlaveMachineError, SlaveMachineFatalError
 from .exceptions import MachineTimeoutError, SlaveMachineTimeoutError
 
 
-from ..drivers.utils import retry
-
 from ..configparser import parameter as _p
 
 from ..async_utils import Channel
+from ..events import EventLogger
 
 logging = logging.getLogger('ertza.machine')
+events = EventLogger('ertza.machine')
 
 OPERATING_MODES = ('standalone', 'master', 'slave')
 
@@ -52,8 +59,15 @@ class Machine(AbstractMachine):
         self.leds = None
 
         self.slave_machines = {}
+        self.pending_slaves = {}
+        self.slave_ping_interval = 0.5
         self.slaves_channel = Channel('slave_machines')
         self.slave_refresh_interval = None
+        self.slaves_mirror = None
+        self.subscriptions = None
+        self.config_watcher = None
+        self.sync_barrier = SyncBarrier()
+        self.sync_margin = 0.005
 
         self.switch_callback = self._switch_cb
         self.switch_states = {}
@@ -80,6 +94,12 @@ class Machine(AbstractMachine):
         self._slaves_running_event = Event()
         self._slaves_timeout_event = SlaveMachineTimeoutError.timeout_event
         self._slaves_fatal_event = SlaveMachineFatalError.fatal_event
+        self._slaves_bringup_event = Event()
+        self._late_join_thread = None
+        # Guards slave_machines, pending_slaves and _bringing_up, which are
+        # changed by the bring up and late join threads
+        self._slaves_lock = Lock()
+        self._bringing_up = set()
 
         self._last_command_time = datetime.now()
 
@@ -111,6 +131,30 @@ class Machine(AbstractMachine):
         self.driver.connect()
 
         self.driver.send_default_values()
+        self.start_subscriptions()
+        self.start_config_watcher()
+
+        self.sync_margin = float(self.config.get('slaves', 'sync_margin',
+                                                 fallback=0.005))
+
+    def start_subscriptions(self):
+        ttl = float(self.config.get('machine', 'subscription_ttl', fallback=10))
+        max_rate = float(self.config.get('machine', 'subscription_max_rate',
+                                         fallback=50))
+
+        self.subscriptions = TelemetrySubscriptions(self, ttl, max_rate)
+        self.subscriptions.start()
+
+    def start_config_watcher(self):
+        if not self.config.getboolean('machine', 'config_watch', fallback=True):
+            return
+
+        try:
+            self.config_watcher = ConfigWatcher(self, self.config.watch_paths())
+            self.config_watcher.start()
+        except OSError as e:
+            self.config_watcher = None
+            logging.warn('Unable to watch config files: {!s}'.format(e))
 
     def start_slaves_loop(self):
         if self._slaves_thread is not None:
@@ -124,14 +168,48 @@ class Machine(AbstractMachine):
 
         self._slaves_thread.start()
 
+    def start_slaves_mirror(self):
+        if self.config.getboolean('slaves', 'telemetry_disable', fallback=False):
+            return
+
+        if self.slaves_mirror is not None:
+            self.slaves_mirror.stop()
+
+        keys = self.config.get('slaves', 'telemetry_keys', fallback=None)
+        keys = keys.split() if keys else None
+        interval = float(self.config.get('slaves', 'telemetry_interval',
+                                         fallback=1.0))
+        timeout = float(self.config.get('slaves', 'telemetry_timeout',
+                                        fallback=0.5))
+
+        self.slaves_mirror = SlaveTelemetryMirror(self, keys, interval, timeout)
+        self.slaves_mirror.start()
+
     def exit(self):
+        if self.subscriptions is not None:
+            self.subscriptions.stop()
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+
         self.driver.exit()
         self._running_event.set()
+        self._slaves_bringup_event.set()
 
         if self.master_mode:
-            for s in self.slave_machines.values():
+            if self.slaves_mirror is not None:
+                self.slaves_mirror.stop()
+
+            with self._slaves_lock:
+                slaves = list(self.slave_machines.values())
+                pending = list(self.pending_slaves.values())
+
+            for s in slaves:
                 s.exit()
 
+            for s in pending:
+                if s.driver is not None:
+                    s.exit()
+
         self.dispatcher.exit()
 
     def load_startup_mode(self):
@@ -155,7 +233,7 @@ class Machine(AbstractMachine):
             self.send_message(command.protocol, command.answer)
 
     def send_message(self, msg):
-        self.dispatcher[msg.protocol].send_message(msg)
+        self.dispatcher.servers[msg.protocol].send_message(msg)
 
     @property
     def machine_keys(self):
@@ -236,52 +314,170 @@ class Machine(AbstractMachine):
         if not slaves:
             return False
 
-        self.slave_machines = {}
+        slave_machines = {}
         for s in slaves:
             sm = SlaveMachine(s)
-            self.slave_machines[(s.serialnumber, s.address)] = sm
+            slave_machines[(s.serialnumber, s.address)] = sm
 
-        return self.slave_machines
+        with self._slaves_lock:
+            self.slave_machines = slave_machines
+        return slave_machines
 
-    @retry(SlaveMachineError, 20, 10, 1.5)
-    def slave_block_ping(self, sm):
-        p = sm.ping()
-        if isinstance(p, SlaveRequest):
-            raise SlaveMachineError('Unable to ping slave: {!s} !'.format(sm))
+    def bring_up_slave(self, sm, deadline):
+        """
+        Initialize, ping and verify the S/N of *sm*.
 
-        if isinstance(p, float):
-            return p
-        else:
+        Ping is retried until the slave answers or *deadline* (a time.time()
+        value) is reached.
+
+        :returns: The ping time in ms
+        :raises AbstractMachineError: if the slave cannot be brought up
+        """
+
+        if sm.driver is None:
+            self.init_slave(sm)
+
+        wait = self.slave_ping_interval
+        while True:
+            try:
+                ping_time = sm.ping()
+                break
+            except SlaveMachineError as e:
+                if time.time() + wait > deadline:
+                    raise SlaveMachineError('No answer before deadline: '
+                                            '{!s}'.format(e))
+                if self._slaves_bringup_event.wait(wait):
+                    raise SlaveMachineError('Bring up aborted')
+                wait = min(wait * 1.5, 5)
+
+        if not isinstance(ping_time, float):
             raise MachineError('Unexpected result while pinging: {!s}'.format(sm))
 
-    @retry(AbstractMachineError, 5, 5, 2)
+        reply = sm.get('serialnumber', block=True)
+        try:
+            sn = reply.args[2]
+        except (AttributeError, IndexError):
+            sn = None
+
+        if isinstance(sn, str) and sm.serialnumber != sn:
+            infos = sm.slave + (sn,)
+            raise MachineError('S/N don\'t match for {2} slave '
+                               'at {1} ({0} vs {5})'.format(*infos))
+
+        return ping_time
+
+    def _claim_bring_up(self, key):
+        """
+        Return True if no bring up of the slave at key is running, in which
+        case the caller must call _release_bring_up(key) once done.
+        """
+
+        with self._slaves_lock:
+            if key in self._bringing_up:
+                return False
+            self._bringing_up.add(key)
+            return True
+
+    def _release_bring_up(self, key):
+        with self._slaves_lock:
+            self._bringing_up.discard(key)
+
+    def _bring_up_worker(self, key, sm, deadline, results):
+        if not self._claim_bring_up(key):
+            results[key] = (False, SlaveMachineError('Already bringing up'))
+            return
+
+        logging.debug('Initializing {2} slave at {1} ({0})'.format(*sm.slave))
+        try:
+            ping_time = self.bring_up_slave(sm, deadline)
+            results[key] = (True, ping_time)
+        except AbstractMachineError as e:
+            results[key] = (False, e)
+        except Exception as e:
+            logging.exception(e)
+            results[key] = (False, e)
+        finally:
+            self._release_bring_up(key)
+
     def load_slaves(self):
+        """
+        Bring up all configured slaves concurrently.
+
+        Slaves that don't answer before ``slaves:startup_timeout`` are kept
+        pending and admitted later by a background thread.
+
+        :returns: A dict of {(serialnumber, address): (success, ping time or exception)}
+        """
+
         if not self.slave_machines:
             if not self.search_slaves():
                 logging.info('No slaves found')
                 return
 
-        for sm in self.slave_machines.values():
-            logging.debug('Initializing {2} slave at {1} ({0})'.format(*sm.slave))
-            try:
-                self.init_slave(sm)
-                ping_time = self.slave_block_ping(sm)
-                logging.info('Slave at {2} took {0:.2f} ms to respond'.format(
-                    ping_time, *sm.slave))
-            except AbstractMachineError as e:
-                logging.error('Unable to contact {3} slave at {2} ({1}) '
-                              '{0}'.format(str(e), *sm.slave))
-                raise e
-
-            sn = sm.get('serialnumber', block=True)
-            if type(sn) == str and sm.serialnumber != sn:
-                infos = sm.slave + (sm.get_serialnumber(),)
-                raise MachineError('S/N don\'t match for {2} slave '
-                                   'at {1} ({0} vs {4})'.format(*infos))
+        timeout = float(self.config.get('slaves', 'startup_timeout', fallback=30))
+        deadline = time.time() + timeout
+        self._slaves_bringup_event.clear()
+
+        with self._slaves_lock:
+            slaves = list(self.slave_machines.items())
+
+        results = {}
+        threads = []
+        for key, sm in slaves:
+            t = Thread(target=self._bring_up_worker,
+                       args=(key, sm, deadline, results))
+            t.daemon = True
+            t.start()
+            threads.append(t)
 
+        for t in threads:
+            t.join(max(deadline - time.time(), 0) + self.slave_ping_interval)
+
+        for key, sm in slaves:
+            ok, res = results.get(key, (False, 'timeout'))
+            if ok:
+                logging.info('Slave at {2} took {0:.2f} ms to respond'.format(
+                    res, *sm.slave))
+                self._admit_slave(sm)
             else:
-                sm.start()
-                self.slaves_channel.suscribe(sm.outlet)
+                # A worker still running keeps its claim, the late join loop
+                # won't bring the slave up at the same time
+                logging.error('Unable to bring up {3} slave at {2} ({1}): '
+                              '{0!s}'.format(res, *sm.slave))
+                with self._slaves_lock:
+                    self.pending_slaves[key] = self.slave_machines.pop(key)
+                results[key] = (False, res)
+
+        with self._slaves_lock:
+            up, pending = len(self.slave_machines), len(self.pending_slaves)
+        logging.info('{} slaves up, {} pending'.format(up, pending))
+
+        if pending:
+            self.start_late_join_loop()
+
+        return results
+
+    def start_late_join_loop(self):
+        if self._late_join_thread is not None and self._late_join_thread.is_alive():
+            return
+
+        self._late_join_thread = Thread(target=self._late_join_loop)
+        self._late_join_thread.daemon = True
+        self._late_join_thread.start()
+
+    def _admit_slave(self, sm):
+        sm.start()
+        key = (sm.serialnumber, sm.slave.address)
+        with self._slaves_lock:
+            self.pending_slaves.pop(key, None)
+            self.slave_machines[key] = sm
+        self.slaves_channel.suscribe(sm.outlet)
+
+        if self.master_mode:
+            sm.enslave()
+            with self._slaves_lock:
+                self.machine_keys._slv_config.update_slave_configs(
+                    self.slave_machines)
 
     def add_slave(self, driver, address, mode, conf={}):
         self._check_operating_mode()
@@ -318,16 +514,31 @@ class Machine(AbstractMachine):
 
             sm.unslave()
             sm.exit()
-            self.slave_machines.pop((sm.slave.serialnumber, sm.slave.address))
+            with self._slaves_lock:
+                self.slave_machines.pop((sm.slave.serialnumber,
+                                         sm.slave.address))
         except Exception as e:
             raise MachineError('Unable to remove slave: %s' % str(e))
 
+    def is_peer(self, hostname):
+        """
+        Return True if hostname is the master or one of the slaves.
+        """
+
+        if hostname == self.master:
+            return True
+        with self._slaves_lock:
+            keys = list(self.slave_machines.keys())
+        return any(hostname == ad for sn, ad in keys)
+
     def get_slave(self, serialnumber=None, address=None):
-        for sn, ad in self.slave_machines.keys():
+        with self._slaves_lock:
+            slaves = list(self.slave_machines.items())
+        for (sn, ad), sm in slaves:
             if serialnumber == sn:
-                return self.slave_machines[(sn, ad)]
+                return sm
             elif address == ad:
-                return self.slave_machines[(sn, ad)]
+                return sm
         else:
             if serialnumber is not None:
                 logging.error('Unable to find slave by S/N {}'.format(serialnumber))
@@ -400,7 +611,7 @@ class Machine(AbstractMachine):
             self._machine_keys = StandaloneMachineMode(self)
             self.operating_mode = mode
         elif mode == 'master':
-            if not self.slave_machines:
+            if not self.slave_machines and not self.pending_slaves:
                 raise MachineError('No slaves found')
 
             for s in self.slave_machines.values():
@@ -410,6 +621,7 @@ class Machine(AbstractMachine):
             self.operating_mode = mode
 
             self.start_slaves_loop()
+            self.start_slaves_mirror()
         elif mode == 'slave':
             if not self.master:
                 raise MachineError('No master specified')
@@ -446,6 +658,83 @@ class Machine(AbstractMachine):
 
         return self.machine_keys[key]
 
+    def get_many(self, keys):
+        """
+        Return values of keys, in order. Keys that can't be read are
+        returned as exceptions.
+        """
+
+        keys = [k.split(':', maxsplit=1)[1] if k.startswith('machine:') else k
+                for k in keys]
+        return self.machine_keys.get_many(keys)
+
+    def sync_set(self, *pairs):
+        """
+        Set keys (key, value, key, value, ...) at the same time on this
+        machine and, in master mode, on all slaves.
+
+        Keys are first armed on every slave. Once all slaves answered, they
+        are released with a delay compensating the latency of each slave.
+
+        :returns: The delay between the call and the release, in seconds
+        :raises MachineError: if a slave could not be armed
+        """
+
+        if len(pairs) % 2 or not pairs:
+            raise ValueError('Expected key value pairs')
+
+        pairs = [(k[8:] if k.startswith('machine:') else k, v)
+                 for k, v in zip(pairs[0::2], pairs[1::2])]
+        token = uuid.uuid4().hex
+        start = time.monotonic()
+
+        if self.master_mode:
+            with self._slaves_lock:
+                slaves = list(self.slave_machines.values())
+        else:
+            slaves = []
+        requests = []
+        for sm in slaves:
+            args = [token]
+            for k, v in pairs:
+                try:
+                    nv = self.machine_keys.get_value_for_slave(sm, k, v)
+                except (AbstractMachineError, MachineModeException) as e:
+                    logging.error('Unable to compute {} for {!s}: {!s}'
+                                  .format(k, sm, e))
+                    nv = None
+                args += [k, nv if nv is not None else v]
+
+            rq = SlaveRequest(*args, path='/slave/sync/arm', event=Event())
+            sm.driver.outlet.send(rq)
+            requests.append((sm, rq))
+
+        deadline = time.monotonic() + max(
+            [sm.timeout for sm in slaves] or [0])
+        for sm, rq in requests:
+            if not rq.event.wait(max(deadline - time.monotonic(), 0)) or \
+                    rq.exception is not None:
+                raise MachineError('Unable to arm sync on {!s}: {!s}'
+                                   .format(sm, rq.exception or 'timeout'))
+
+        # Latency is refreshed by the arm replies
+        one_way = [(sm, (sm.latency or 0) / 2) for sm in slaves]
+        at = time.monotonic() + self.sync_margin + \
+            max([l for sm, l in one_way] or [0])
+
+        for sm, l in one_way:
+            delay = at - time.monotonic() - l
+            sm.driver.outlet.send(SlaveRequest(
+                token, delay, path='/slave/sync/release'))
+
+        self.sync_barrier.arm(token, self._sync_set_local, pairs)
+        self.sync_barrier.release(token, at)
+        return at - start
+
+    def _sync_set_local(self, pairs):
+        for k, v in pairs:
+            self.set(k, v, tick=True)
+
     def set(self, key, *args, **kwargs):
         if key.startswith('machine:'):
             key = key.split(':', maxsplit=1)[1]
@@ -524,7 +813,7 @@ class Machine(AbstractMachine):
 
             t_delta = (datetime.now() - self._last_command_time).total_seconds()
 
-            logging.debug(t_delta)
+            events.debug('watchdog', t_delta=t_delta)
             if t_delta > self.slave_watchdog_timeout:
                 self._timeout_event.set()
                 self['command:enable'] = False
@@ -532,13 +821,41 @@ class Machine(AbstractMachine):
 
             self._running_event.wait(self.slave_watchdog_timeout)
 
+    def _late_join_loop(self):
+        interval = float(self.config.get('slaves', 'late_join_interval',
+                                         fallback=10))
+        while self.pending_slaves and \
+                not self._slaves_bringup_event.wait(interval):
+            with self._slaves_lock:
+                pending = list(self.pending_slaves.items())
+
+            for key, sm in pending:
+                if not self._claim_bring_up(key):
+                    continue    # Startup bring up still running
+
+                try:
+                    self.bring_up_slave(sm, time.time() + interval)
+                except AbstractMachineError as e:
+                    logging.debug('{3} slave at {2} ({1}) still missing: '
+                                  '{0!s}'.format(e, *sm.slave))
+                    continue
+                finally:
+                    self._release_bring_up(key)
+
+                self._admit_slave(sm)
+                logging.info('Late {2} slave at {1} ({0}) admitted'.format(
+                    *sm.slave))
+
     def _slaves_loop(self):
         while not self._slaves_running_event.is_set():
             if not self.slaves_channel:
                 logging.error('Missing channel for slaves')
 
+            with self._slaves_lock:
+                slaves = list(self.slave_machines.values())
+
             keys_to_send = []
-            for sm in self.slave_machines.values():
+            for sm in slaves:
                 for key in sm.forward_keys:
                     if key not in keys_to_send:
                         keys_to_send.append(key)
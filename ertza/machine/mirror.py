@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+from threading import Thread, Event, Lock
+
+from .exceptions import SlaveMachineError
+
+logging = logging.getLogger('ertza.machine.mirror')
+
+
+class SlaveTelemetryMirror(object):
+    """
+    Keep a local copy of slaves telemetry on the master.
+
+    Keys are polled in batches from every slave (all requests of a batch are
+    sent before waiting for any reply) or pushed by the slaves themselves.
+    Values are stored in a per-slave table with the time they were received,
+    so clients can read them without going through the control path.
+    """
+
+    DefaultKeys = (
+        'status:drive_enable',
+        'status:drive_ready',
+        'error_code',
+        'velocity',
+        'position',
+        'torque',
+        'drive_temp',
+    )
+
+    def __init__(self, machine, keys=None, interval=1.0, timeout=0.5):
+        self.machine = machine
+        self.keys = tuple(keys) if keys else self.DefaultKeys
+        self.interval = interval
+        self.timeout = timeout
+
+        self._table = {}
+        self._lock = Lock()
+
+        self._thread = None
+        self._running_event = Event()
+
+    def start(self):
+        if self._thread is not None:
+            self.stop()
+
+        self._running_event.clear()
+        self._thread = Thread(target=self._poll_loop)
+        self._thread.daemon = True
+        self._thread.start()
+        logging.info('Slave telemetry mirror started ({} keys every {}s)'
+                     .format(len(self.keys), self.interval))
+
+    def stop(self):
+        self._running_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    exit = stop
+
+    def update(self, serialnumber, values, timestamp=None):
+        """
+        Store values (a dict of key: value) for the slave with *serialnumber*.
+        """
+
+        ts = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            table = self._table.setdefault(serialnumber, {})
+            for key, value in values.items():
+                table[key] = (value, ts)
+
+    def state(self, serialnumber=None):
+        """
+        Return a copy of the table: {serialnumber: {key: (value, timestamp)}}
+        """
+
+        with self._lock:
+            if serialnumber is not None:
+                return {serialnumber: dict(self._table.get(serialnumber, {}))}
+            return {sn: dict(t) for sn, t in self._table.items()}
+
+    def poll(self, slave_machine):
+        """
+        Send a get request for every mirrored key then collect the replies.
+
+        Polls time out after the mirror timeout. A missed poll leaves the
+        previous value, with its timestamp, and isn't a slave timeout.
+        """
+
+        requests = []
+        for key in self.keys:
+            try:
+                requests.append((key, slave_machine.get(
+                    key, poll_timeout=self.timeout)))
+            except SlaveMachineError as e:
+                logging.error('Unable to poll {} from {!s}: {!s}'
+                              .format(key, slave_machine, e))
+
+        deadline = time.time() + self.timeout
+        values = {}
+        for key, rq in requests:
+            if rq is None or rq.event is None:
+                continue
+
+            if not rq.event.wait(max(deadline - time.time(), 0)):
+                continue
+
+            if rq.exception is not None or rq.reply is None:
+                continue
+
+            if not rq.reply.path.endswith('/ok'):
+                continue
+
+            try:
+                uuid, dst, value = rq.reply.args[:3]
+                values[dst] = value
+            except ValueError:
+                logging.error('Malformed reply from {!s}: {!s}'
+                              .format(slave_machine, rq.reply))
+
+        if values:
+            self.update(slave_machine.serialnumber, values)
+
+        return values
+
+    def _poll_loop(self):
+        while not self._running_event.is_set():
+            for sm in list(self.machine.slave_machines.values()):
+                try:
+                    self.poll(sm)
+                except Exception as e:
+                    logging.error('Error while polling {!s}: {!s}'.format(sm, e))
+
+            self._running_event.wait(self.interval)
@@ -6,7 +6,10 @@ import logging
 from .abstract_machinemode import ContinueException, MachineModeException
 from .standalone import StandaloneMachineMode
 
+from ...events import EventLogger
+
 logging = logging.getLogger('ertza.machine.modes.master')
+events = EventLogger('ertza.machine.modes.master')
 
 
 class SlavesConfig(object):
@@ -21,7 +24,7 @@ class SlavesConfig(object):
         try:
             sn, opt = key.split(':', maxsplit=1)
             opt = opt.replace(':', '.')
-            c = self._cf['slave_{}'.format(sn)]
+            c = self._cf.view['slave_{}'.format(sn)]
 
             try:
                 m = c['{}_mode'.format(opt)]
@@ -114,9 +117,9 @@ class MasterMachineMode(StandaloneMachineMode):
 
         try:
             vl_mode, vl_value = self._slv_config['{}:{}'.format(sn, key)]
-        except KeyError as e:
+        except KeyError:
             vl_mode, vl_value = 'forward', None
-            logging.debug('{!s}'.format(e))
+            events.debug('no_slave_config', slave=sn, key=key)
 
         if vl_mode not in ('forward', 'multiply', 'divide', 'add', 'substract', 'default',):
             raise MachineModeException('Unrecognized mode {0} for {1}'.format(vl_mode, key))
@@ -151,10 +154,8 @@ class MasterMachineMode(StandaloneMachineMode):
             nvalue = vl_value - value if value >= 0 else vl_value + value
 
         if nvalue is not None and value != nvalue:
-            logging.debug('Modified value for key {}: '
-                          '{} to {} ({} {})'
-                          .format(key, value,
-                                  nvalue, vl_mode, vl_value))
+            events.debug('modified_value', key=key, value=value,
+                         nvalue=nvalue, mode=vl_mode, mode_value=vl_value)
         return nvalue
 
     def get_guarded_value(self, key):
@@ -33,6 +33,37 @@ class StandaloneMachineMode(AbstractMachineMode):
 
         return res
 
+    def get_many(self, keys):
+        """
+        Return values of keys, in order. Driver keys are read with a single
+        driver.get_many() call when the driver supports it. Keys that can't
+        be read are returned as exceptions.
+        """
+
+        values = {}
+        driver_keys = []
+        for key in keys:
+            try:
+                values[key] = super().__getitem__(key)
+            except ContinueException:
+                driver_keys.append(key)
+            except Exception as e:
+                values[key] = e
+
+        if driver_keys:
+            drv = self._machine.driver
+            get_many = getattr(drv, 'get_many', None)
+            if get_many is not None:
+                values.update(zip(driver_keys, get_many(driver_keys)))
+            else:
+                for key in driver_keys:
+                    try:
+                        values[key] = drv[key]
+                    except Exception as e:
+                        values[key] = e
+
+        return [values[k] for k in keys]
+
     def __setitem__(self, key, value):
         try:
             super().__setitem__(key, value)
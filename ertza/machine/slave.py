@@ -14,9 +14,11 @@ from .exceptions import SlaveMachineError, SlaveMachineTimeoutError, SlaveMachin
 from ..drivers import Driver
 from ..drivers import AbstractDriverError, AbstractDriverTimeoutError
 
-from ..async_utils import coroutine
+from ..async_utils import coroutine, LockedCoroutine
+from ..events import EventLogger
 
 logging = logging.getLogger('ertza.machine.slave')
+events = EventLogger('ertza.machine.slave')
 
 Slave = namedtuple('Slave', ('serialnumber', 'address', 'driver', 'slave_mode', 'config'))
 SlaveKey = namedtuple('SlaveKey', ('dest', 'source'))
@@ -54,6 +56,9 @@ class SlaveRequest(object):
             'callback': None,
             'broadcast_request': False,
             'parent_request': None,
+            # Background polls time out after poll_timeout without
+            # signaling a slave timeout
+            'poll_timeout': None,
         }
         self._kwargs.update(kwargs)
 
@@ -217,8 +222,9 @@ class SlaveMachine(AbstractMachine):
 
     def init_pipes(self):
         self.driver.init_pipes()
-        self.outlet = self.make_request(self.filter_by_operating_mode(
-            self.get_value_for_slave(self.send_if_latest(self.driver.outlet))))
+        self.outlet = LockedCoroutine(self.make_request(
+            self.filter_by_operating_mode(self.get_value_for_slave(
+                self.send_if_latest(self.driver.outlet)))))
         self.inlet = self.driver.inlet
 
     def start(self, **kwargs):
@@ -263,6 +269,15 @@ class SlaveMachine(AbstractMachine):
     def errors(self):
         return self._errors
 
+    @property
+    def latency(self):
+        """
+        Last measured round trip time to the slave in seconds or None.
+        """
+
+        lat = getattr(self.driver, '_latency', None) or self._latency
+        return lat / 1000 if lat is not None else None
+
     @property
     def forward_keys(self):
         return self.SLAVE_MODES[self.slave.slave_mode]
@@ -397,7 +412,7 @@ class SlaveMachine(AbstractMachine):
     def _get_cb(self, rq):
         try:
             rtn = self._default_cb(rq)
-            logging.debug('Rtn data: %s' % rtn)
+            events.debug('get_reply', data=rtn)
         except SlaveMachineError as e:
             logging.error(repr(e))
             return
@@ -410,7 +425,7 @@ class SlaveMachine(AbstractMachine):
     def _set_cb(self, rq):
         try:
             rtn = self._default_cb(rq)
-            logging.debug('Rtn data: %s' % rtn)
+            events.debug('set_reply', data=rtn)
         except SlaveMachineError as e:
             logging.error(repr(e))
             return
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+from threading import Thread, Event, Lock
+
+logging = logging.getLogger('ertza.machine.subscriptions')
+
+
+class Subscription(object):
+    __slots__ = ('keys', 'period', 'callback', 'next_due', 'expires')
+
+    def __init__(self, keys, period, callback, expires):
+        self.keys = tuple(keys)
+        self.period = period
+        self.callback = callback
+        self.next_due = time.monotonic()
+        self.expires = expires
+
+
+class TelemetrySubscriptions(object):
+    """
+    Push machine keys to subscribers at a fixed rate.
+
+    On every tick, keys of all due subscriptions are read once, whatever the
+    number of subscribers, then each subscriber receives one message with
+    its own keys. Subscriptions expire if they are not renewed within *ttl*
+    seconds: clients renew by subscribing again.
+    """
+
+    def __init__(self, machine, ttl=10., max_rate=50.):
+        self.machine = machine
+        self.ttl = ttl
+        self.max_rate = max_rate
+
+        self._subscriptions = {}
+        self._lock = Lock()
+
+        self._thread = None
+        self._running_event = Event()
+        self._wakeup_event = Event()
+
+    def start(self):
+        self._running_event.clear()
+        self._thread = Thread(target=self._loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running_event.set()
+        self._wakeup_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    exit = stop
+
+    def subscribe(self, subscriber, keys, rate, callback):
+        """
+        Subscribe (or renew) *subscriber* to *keys* at *rate* Hz.
+
+        callback(values) is called with a list of (key, value) tuples.
+        Returns the time to live of the subscription in seconds.
+        """
+
+        if not keys:
+            raise ValueError('No keys to subscribe to')
+
+        rate = float(rate)
+        if rate <= 0:
+            raise ValueError('Rate must be positive')
+        rate = min(rate, self.max_rate)
+
+        with self._lock:
+            s = self._subscriptions.get(subscriber)
+            expires = time.monotonic() + self.ttl
+            if s is not None and s.keys == tuple(keys) and \
+                    s.period == 1. / rate:
+                s.callback = callback
+                s.expires = expires
+            else:
+                self._subscriptions[subscriber] = Subscription(
+                    keys, 1. / rate, callback, expires)
+
+        self._wakeup_event.set()
+        return self.ttl
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            return self._subscriptions.pop(subscriber, None) is not None
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def sample(self, keys):
+        """
+        Read each key once. Keys that can't be read are left out.
+        """
+
+        keys = list(keys)
+        values = {}
+        for k, v in zip(keys, self.machine.get_many(keys)):
+            if isinstance(v, Exception):
+                logging.debug('Unable to sample {}: {!s}'.format(k, v))
+            else:
+                values[k] = v
+
+        return values
+
+    def _loop(self):
+        while not self._running_event.is_set():
+            self._wakeup_event.clear()
+            now = time.monotonic()
+            due = []
+            next_due = None
+
+            with self._lock:
+                for subscriber, s in list(self._subscriptions.items()):
+                    if s.expires < now:
+                        logging.info('Subscription of {} expired'
+                                     .format(subscriber))
+                        del self._subscriptions[subscriber]
+                    elif s.next_due <= now:
+                        due.append(s)
+                    elif next_due is None or s.next_due < next_due:
+                        next_due = s.next_due
+
+            if due:
+                keys = set()
+                for s in due:
+                    keys.update(s.keys)
+                try:
+                    values = self.sample(keys)
+                except Exception as e:
+                    # Skip this tick, don't stop pushing on a driver error
+                    logging.error('Error while sampling telemetry: {!s}'
+                                  .format(e))
+                    values = None
+
+                for s in due:
+                    s.next_due += s.period
+                    if s.next_due < now:
+                        s.next_due = now + s.period
+                    if next_due is None or s.next_due < next_due:
+                        next_due = s.next_due
+
+                    if values is None:
+                        continue
+                    try:
+                        s.callback([(k, values[k]) for k in s.keys
+                                    if k in values])
+                    except Exception as e:
+                        logging.error('Error while pushing telemetry: {!s}'
+                                      .format(e))
+
+            if next_due is None:
+                self._wakeup_event.wait()
+            else:
+                self._wakeup_event.wait(max(next_due - time.monotonic(), 0))
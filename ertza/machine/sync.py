@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+from threading import Lock
+
+from .exceptions import MachineError
+
+logging = logging.getLogger('ertza.machine.sync')
+
+
+class SyncBarrier(object):
+    """
+    Actions armed under a token and executed at release time.
+
+    A synced command is armed on the master and on every slave, then released
+    with a release time compensated for the latency of each slave so that
+    all axes execute it together. Armed actions that are not released within
+    *timeout* seconds are discarded.
+    """
+
+    # The last part of the wait is a busy loop, sleep() isn't accurate enough
+    spin_time = 0.002
+
+    def __init__(self, timeout=5.):
+        self.timeout = timeout
+
+        self._armed = {}
+        self._lock = Lock()
+
+    def arm(self, token, action, *args):
+        now = time.monotonic()
+        with self._lock:
+            for t, (_, _, armed_at) in list(self._armed.items()):
+                if now - armed_at > self.timeout:
+                    logging.warn('Discarding sync {}: not released'.format(t))
+                    del self._armed[t]
+
+            self._armed[token] = (action, args, now)
+
+    def cancel(self, token):
+        with self._lock:
+            return self._armed.pop(token, None) is not None
+
+    def release(self, token, at=None):
+        """
+        Execute the action armed under token when time.monotonic() reaches
+        *at* (immediately if None).
+
+        :returns: The monotonic time at which the action was executed
+        :raises MachineError: if nothing is armed under token
+        """
+
+        with self._lock:
+            try:
+                action, args, _ = self._armed.pop(token)
+            except KeyError:
+                raise MachineError('Nothing armed for sync {}'.format(token))
+
+        if at is not None:
+            delay = at - time.monotonic() - self.spin_time
+            if delay > 0:
+                time.sleep(delay)
+            while time.monotonic() < at:
+                pass
+
+        t = time.monotonic()
+        action(*args)
+        return t
+
+    def __contains__(self, token):
+        return token in self._armed
+
+    def __len__(self):
+        return len(self._armed)
@@ -2,6 +2,7 @@
 
 
 class AbstractMessage(object):
+    __slots__ = ()
 
     @property
     def command(self):
@@ -14,3 +15,11 @@ class AbstractMessage(object):
     @property
     def args(self):
         raise NotImplementedError()
+
+
+class MessageBundle(list):
+    """
+    Messages received together, executed in order as one unit.
+    """
+
+    __slots__ = ()
@@ -2,15 +2,13 @@
 
 
 import importlib
-import inspect
 import logging
 
-from threading import Event
-
-from ..commands.abstract_commands import BufferedCommand
-from ..commands.abstract_commands import SyncedCommand
-
 from ..exceptions import AbstractErtzaException
+from ..async_utils import LockedCoroutine
+
+from .abstract_message import MessageBundle
+from .lanes import Lane, LaneFullError
 
 logging = logging.getLogger('ertza.processors')
 
@@ -20,92 +18,218 @@ class ProcessorAliasError(AbstractErtzaException):
 
 
 class AbstractProcessor(object):
+    """
+    Execute received commands.
+
+    Commands are not executed on the receiving thread but dispatched to
+    lanes, each with a bounded queue and its own workers, so a slow command
+    doesn't delay the following ones. Commands in the inline lane are
+    executed directly.
+    """
+
+    # name, workers, queue size, latest-wins. Replies to a client are sent in
+    # the order of its commands only if their lane has a single worker.
+    Lanes = (
+        ('safety', 1, 32, False),
+        ('sync', 1, 16, False),
+        ('control', 1, 64, True),
+        ('normal', 1, 64, False),
+        ('buffered', 1, 32, False),
+        ('slow', 1, 16, False),
+    )
+
+    # Setpoints are coalesced in the control lane. Other control commands are
+    # barriers: setpoints are never moved across them.
+    LaneRoutes = {
+        'setpoint': 'control',
+    }
+
+    # A bundle runs on the first of these lanes used by one of its commands
+    BundleLanes = ('safety', 'sync', 'control', 'slow', 'buffered',
+                   'normal')
+
     def __init__(self, base_module, abstract_class, outlet):
         self.base_module = base_module
         self.abstract_class = abstract_class
         self._outlet_coro = outlet
 
         self.commands = {}
+        self.lanes = {}
 
     def start(self):
-        self.outlet = self._outlet_coro(self.identifier)
-
-        _module = importlib.import_module('ertza.{}'.format(self.base_module))
-        self.load_classes_in_module(_module)
-
-    def load_classes_in_module(self, module):
-        for module_name, obj in inspect.getmembers(module):
-            if inspect.isclass(obj) and issubclass(obj, self.abstract_class):
-                try:
-                    cmd = obj(self.outlet)
-                    if not isinstance(cmd.alias, str):
-                        logging.error('Bad command alias, expected str, '
-                                      'found {}. Skipped command.'
-                                      .format(type(cmd.alias)))
-                        continue
-                    self.commands[cmd.alias] = cmd
-                except NotImplementedError:
-                    # This is an abstract class, skip it
-                    pass
+        # Replies are sent from every lane
+        self.outlet = LockedCoroutine(self._outlet_coro(self.identifier))
+
+        self.load_commands()
+
+        for name, workers, maxsize, coalesce in self.Lanes:
+            lane = Lane(name, self._execute, workers, maxsize, coalesce)
+            lane.start()
+            self.lanes[name] = lane
+
+    def exit(self):
+        for lane in self.lanes.values():
+            lane.exit()
+
+    def load_commands(self):
+        # Importing the package registers its commands
+        importlib.import_module('ertza.{}'.format(self.base_module))
+
+        for alias, cls in self.abstract_class.registered().items():
+            self.commands[alias] = cls(self.outlet)
+
+        logging.info('{} commands loaded: {}'.format(
+            self.identifier, ' '.join(sorted(self.commands))))
 
     @property
     def available_commands(self):
         return self.commands
 
-    def is_buffered(self, command):
-        if isinstance(command, BufferedCommand):
-            return True
+    def stats(self):
+        """
+        Return {lane name: (depth, LaneStats)}
+        """
+        return {n: (l.depth, l.stats) for n, l in self.lanes.items()}
 
-        return False
+    def match(self, alias):
+        """
+        Return the aliases of the commands matching a received alias which
+        is not a command alias. Overrided by processors supporting patterns.
+        """
+        return ()
 
-    def is_synced(self, command):
-        if isinstance(command, SyncedCommand):
-            return True
-
-        return False
+    def execute(self, command):
+        if isinstance(command, MessageBundle):
+            return self.execute_bundle(command)
 
-    def synchronize(self, command):
-        alias = self._check_in_commands(command)
-        if alias:
-            try:
-                self.commands[alias].on_sync(command)
-            except Exception as e:
-                logging.error("Error while executing %s: %s", alias, e)
+        alias = command.command
+        if alias in self.commands:
+            self._dispatch(alias, command)
             return command
 
-    def execute(self, command):
         try:
-            alias = self._check_in_commands(command)
+            aliases = self._check_in_commands(command)
         except ProcessorAliasError as e:
             logging.error('{!s}'.format(e))
             raise
+
+        for alias in aliases:
+            self._dispatch(alias, command)
+        return command
+
+    def execute_bundle(self, bundle):
+        """
+        Execute the messages of a bundle in order, as one item of a single
+        lane. Nothing is executed if one of the messages isn't a command.
+        """
+
+        items = []
+        lanes = set()
+        for command in bundle:
+            try:
+                aliases = self._check_in_commands(command)
+            except ProcessorAliasError as e:
+                logging.error('Dropped bundle: {!s}'.format(e))
+                raise
+
+            for alias in aliases:
+                name = self.commands[alias].lane_for(command)
+                lanes.add(self.LaneRoutes.get(name, name))
+                items.append((alias, command))
+
+        for name in self.BundleLanes:
+            if name in lanes:
+                break
+        else:   # Only inline commands
+            name = None
+
         try:
-            if self.commands[alias].synced:
-                self.commands[alias].readyEvent = Event()
+            lane = self.lanes[name]
+        except KeyError:
+            self._execute((None, items))
+            return bundle
 
-            self.commands[alias].execute(command)
+        if name == 'safety':
+            self._purge('control')
+
+        try:
+            lane.put((None, items))
+        except LaneFullError as e:
+            logging.error('Dropped bundle of {} commands: {!s}'
+                          .format(len(items), e))
+            self._error_all(items, 'busy')
+        return bundle
+
+    def _error_all(self, items, reason):
+        for alias, command in items:
+            try:
+                self.commands[alias].error(command, reason)
+            except Exception:
+                pass
 
-            if self.commands[alias].synced:
-                self.commands[alias].readyEvent.wait()
+    def _dispatch(self, alias, command):
+        cmd = self.commands[alias]
+        name = cmd.lane_for(command)
+        try:
+            lane = self.lanes[self.LaneRoutes.get(name, name)]
+        except KeyError:
+            return self._execute((alias, command))
+
+        if name == 'safety':
+            self._purge('control')
+
+        try:
+            key = (alias, command.args[0]) \
+                if name == 'setpoint' and command.args else None
+            lane.put((alias, command), key)
+        except LaneFullError as e:
+            logging.error('Dropped {!s}: {!s}'.format(command, e))
+            try:
+                cmd.error(command, 'busy')
+            except Exception:
+                pass
+        return command
+
+    def _purge(self, name):
+        """
+        Drop commands queued in a lane, replying cancelled to them. Stopping
+        the drive must not be followed by setpoints or commands sent before.
+        """
+
+        for alias, command in self.lanes[name].purge():
+            items = command if alias is None else [(alias, command)]
+            for alias, command in items:
+                logging.info('Cancelled {!s}'.format(command))
+            self._error_all(items, 'cancelled')
+
+    def _execute(self, item):
+        alias, command = item
+        if alias is None:       # Bundle
+            for i in command:
+                self._execute(i)
+            return command
+
+        try:
+            self.commands[alias].execute(command)
         except Exception as e:
             import traceback
             logging.error('Error while executing {!s}: {!r}'.format(alias, e))
             traceback.print_exc(e)
         return command
 
-    def enqueue(self, message):
-        if self.is_buffered(message):
-            self.machine.commands.send(message)
-            if self.is_sync(message):
-                self.machine.sync_commands.put(message)    # Yes, it goes into both queues!
-        else:
-            self.machine.unbuffered_commands.send(message)
-
     def _check_in_commands(self, message):
         alias = message.command
-        if alias not in self.commands:
+        if alias in self.commands:
+            return (alias,)
+
+        try:
+            aliases = self.match(alias)
+        except ValueError as e:
+            raise ProcessorAliasError('Bad alias in {0.__class__.__name__}: '
+                                      '{1!s}'.format(self, e))
+        if not aliases:
             raise ProcessorAliasError('Alias not found in '
                                       '{0.__class__.__name__}: {1}'
                                       .format(self, alias))
 
-        return alias
+        return aliases
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+from collections import deque
+from threading import Thread, Condition, Event
+
+logging = logging.getLogger('ertza.processors.lanes')
+
+
+class LaneFullError(Exception):
+    pass
+
+
+class LaneStats(object):
+    __slots__ = ('processed', 'dropped', 'coalesced', 'purged', 'max_depth',
+                 'wait_avg', 'wait_max', 'exec_avg', 'exec_max')
+
+    # Weight of the last sample in averages
+    alpha = 0.1
+
+    def __init__(self):
+        self.processed = self.dropped = self.coalesced = self.max_depth = 0
+        self.purged = 0
+        self.wait_avg = self.wait_max = 0.
+        self.exec_avg = self.exec_max = 0.
+
+    def record(self, wait, duration):
+        self.processed += 1
+        self.wait_avg += (wait - self.wait_avg) * self.alpha
+        self.exec_avg += (duration - self.exec_avg) * self.alpha
+        if wait > self.wait_max:
+            self.wait_max = wait
+        if duration > self.exec_max:
+            self.exec_max = duration
+
+
+class Lane(object):
+    """
+    Bounded queue drained by its own worker threads.
+
+    If coalesce is True, an item queued with a key replaces the pending item
+    with the same key (latest wins), which keeps its place in the queue.
+    Items queued without a key are barriers: they are never coalesced and
+    items queued after them don't replace items queued before, so the order
+    between barriers and keyed items is kept.
+
+    Items are executed in order by a single worker. With several workers,
+    the following items are executed while an item is executing.
+    """
+
+    def __init__(self, name, handler, workers=1, maxsize=64, coalesce=False):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.maxsize = maxsize
+        self.coalesce = coalesce
+
+        self._queue = deque()
+        self._pending = {}      # Keyed entries queued since the last barrier
+        self._cond = Condition()
+        self._running_event = Event()
+        self._threads = []
+
+        self.stats = LaneStats()
+
+    def start(self):
+        self._running_event.clear()
+        for i in range(self.workers):
+            t = Thread(target=self._worker,
+                       name='lane-{}-{}'.format(self.name, i))
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def exit(self):
+        self._running_event.set()
+        with self._cond:
+            self._cond.notify_all()
+
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def put(self, item, key=None):
+        """
+        Queue item. Raises LaneFullError if the lane is full.
+        """
+
+        with self._cond:
+            if self.coalesce:
+                if key is None:
+                    self._pending.clear()
+                elif key in self._pending:
+                    self._pending[key][0] = item
+                    self.stats.coalesced += 1
+                    return
+
+            if len(self._queue) >= self.maxsize:
+                self.stats.dropped += 1
+                raise LaneFullError('{} lane is full'.format(self.name))
+
+            entry = [item, time.monotonic(), key]
+            self._queue.append(entry)
+            if self.coalesce and key is not None:
+                self._pending[key] = entry
+
+            depth = len(self._queue)
+            if depth > self.stats.max_depth:
+                self.stats.max_depth = depth
+            self._cond.notify()
+
+    def purge(self):
+        """
+        Drop queued items, including coalesced ones, and return them.
+        Items being executed are not affected.
+        """
+
+        with self._cond:
+            items = [entry[0] for entry in self._queue]
+            self._queue.clear()
+            self._pending.clear()
+            self.stats.purged += len(items)
+        return items
+
+    def _get(self):
+        with self._cond:
+            while not self._queue:
+                if self._running_event.is_set():
+                    return None, None
+                self._cond.wait()
+
+            entry = self._queue.popleft()
+            item, queued_at, key = entry
+            if key is not None and self._pending.get(key) is entry:
+                del self._pending[key]
+            return item, queued_at
+
+    def _worker(self):
+        while not self._running_event.is_set():
+            item, queued_at = self._get()
+            if item is None:
+                break
+
+            start = time.monotonic()
+            try:
+                self.handler(item)
+            except Exception as e:
+                logging.exception('Error in {} lane: {!s}'.format(self.name, e))
+            end = time.monotonic()
+
+            with self._cond:
+                self.stats.record(start - queued_at, end - start)
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def __repr__(self):
+        return '{0.__class__.__name__}: {0.name} ({0.depth}/{0.maxsize})' \
+            .format(self)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+
+logging = logging.getLogger('ertza.processors.osc.admission')
+
+ADMIT, DROP, REJECT = range(3)
+
+
+class TokenBucket(object):
+    __slots__ = ('rate', 'burst', 'tokens', 'last', 'limited')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.limited = False
+
+    def refill(self, now):
+        if now > self.last:
+            self.tokens = min(self.burst,
+                              self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+    def take(self, now, n=1):
+        self.refill(now)
+        if self.tokens >= n:
+            self.tokens -= n
+            return True
+        return False
+
+
+class AdmissionStats(object):
+    __slots__ = ('admitted', 'bypassed', 'dropped', 'rejected')
+
+    def __init__(self):
+        self.admitted = self.bypassed = self.dropped = self.rejected = 0
+
+
+class AdmissionControl(object):
+    """
+    Rate limit received messages with token buckets.
+
+    Each sender has a bucket for all its messages and one for each command
+    class, the first level of the path (/machine, /config, ...), which has
+    its own rate. Over limit messages are dropped, or answered once with
+    PATH/error busy until the sender gets under the limit again if reply is
+    True. /slave/* messages from trusted hosts, the master or the slaves,
+    are never limited.
+
+    Messages of a bundle are admitted or refused together: a bundle takes a
+    token per message, so bundles larger than the burst are always refused.
+    """
+
+    # Buckets of senders idle for this time are forgotten
+    idle_time = 60.
+
+    def __init__(self, config=None):
+        self.rate, self.burst, self.reply = 200., 50., True
+        self.class_rates = {}
+
+        if config is not None:
+            self.rate = float(config.get('rate_limit', fallback=self.rate))
+            self.burst = float(config.get('rate_limit_burst',
+                                          fallback=self.burst))
+            # Config sections are chain maps, without typed getters
+            reply = config.get('rate_limit_reply', fallback=None)
+            if reply is not None:
+                self.reply = str(reply).lower() in ('1', 'yes', 'true', 'on')
+            for k in config.keys():
+                if k.startswith('rate_limit_') and \
+                        k not in ('rate_limit_burst', 'rate_limit_reply'):
+                    self.class_rates['/' + k[11:]] = float(config[k])
+
+        self.is_trusted = lambda hostname: False
+
+        self._buckets = {}
+        self._last_prune = time.monotonic()
+        self.stats = AdmissionStats()
+
+    def _bucket(self, key, rate):
+        try:
+            return self._buckets[key]
+        except KeyError:
+            b = TokenBucket(rate, max(self.burst * rate / self.rate, 1.))
+            self._buckets[key] = b
+            return b
+
+    def _prune(self, now):
+        self._last_prune = now
+        for k, b in list(self._buckets.items()):
+            if now - b.last > self.idle_time:
+                del self._buckets[k]
+
+    def admit(self, message):
+        """
+        Return ADMIT, DROP or REJECT (drop and reply busy) for a message.
+        """
+
+        return self.admit_bundle((message,))
+
+    def admit_bundle(self, messages):
+        """
+        Return ADMIT, DROP or REJECT for all messages of a bundle, received
+        from the same sender.
+        """
+
+        if not self.rate:
+            return ADMIT
+
+        hostname = messages[0].sender.hostname
+        trusted = None
+        classes = {}
+        limited = 0
+        for m in messages:
+            path = m.path
+            if path.startswith('/slave/'):
+                if trusted is None:
+                    trusted = self.is_trusted(hostname)
+                if trusted:
+                    continue
+
+            cls = path[:path.find('/', 1)] if path.count('/') > 1 else path
+            classes[cls] = classes.get(cls, 0) + 1
+            limited += 1
+
+        if not limited:
+            self.stats.bypassed += len(messages)
+            return ADMIT
+
+        now = time.monotonic()
+        if now - self._last_prune > self.idle_time:
+            self._prune(now)
+
+        bucket = self._bucket(hostname, self.rate)
+        takes = [(bucket, limited)]
+        for cls, n in classes.items():
+            rate = self.class_rates.get(cls)
+            if rate:
+                takes.append((self._bucket((hostname, cls), rate), n))
+
+        for b, n in takes:
+            b.refill(now)
+        if all(b.tokens >= n for b, n in takes):
+            for b, n in takes:
+                b.tokens -= n
+            bucket.limited = False
+            self.stats.admitted += limited
+            self.stats.bypassed += len(messages) - limited
+            return ADMIT
+
+        self.stats.dropped += len(messages)
+        if self.reply and not bucket.limited:
+            bucket.limited = True
+            self.stats.rejected += 1
+            logging.warn('Rate limiting {} ({})'.format(
+                hostname, ' '.join(m.path for m in messages)))
+            return REJECT
+        return DROP
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import socket
+import time
+from threading import Thread, Event, Lock
+
+from .admission import AdmissionControl, ADMIT, REJECT
+from .codec import OscCodecError, is_bundle, decode_bundle, timetag_to_time
+from .message import OscMessage, OscAddress
+from .scheduler import BundleScheduler
+from ..abstract_message import MessageBundle
+from ...events import EventLogger
+
+logging = logging.getLogger('ertza.processors.osc.aioserver')
+events = EventLogger('ertza.processors.osc.aioserver')
+
+
+class _OscProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def connection_made(self, transport):
+        self.server.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.server.dispatch(data, addr)
+
+    def error_received(self, exc):
+        logging.error('OSC socket error: {!s}'.format(exc))
+
+
+class AsyncOscServer(object):
+    """
+    OSC server based on an asyncio datagram endpoint and the pure-Python
+    codec. Drop-in replacement of :class:`OscServer` that doesn't need liblo.
+
+    The event loop runs in its own thread.
+
+    Messages of a bundle are admitted together and handed to the outlet as
+    one :class:`MessageBundle`, executed in order by the processor. Bundles
+    with a timetag in the future are executed at that time by a
+    :class:`BundleScheduler`.
+    """
+
+    identifier = 'OSC'
+    infos = {}
+
+    def __init__(self, outlet, config=None):
+        self._outlet_coro = outlet
+
+        if config is None:
+            self.port, self.reply_port = 6969, 6969
+            self.bundle_max_delay = 60.
+        else:
+            self.port = int(config.get('listen_port', fallback=6969))
+            self.reply_port = int(config.get('reply_port', fallback=6969))
+            self.bundle_max_delay = float(config.get('bundle_max_delay',
+                                                     fallback=60.))
+
+        self.transport = None
+        self.running = False
+
+        self._loop = None
+        self._t = None
+        self._ready_event = Event()
+        self._start_error = None
+
+        self._outlet_lock = Lock()
+        self.scheduler = BundleScheduler()
+        self.admission = AdmissionControl(config)
+
+    def run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.bind(('0.0.0.0', self.port))
+
+            endpoint = self._loop.create_datagram_endpoint(
+                lambda: _OscProtocol(self), sock=sock)
+            self._loop.run_until_complete(endpoint)
+            logging.info('Started OSC server on port {}'.format(self.port))
+        except Exception as e:
+            # Raised again by start()
+            self._start_error = e
+            sock.close()
+            self._loop.close()
+            return
+        finally:
+            self._ready_event.set()
+
+        try:
+            self._loop.run_forever()
+        finally:
+            self.transport.close()
+            self._loop.close()
+
+    def start(self):
+        self.running = True
+        self._outlet = self._outlet_coro(self.identifier)
+        self.scheduler.start()
+
+        self._t = Thread(target=self.run)
+        self._t.daemon = True
+        self._t.start()
+        self._ready_event.wait()
+
+        if self._start_error is not None:
+            logging.error('Unable to start OSC server on port {}: {!s}'
+                          .format(self.port, self._start_error))
+            self.running = False
+            self.scheduler.exit()
+            self._t.join()
+            self._loop = None
+            raise self._start_error
+
+        try:
+            m = OscMessage('/alive', self.infos['serialnumber'], self.infos['osc_address'], hostname='255.255.255.255')
+        except KeyError:
+            m = OscMessage('/alive', hostname='255.255.255.255')
+        self.send_message(m)
+
+    def send_message(self, message):
+        message.receiver.port = self.reply_port
+        if message.msg_type != 'log':
+            events.debug('send', receiver=message.receiver, message=message)
+
+        data = message.encode()
+        self._loop.call_soon_threadsafe(
+            self.transport.sendto, data,
+            (message.receiver.hostname, self.reply_port))
+
+    def dispatch(self, data, addr):
+        sender = OscAddress(hostname=addr[0], port=addr[1])
+        try:
+            if is_bundle(data):
+                timetag, messages = decode_bundle(data)
+                messages = [OscMessage(p, *a, types=t, sender=sender)
+                            for p, t, a in messages]
+                self.dispatch_bundle(timetag, messages)
+                return
+
+            m = OscMessage.from_bytes(data, sender)
+        except OscCodecError as e:
+            logging.error('Dropped malformed packet from {}: {!s}'.format(addr, e))
+            return
+
+        if not self._admit(m):
+            return
+
+        events.debug('received', sender=m.sender, message=m)
+        with self._outlet_lock:
+            self._outlet.send(m)
+
+    def _admit(self, message):
+        return self._admit_bundle((message,))
+
+    def _admit_bundle(self, messages):
+        a = self.admission.admit_bundle(messages)
+        if a == REJECT:
+            for m in messages:
+                self.send_message(OscMessage(m.path + '/error', 'busy',
+                                             receiver=m.sender))
+        return a == ADMIT
+
+    def dispatch_bundle(self, timetag, messages):
+        if not messages or not self._admit_bundle(messages):
+            return
+
+        t = timetag_to_time(timetag)
+        delay = t - time.time() if t is not None else 0
+
+        if delay > self.bundle_max_delay:
+            logging.error('Dropped bundle scheduled in {:.1f}s (max {:.1f}s)'
+                          .format(delay, self.bundle_max_delay))
+            return
+
+        events.debug('received_bundle', messages=len(messages),
+                     delay=max(delay, 0))
+
+        if delay > 0:
+            self.scheduler.schedule(time.monotonic() + delay,
+                                    self._send_bundle, messages)
+        else:
+            self._send_bundle(messages)
+
+    def _send_bundle(self, messages):
+        with self._outlet_lock:
+            self._outlet.send(MessageBundle(messages))
+
+    def close(self):
+        logging.debug('Closing OSC server')
+        self.running = False
+        self.scheduler.exit()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._t.join()
+
+    exit = close
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pure-Python OSC 1.0 codec.
+
+Packets are parsed in place with :func:`struct.unpack_from` over a
+:class:`memoryview`: only strings and blobs are copied out of the datagram.
+
+Bundles are supported. Timetags are 64 bits NTP timestamps, the special
+value :data:`IMMEDIATE` means "as soon as possible".
+"""
+
+import struct
+import time
+
+_INT = struct.Struct('>i')
+_FLOAT = struct.Struct('>f')
+_INT64 = struct.Struct('>q')
+_UINT64 = struct.Struct('>Q')
+_DOUBLE = struct.Struct('>d')
+
+# Type tags carrying a fixed-size value
+_FIXED = {
+    'i': _INT,
+    'f': _FLOAT,
+    'h': _INT64,
+    't': _UINT64,
+    'd': _DOUBLE,
+    'c': _INT,
+    'r': _INT,
+}
+
+# Type tags without data
+_CONSTANTS = {
+    'T': True,
+    'F': False,
+    'N': None,
+    'I': float('inf'),
+}
+
+_INT32_MIN, _INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+BUNDLE_TAG = b'#bundle\x00'
+IMMEDIATE = 1
+
+# Seconds between NTP epoch (1900) and unix epoch (1970)
+_NTP_DELTA = 2208988800
+
+
+class OscCodecError(ValueError):
+    pass
+
+
+def _padded(length):
+    return (length + 4) & ~0x03
+
+
+def _read_string(data, offset, end):
+    nul = data.find(b'\x00', offset, end)
+    if nul < 0:
+        raise OscCodecError('Unterminated string at {}'.format(offset))
+
+    next_offset = offset + _padded(nul - offset)
+    if next_offset > end:
+        raise OscCodecError('Truncated string at {}'.format(offset))
+
+    return data[offset:nul].decode('utf-8', 'replace'), next_offset
+
+
+def _check_size(offset, size, end, path):
+    if offset + size > end:
+        raise OscCodecError('Truncated message {}'.format(path))
+
+
+def decode_message(data, offset=0, end=None):
+    """
+    Decode an OSC message.
+
+    :param data: bytes of the datagram
+    :param offset, end: bounds of the message in data
+    :returns: A tuple (path, types, args)
+    :raises OscCodecError: if the message is malformed
+    """
+
+    if end is None:
+        end = len(data)
+
+    view = memoryview(data)
+    try:
+        path, offset = _read_string(data, offset, end)
+        if offset >= end:      # Message without type tags
+            return path, '', ()
+
+        types, offset = _read_string(data, offset, end)
+        if not types.startswith(','):
+            raise OscCodecError('Missing type tags in {}'.format(path))
+        types = types[1:]
+
+        args = []
+        for t in types:
+            st = _FIXED.get(t)
+            if st is not None:
+                _check_size(offset, st.size, end, path)
+                args.append(st.unpack_from(view, offset)[0])
+                offset += st.size
+            elif t in _CONSTANTS:
+                args.append(_CONSTANTS[t])
+            elif t in ('s', 'S'):
+                s, offset = _read_string(data, offset, end)
+                args.append(s)
+            elif t == 'b':
+                _check_size(offset, 4, end, path)
+                size, = _INT.unpack_from(view, offset)
+                offset += 4
+                if size < 0:
+                    raise OscCodecError('Invalid blob size in {}'.format(path))
+                _check_size(offset, (size + 3) & ~0x03, end, path)
+                args.append(bytes(view[offset:offset + size]))
+                offset += (size + 3) & ~0x03
+            elif t == 'm':
+                _check_size(offset, 4, end, path)
+                args.append(bytes(view[offset:offset + 4]))
+                offset += 4
+            else:
+                raise OscCodecError('Unsupported type tag {} in {}'.format(t, path))
+    except struct.error as e:
+        raise OscCodecError('Truncated message: {!s}'.format(e))
+
+    return path, types, tuple(args)
+
+
+def _encode_string(value):
+    b = value.encode('utf-8') if isinstance(value, str) else bytes(value)
+    return b + b'\x00' * (4 - len(b) % 4)
+
+
+def _guess_type(value):
+    if value is True:
+        return 'T'
+    if value is False:
+        return 'F'
+    if value is None:
+        return 'N'
+    if isinstance(value, int):
+        return 'i' if _INT32_MIN <= value <= _INT32_MAX else 'h'
+    if isinstance(value, float):
+        return 'f'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return 'b'
+    return 's'
+
+
+def encode_message(path, args=(), types=None):
+    """
+    Encode an OSC message.
+
+    If *types* is not given, types are guessed from the python values
+    (int: i or h, float: f, str: s, bytes: b, bool: T/F, None: N).
+    """
+
+    if types is None:
+        types = ''.join(_guess_type(a) for a in args)
+    elif len(types) != len(args):
+        raise OscCodecError('Length of args and types must match')
+
+    chunks = [_encode_string(path), _encode_string(',' + types)]
+    for t, value in zip(types, args):
+        st = _FIXED.get(t)
+        if st is not None:
+            if t in ('f', 'd'):
+                chunks.append(st.pack(float(value)))
+            else:
+                chunks.append(st.pack(int(value)))
+        elif t in _CONSTANTS:
+            continue
+        elif t in ('s', 'S'):
+            chunks.append(_encode_string(str(value)))
+        elif t == 'b':
+            value = bytes(value)
+            chunks.append(_INT.pack(len(value)))
+            chunks.append(value + b'\x00' * (-len(value) % 4))
+        elif t == 'm':
+            chunks.append(bytes(value)[:4].ljust(4, b'\x00'))
+        else:
+            raise OscCodecError('Unsupported type tag {}'.format(t))
+
+    return b''.join(chunks)
+
+
+def timetag_to_time(timetag):
+    """
+    Convert a NTP timetag to unix time. Returns None for :data:`IMMEDIATE`.
+    """
+
+    if timetag == IMMEDIATE:
+        return None
+    return (timetag >> 32) - _NTP_DELTA + (timetag & 0xffffffff) / 2 ** 32
+
+
+def time_to_timetag(t=None):
+    """
+    Convert unix time (defaults to now) to a NTP timetag.
+    """
+
+    if t is None:
+        t = time.time()
+    seconds = int(t)
+    fraction = int((t - seconds) * 2 ** 32)
+    return ((seconds + _NTP_DELTA) << 32) | fraction
+
+
+def is_bundle(data):
+    return data[:8] == BUNDLE_TAG
+
+
+def decode_bundle(data, offset=0, end=None):
+    """
+    Decode an OSC bundle.
+
+    Nested bundles are flattened: their messages are returned with the
+    enclosing ones.
+
+    :returns: A tuple (timetag, messages) where each message is a
+              (path, types, args) tuple
+    :raises OscCodecError: if the bundle is malformed
+    """
+
+    if end is None:
+        end = len(data)
+
+    if data[offset:offset + 8] != BUNDLE_TAG:
+        raise OscCodecError('Not a bundle')
+
+    view = memoryview(data)
+    try:
+        timetag, = _UINT64.unpack_from(view, offset + 8)
+        offset += 16
+
+        messages = []
+        while offset < end:
+            size, = _INT.unpack_from(view, offset)
+            offset += 4
+            if size < 0 or offset + size > end:
+                raise OscCodecError('Truncated bundle element')
+
+            if data[offset:offset + 8] == BUNDLE_TAG:
+                messages.extend(decode_bundle(data, offset, offset + size)[1])
+            else:
+                messages.append(decode_message(data, offset, offset + size))
+            offset += size
+    except struct.error as e:
+        raise OscCodecError('Truncated bundle: {!s}'.format(e))
+
+    return timetag, messages
+
+
+def encode_bundle(elements, timetag=IMMEDIATE):
+    """
+    Encode an OSC bundle.
+
+    :param elements: encoded messages or bundles (bytes)
+    :param timetag: NTP timetag, see :func:`time_to_timetag`
+    """
+
+    chunks = [BUNDLE_TAG, _UINT64.pack(timetag)]
+    for e in elements:
+        chunks.append(_INT.pack(len(e)))
+        chunks.append(e)
+
+    return b''.join(chunks)
@@ -1,34 +1,34 @@
 # -*- coding: utf-8 -*-
 
-from copy import copy
-from liblo import Message as OMessage
-
 from ..abstract_message import AbstractMessage
+from .codec import encode_message, decode_message
 
 
 class OscPath(str):
-    def __init__(self, path):
-        self._p = path
-        self.levels = self._p.split('/')
-
-    def __repr__(self):
-        return "%s" % '/'.join(self.levels)
+    """
+    OSC path. Levels are only split when first accessed.
+    """
 
-    def __str__(self):
-        return "%s" % '/'.join(self.levels)
+    @property
+    def levels(self):
+        try:
+            return self.__dict__['levels']
+        except KeyError:
+            levels = self.__dict__['levels'] = self.split('/')
+            return levels
 
 
 class OscAddress(object):
+    __slots__ = ('hostname', 'port')
+
     def __init__(self, address_object=None, **kwargs):
         if address_object:
-            self.hostname = copy(address_object.hostname)
-            self.port = int(copy(address_object.port))
-
-            del(address_object)
+            self.hostname = address_object.hostname
+            self.port = int(address_object.port)
         elif 'hostname' in kwargs:
             self.hostname = kwargs['hostname']
 
-            if 'port' in kwargs:
+            if 'port' in kwargs and kwargs['port'] is not None:
                 self.port = kwargs['port']
             else:
                 self.port = 6970
@@ -39,50 +39,97 @@ class OscAddress(object):
         return "%s:%d" % (self.hostname, self.port)
 
 
+def _address(obj):
+    if obj is None or isinstance(obj, OscAddress):
+        return obj
+    return OscAddress(obj)
+
+
 class OscMessage(AbstractMessage):
+    """
+    OSC message.
+
+    Derived values (path levels, target, liblo message and encoded bytes) are
+    computed on first access and cached. Encoded bytes are reused when the
+    same message is sent several times.
+    """
+
+    __slots__ = ('path', '_args', 'types', 'sender', 'receiver', 'msg_type',
+                 'answer', '_target', '_data', '_omessage')
+
+    protocol = 'OSC'
 
     def __init__(self, path, *args, **kwargs):
-        self.path, self._args = OscPath(path), args
-        self.sender, self.receiver = None, None
-        self._args = [str(a) if isinstance(a, Exception) else a for a in self._args]
+        self.path = path
+        self.types = kwargs.get('types', None)
 
-        self.types = kwargs['types'] if 'types' in kwargs else None
+        sender = kwargs.get('sender', None)
+        if sender is None:      # Outgoing message, exceptions are sent as text
+            args = tuple(str(a) if isinstance(a, Exception) else a for a in args)
+        self._args = args
 
         if self.types and len(self.types) != len(self._args):
             raise TypeError('Lenght of args and types must match')
 
-        self.sender = OscAddress(kwargs['sender']) if 'sender' in kwargs \
-            else None
-        self.receiver = OscAddress(kwargs['receiver']) if 'receiver' in kwargs \
-            else None
+        self.sender = _address(sender)
+        self.receiver = _address(kwargs.get('receiver', None))
 
         if not (self.sender or self.receiver):
             self.receiver = OscAddress(**kwargs)
 
-        self.msg_type = kwargs['msg_type'] if 'msg_type' in kwargs else None
-
+        self.msg_type = kwargs.get('msg_type', None)
         self.answer = None
-        self.protocol = 'OSC'
+
+        self._target = None
+        self._data = None
+        self._omessage = None
+
+    @classmethod
+    def from_bytes(cls, data, sender):
+        """
+        Build a message from a received datagram, keeping its bytes.
+        """
+
+        path, types, args = decode_message(data)
+        m = cls(path, *args, types=types, sender=sender)
+        m._data = bytes(data)
+        return m
 
     @property
     def command(self):
-        return str(self.path)
+        return self.path
+
+    @property
+    def levels(self):
+        if not isinstance(self.path, OscPath):
+            self.path = OscPath(self.path)
+        return self.path.levels
 
     @property
     def target(self):
-        return self.command.split('/')[0]
+        if self._target is None:
+            self._target = self.path.split('/', maxsplit=1)[0]
+        return self._target
 
     @property
     def args(self):
-        return tuple(self._args)
+        return self._args
 
     def to_message(self):
-        if self.types:
-            a = []
-            for i in zip(self.types, self.args):
-                a.append(i)
-            return OMessage(self.path, *a)
-        return OMessage(self.path, *self.args)
+        if self._omessage is None:
+            # liblo is only required by the liblo backend
+            from liblo import Message as OMessage
+
+            if self.types:
+                self._omessage = OMessage(self.path, *zip(self.types, self._args))
+            else:
+                self._omessage = OMessage(self.path, *self._args)
+        return self._omessage
+
+    def encode(self):
+        if self._data is None:
+            self._data = encode_message(self.path, self._args, self.types)
+        return self._data
 
     @property
     def message(self):
@@ -90,15 +137,18 @@ class OscMessage(AbstractMessage):
 
     @property
     def uuid(self):
-        uuid = self.args[0]
-        return uuid
+        return self._args[0]
 
     uid = uuid
 
     def __repr__(self):
-        args = [str(i) for i in self.args]
+        args = [str(i) for i in self._args]
         return '%s: %s %s' % (self.__class__.__name__, self.path,
                               ' '.join(args))
 
     def __add__(self, value):
-        self._args.append(value)
+        self._args += (value,)
+        if self.types:
+            self.types = None
+        self._data = self._omessage = None
+        return self
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""
+OSC 1.0 address pattern matching.
+
+Patterns are split on '/' and each part is matched against the parts of
+the registered aliases:
+    ?           any single character
+    *           any sequence of zero or more characters
+    [abc]       any of the listed characters, [a-z] ranges, [!abc] negation
+    {foo,bar}   any of the listed strings
+"""
+
+import re
+from functools import lru_cache
+
+SPECIAL_CHARS = frozenset('*?[{')
+
+
+class OscPatternError(ValueError):
+    pass
+
+
+def is_pattern(path):
+    return not SPECIAL_CHARS.isdisjoint(path)
+
+
+def _translate_brackets(part, i):
+    end = part.find(']', i + 1)
+    if end == -1:
+        raise OscPatternError('Unclosed [ in {}'.format(part))
+
+    content = part[i + 1:end]
+    negate = content.startswith('!')
+    if negate:
+        content = content[1:]
+
+    chars = []
+    j = 0
+    while j < len(content):
+        if j + 2 < len(content) and content[j + 1] == '-':
+            chars.append('{}-{}'.format(re.escape(content[j]),
+                                        re.escape(content[j + 2])))
+            j += 3
+        else:
+            chars.append(re.escape(content[j]))
+            j += 1
+
+    return '[{}{}]'.format('^' if negate else '', ''.join(chars)), end + 1
+
+
+def _translate_braces(part, i):
+    end = part.find('}', i + 1)
+    if end == -1:
+        raise OscPatternError('Unclosed {{ in {}'.format(part))
+
+    choices = part[i + 1:end].split(',')
+    return '(?:{})'.format('|'.join(re.escape(c) for c in choices)), end + 1
+
+
+def _compile_part(part):
+    regex = []
+    i = 0
+    while i < len(part):
+        c = part[i]
+        if c == '*':
+            regex.append('.*')
+            i += 1
+        elif c == '?':
+            regex.append('.')
+            i += 1
+        elif c == '[':
+            r, i = _translate_brackets(part, i)
+            regex.append(r)
+        elif c == '{':
+            r, i = _translate_braces(part, i)
+            regex.append(r)
+        else:
+            regex.append(re.escape(c))
+            i += 1
+
+    return re.compile(''.join(regex) + r'\Z', re.DOTALL)
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern):
+    """
+    Compile an address pattern into a tuple of matchers, one per part.
+    Literal parts are kept as strings, others are compiled to regexes.
+    """
+
+    if not pattern.startswith('/'):
+        raise OscPatternError('{} doesn\'t start with /'.format(pattern))
+
+    return tuple(_compile_part(p) if is_pattern(p) else p
+                 for p in pattern.split('/')[1:])
+
+
+class AliasTrie(object):
+    """
+    Registered aliases stored by path part.
+    """
+
+    def __init__(self, aliases=()):
+        self._root = {}
+        for alias in aliases:
+            self.add(alias)
+
+    def add(self, alias):
+        node = self._root
+        for part in alias.split('/')[1:]:
+            node = node.setdefault(part, {})
+        node[None] = alias      # None marks the end of an alias
+
+    def match(self, pattern):
+        """
+        Return the sorted list of aliases matching pattern.
+
+        :raises OscPatternError: if the pattern is invalid
+        """
+
+        nodes = [self._root]
+        for matcher in compile_pattern(pattern):
+            matched = []
+            if isinstance(matcher, str):
+                for node in nodes:
+                    if matcher in node:
+                        matched.append(node[matcher])
+            else:
+                for node in nodes:
+                    matched.extend(child for part, child in node.items()
+                                   if part is not None and
+                                   matcher.match(part))
+            if not matched:
+                return []
+            nodes = matched
+
+        return sorted(node[None] for node in nodes if None in node)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import logging
+import time
+from threading import Thread, Condition, Event
+
+logging = logging.getLogger('ertza.processors.osc.scheduler')
+
+
+class BundleScheduler(object):
+    """
+    Runs callbacks at a given time of the monotonic clock.
+
+    Used to execute OSC bundles with a timetag in the future.
+    """
+
+    def __init__(self):
+        self._queue = []
+        self._counter = itertools.count()
+        self._cond = Condition()
+
+        self.running_event = Event()
+        self._t = None
+
+    def start(self):
+        self.running_event.clear()
+        self._t = Thread(target=self.run)
+        self._t.daemon = True
+        self._t.start()
+
+    def schedule(self, deadline, callback, *args):
+        """
+        Run callback(*args) when time.monotonic() reaches deadline.
+        """
+
+        with self._cond:
+            heapq.heappush(self._queue,
+                           (deadline, next(self._counter), callback, args))
+            self._cond.notify()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def run(self):
+        while not self.running_event.is_set():
+            with self._cond:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+
+                deadline, _, callback, args = self._queue[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                heapq.heappop(self._queue)
+
+            try:
+                callback(*args)
+            except Exception as e:
+                logging.exception('Error in scheduled callback: {!s}'.format(e))
+
+    def exit(self):
+        self.running_event.set()
+        with self._cond:
+            self._queue = []
+            self._cond.notify()
+
+        if self._t is not None:
+            self._t.join()
@@ -4,9 +4,12 @@ import logging
 import liblo as lo
 from threading import Thread
 
+from .admission import AdmissionControl, ADMIT, REJECT
 from .message import OscMessage
+from ...events import EventLogger
 
 logging = logging.getLogger('ertza.processors.osc.server')
+events = EventLogger('ertza.processors.osc.server')
 
 
 class OscServer(lo.Server):
@@ -22,6 +25,8 @@ class OscServer(lo.Server):
             port = int(config.get('listen_port', fallback=6969))
             self.reply_port = int(config.get('reply_port', fallback=6969))
 
+        self.admission = AdmissionControl(config)
+
         super().__init__(port, lo.UDP)
         logging.info('Started OSC server on port {}'.format(port))
 
@@ -46,14 +51,22 @@ class OscServer(lo.Server):
     def send_message(self, message):
         osc_msg = message.to_message()
         message.receiver.port = self.reply_port
-        if message.msg_type is not 'log':
-            logging.debug("Sending to %s: %s" % (message.receiver, message))
+        if message.msg_type != 'log':
+            events.debug('send', receiver=message.receiver, message=message)
         self.send((message.receiver.hostname, self.reply_port), osc_msg)
 
     @lo.make_method(None, None)
     def dispatch(self, path, args, types, sender):
         m = OscMessage(path, *args, types=types, sender=sender)
-        logging.debug('Received %s from %s' % (m, m.sender))
+
+        a = self.admission.admit(m)
+        if a == REJECT:
+            self.send_message(OscMessage(path + '/error', 'busy',
+                                         receiver=m.sender))
+        if a != ADMIT:
+            return
+
+        events.debug('received', sender=m.sender, message=m)
         self._outlet.send(m)
 
     def close(self):
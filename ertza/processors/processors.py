@@ -1,13 +1,10 @@
 # -*- coding: utf-8 -*-
 
-import logging
-
 from .abstract_processor import AbstractProcessor
+from .osc.pattern import AliasTrie, is_pattern
 
 from ..commands import OscCommand, SerialCommand
 
-logging = logging.getLogger('ertza.processors')
-
 
 class OscProcessor(AbstractProcessor):
     identifier = 'OSC'
@@ -15,8 +12,17 @@ class OscProcessor(AbstractProcessor):
     def __init__(self, machine):
         super().__init__("commands.osc", OscCommand, machine)
 
-        osc_cmds = ' '.join(self.available_commands)
-        logging.info("OSC commands loaded: %s" % osc_cmds)
+        self.aliases = AliasTrie()
+
+    def load_commands(self):
+        super().load_commands()
+        self.aliases = AliasTrie(self.commands)
+
+    def match(self, alias):
+        # Plain aliases not found in commands can't match anything
+        if not is_pattern(alias):
+            return ()
+        return self.aliases.match(alias)
 
 
 class SerialProcessor(AbstractProcessor):
@@ -24,6 +30,3 @@ class SerialProcessor(AbstractProcessor):
 
     def __init__(self, machine):
         super().__init__("commands.serial", SerialCommand, machine)
-
-        serial_cmds = ' '.join(self.available_commands)
-        logging.info("Serial commands loaded: %s" % serial_cmds)
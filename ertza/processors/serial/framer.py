@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from .message import SerialCommandString
+
+logging = logging.getLogger('ertza.processors.serial.framer')
+
+
+class SerialFramer(object):
+    """
+    Split the serial byte stream into frames.
+
+    Received bytes are copied in a preallocated buffer, frames are found in
+    place and the remaining bytes are only moved back to the start of the
+    buffer when there's no room left at its end. Data larger than the buffer
+    is framed in chunks.
+
+    A frame starts with the protocol tag and its length is given by the
+    header. If the frame doesn't end with CmdEnd at that length, bytes up to
+    the next CmdEnd are returned so the length mismatch can be reported.
+    Bytes before a protocol tag are dropped.
+    """
+
+    Tag = b'ExmEisla'
+    HeaderLength = 22       # Tag, length, serial number
+
+    def __init__(self, size=4096):
+        self.size = size
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._start = self._end = 0
+
+        self.dropped = 0    # Bytes dropped while resynchronizing
+
+    def clear(self):
+        self._start = self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def _compact(self):
+        n = self._end - self._start
+        if self._start:
+            self._buf[:n] = self._buf[self._start:self._end]
+            self._start, self._end = 0, n
+
+    def feed(self, data):
+        """
+        Add received data and return the list of complete frames (bytes).
+        """
+
+        n = len(data)
+        if n <= self.size - self._end:
+            self._buf[self._end:self._end + n] = data
+            self._end += n
+            return self._frames()
+
+        frames = []
+        data = memoryview(data)
+        while data:
+            self._compact()
+
+            n = min(self.size - self._end, len(data))
+            self._buf[self._end:self._end + n] = data[:n]
+            self._end += n
+            data = data[n:]
+
+            # Never returns with a full buffer
+            frames.extend(self._frames())
+
+        return frames
+
+    def _frames(self):
+        buf, view, tag = self._buf, self._view, self.Tag
+        start, end = self._start, self._end
+        header, size = self.HeaderLength, self.size
+        frames = []
+
+        while True:
+            i = buf.find(tag, start, end)
+            if i < 0:
+                # Keep what can be the beginning of a tag
+                i = max(end - len(tag) + 1, start)
+                self.dropped += i - start
+                start = i
+                break
+            if i > start:
+                self.dropped += i - start
+                start = i
+
+            if end - start < header:
+                break
+
+            length = (buf[start + 8] << 8) | buf[start + 9]
+            stop = start + length
+            if header + 2 <= length <= size:
+                if stop > end:
+                    break       # Incomplete frame
+                if buf[stop - 2] == 13 and buf[stop - 1] == 10:     # CmdEnd
+                    frames.append(bytes(view[start:stop]))
+                    start = stop
+                    continue
+
+            # Bad length, return bytes up to the next frame end if any
+            p = buf.find(SerialCommandString.CmdEnd, start + header, end)
+            if p < 0:
+                if end - start < size:
+                    break
+                self.dropped += 1
+                start += 1
+                continue
+            frames.append(bytes(view[start:p + 2]))
+            start = p + 2
+
+        if start == end:
+            start = end = 0
+        self._start, self._end = start, end
+        return frames
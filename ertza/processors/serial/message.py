@@ -1,8 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import logging
-
-import bitstring as bs
+import struct
 from collections import namedtuple
 
 from ..abstract_message import AbstractMessage
@@ -13,33 +12,68 @@ logging = logging.getLogger('ertza.serial.message')
 SerialCommandStruct = namedtuple('SerialCommandStruct', ('protocol', 'length', 'serial_number', 'data', 'end'))
 
 
+class SerialCommandError(ValueError):
+    pass
+
+
 class SerialCommandString(object):
-    CmdFormat = 'bits:64,bits:16,bits:96,bits,bits:16'
+    """
+    Serial frame: protocol tag (8 bytes), frame length (uint16, big endian),
+    serial number (12 bytes), data, CmdEnd.
+    """
+
+    Header = struct.Struct('>8s2s12s')
+    Length = struct.Struct('>H')
+    Protocol = b'ExmEisla'
     CmdEnd = b'\r\n'
     CmdSep = b':'
 
-    IntLength = 32
-    FloatLength = 32
+    # Arguments are little endian
+    Bool = struct.Struct('<B')
+    Int = struct.Struct('<i')
+    Float = struct.Struct('<f')
 
     SerialNumber = '000000000000'
 
     def __init__(self, cmd_bytes=None, **kwargs):
+        self._buffer = None
+
         if cmd_bytes:
-            self._b = bs.pack('bits', cmd_bytes)
-            self._c = SerialCommandStruct(*[b.bytes for b in self._b.unpack(self.CmdFormat)])
+            h = self.Header.size
+            if len(cmd_bytes) < h + len(self.CmdEnd):
+                raise SerialCommandError('Frame too short: {} bytes'
+                                         .format(len(cmd_bytes)))
+
+            self._c = SerialCommandStruct(*self.Header.unpack_from(cmd_bytes),
+                                          data=bytes(cmd_bytes[h:-2]),
+                                          end=bytes(cmd_bytes[-2:]))
+            if self._c.protocol != kwargs.get('protocol', self.Protocol):
+                raise SerialCommandError('Unknown protocol {!r}'
+                                         .format(self._c.protocol))
+            if self._c.end != self.CmdEnd:
+                raise SerialCommandError('Missing frame end')
         else:
             self._c = SerialCommandStruct(b'', b'\x00\x00', b'', b'', b'')
             self['serial_number'] = self.SerialNumber.encode()
             self['end'] = self.CmdEnd
-            self['protocol'] = kwargs['protocol'] if 'protocol' in kwargs \
-                else b'ExmEisla'
+            self['protocol'] = kwargs.get('protocol', self.Protocol)
 
     @property
     def tobytes(self):
-        command_len = len(bs.pack(self.CmdFormat, *self._c).tobytes())
-        self['length'] = bs.pack('uint:16', command_len).tobytes()
+        c = self._c
+        h = self.Header.size
+        end = h + len(c.data)
+        length = end + len(c.end)
+        self._c = c = c._replace(length=self.Length.pack(length))
+
+        if self._buffer is None or len(self._buffer) < length:
+            self._buffer = bytearray(length)
+        buf = self._buffer
+        self.Header.pack_into(buf, 0, c.protocol, c.length, c.serial_number)
+        buf[h:end] = c.data
+        buf[end:length] = c.end
 
-        return bs.pack(self.CmdFormat, *self._c).tobytes()
+        return bytes(buf[:length])
 
     @property
     def command(self):
@@ -51,7 +85,7 @@ class SerialCommandString(object):
 
     @property
     def length(self):
-        return bs.Bits(self['length']).uint
+        return self.Length.unpack(self['length'])[0]
 
     def _pack(self, value):
         if value is None:
@@ -60,11 +94,11 @@ class SerialCommandString(object):
         if isinstance(value, str):
             value = value.encode()
         elif isinstance(value, bool):
-            value = bs.Bits(uintle=value, length=8).tobytes()
+            value = self.Bool.pack(value)
         elif isinstance(value, int):
-            value = bs.Bits(intle=value, length=self.IntLength).tobytes()
+            value = self.Int.pack(value)
         elif isinstance(value, float):
-            value = bs.Bits(floatle=value, length=self.FloatLength).tobytes()
+            value = self.Float.pack(value)
 
         return value
 
@@ -86,7 +120,8 @@ class SerialCommandString(object):
         return self
 
     def __len__(self):
-        return len(self.tobytes)
+        c = self._c
+        return self.Header.size + len(c.data) + len(c.end)
 
     def __repr__(self):
         return '{0[protocol]} {0[serial_number]} {0.length} {0[data]}'.format(self)
@@ -5,7 +5,8 @@ import time
 import serial as sr
 from threading import Thread
 
-from .message import SerialMessage, SerialCommandString
+from .message import SerialMessage
+from .framer import SerialFramer
 
 logging = logging.getLogger('ertza.processors.serial.server')
 
@@ -39,7 +40,7 @@ class SerialServer(sr.Serial):
 
         self.break_condition = False
 
-        self.data_buffer = b''
+        self.framer = SerialFramer()
 
         self.running = False
         self._last_read_time = time.time()
@@ -56,11 +57,11 @@ class SerialServer(sr.Serial):
                 # read all that is there or wait for one byte
                 data = self.read(self.inWaiting() or 1)
                 if time.time() > (self._last_read_time + self.timeout):     # Empty buffer if data is older than timeout
-                    self.data_buffer = b''
+                    self.framer.clear()
 
                 self._last_read_time = time.time()
-                self.data_buffer += (data)
-                self.find_serial_packets()
+                for packet in self.framer.feed(data):
+                    self.handle_packet(packet)
 
             except sr.SerialException as e:
                 logging.error(str(e))
@@ -97,11 +98,8 @@ class SerialServer(sr.Serial):
     def exit(self):
         self.close()
 
-    def find_serial_packets(self):
-        pos = self.data_buffer.find(SerialCommandString.CmdEnd)
-        if pos >= 0:
-            packet, self.data_buffer = self.data_buffer[:pos+2], \
-                self.data_buffer[pos+2:]
+    def handle_packet(self, packet):
+        try:
             m = SerialMessage(cmd_bytes=packet)
             l = m.length
             if len(m) != l:
@@ -111,6 +109,11 @@ class SerialServer(sr.Serial):
                     '{} != {}'.format(m, l, len(m))
                 reply.cmd_bytes += e
                 self.send_message(reply)
-                raise ValueError(e)
-            self._outlet.send(m)
-            self.find_serial_packets()
+                logging.error(e)
+                return
+        except Exception as e:
+            logging.error('Dropped malformed packet {!r}: {!s}'
+                          .format(packet, e))
+            return
+
+        self._outlet.send(m)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import time
+import struct
+import logging
+from binascii import crc_hqx
+from threading import Thread, Event
+
+logging = logging.getLogger('ertza.processors.serial.stream')
+
+
+class StreamFrame(object):
+    """
+    Binary telemetry frame, sent as is on the serial link:
+        SYNC (2 bytes) SEQ (uint16) FIELD... CRC (uint16)
+
+    All numbers are little endian. Fields are 32-bit floats or signed ints,
+    in the order given to stream.start, without names. CRC is the CRC-16
+    CCITT (crc_hqx, init 0xFFFF) of SEQ and fields.
+    """
+
+    __slots__ = ('tobytes',)
+
+    Sync = b'\xee\x5a'
+    msg_type = 'stream'
+
+    def __init__(self, data):
+        self.tobytes = data
+
+    def __len__(self):
+        return len(self.tobytes)
+
+    def __repr__(self):
+        return 'StreamFrame: {}'.format(self.tobytes)
+
+
+class SerialStream(object):
+    """
+    Sample machine keys at a fixed rate and send them in StreamFrames.
+    """
+
+    def __init__(self, machine, outlet, keys, formats, rate):
+        self.machine = machine
+        self.outlet = outlet
+        self.keys = list(keys)
+        self.formats = formats
+        self.rate = rate
+
+        self._struct = struct.Struct('<2sH{}H'.format(formats))
+        self._payload = slice(2, self._struct.size - 2)
+        self._buffer = bytearray(self._struct.size)
+        self.seq = 0
+
+        self._running_event = Event()
+        self._thread = None
+
+    @staticmethod
+    def format_for(value):
+        if isinstance(value, (bool, int)):
+            return 'i'
+        return 'f'
+
+    @classmethod
+    def frame_size(cls, nb_fields):
+        return len(StreamFrame.Sync) + 2 + 4 * nb_fields + 2
+
+    def start(self):
+        self._running_event.clear()
+        self._thread = Thread(target=self._loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def frame(self, values):
+        fields = []
+        for fmt, v in zip(self.formats, values):
+            if isinstance(v, Exception) or v is None:
+                v = 0 if fmt == 'i' else float('nan')
+            fields.append(int(v) if fmt == 'i' else float(v))
+
+        buf = self._buffer
+        self._struct.pack_into(buf, 0, StreamFrame.Sync, self.seq, *fields, 0)
+        crc = crc_hqx(buf[self._payload], 0xffff)
+        struct.pack_into('<H', buf, len(buf) - 2, crc)
+        self.seq = (self.seq + 1) & 0xffff
+        return StreamFrame(bytes(buf))
+
+    def _loop(self):
+        period = 1. / self.rate
+        next_due = time.monotonic()
+        while not self._running_event.is_set():
+            try:
+                values = self.machine.get_many(self.keys)
+                self.outlet.send(self.frame(values))
+            except Exception as e:
+                logging.error('Error while streaming: {!s}'.format(e))
+
+            next_due += period
+            delay = next_due - time.monotonic()
+            if delay < 0:       # Late, don't try to catch up
+                next_due, delay = time.monotonic(), 0
+            self._running_event.wait(delay)
@@ -25,8 +25,10 @@ from types import SimpleNamespace
 from collections import namedtuple
 
 from .exceptions import AbstractErtzaException
+from .events import EventLogger
 
 logging = logging.getLogger('ertza.switch')
+events = EventLogger('ertza.switch')
 
 
 class SwitchException(AbstractErtzaException):
@@ -140,10 +142,10 @@ class Switch(object):
     @classmethod
     def _process_event(cls, evt):
         if evt.evtype != EventTypes.KEY:
-            logging.debug('Ignored {!s}'.format(evt))
+            events.debug('ignored', event=evt)
             return
 
-        logging.debug('Got {!s}'.format(evt))
+        events.debug('received', event=evt)
 
         if evt.keycode in cls._keycodes.keys():
             cnf = cls.get_key_config(evt.keycode)
@@ -160,7 +162,7 @@ class Switch(object):
                 except Exception as e:
                     logging.warn('Exception in {!s}: {!s}'.format(cls, e))
         else:
-            logging.debug('Got unrecognized keycode: {}'.format(evt.keycode))
+            events.debug('unknown_keycode', keycode=evt.keycode)
 
     def __repr__(self):
         return 'Switch {name} at {keycode} ' \
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from threading import Lock
+import os
+import time
+from threading import Lock, Thread, Event
 import logging
 
 logging = logging.getLogger('ertza.thermistor')
@@ -9,6 +11,9 @@ from .temp_chart import temp_chart
 
 _ADC_PATH = "/sys/bus/iio/devices/iio:device0"
 
+ADC_MAX = 4095      # 12-bit ADC
+ADC_VREF = 1.8
+
 
 def transpose(it):
     temp = list()
@@ -24,27 +29,133 @@ def transpose(it):
     return tuple((temp, adcv))
 
 
+class ADCSampler(object):
+    """
+    Sample ADC channels from a single thread.
+
+    Channel files are kept open and read again with pread. Each channel is
+    read *oversampling* times per interval and its median raw value is kept
+    in *values*, which consumers read without locking.
+    """
+
+    def __init__(self, channels, interval=1., oversampling=5):
+        self.channels = sorted(set(channels))
+        self.interval = interval
+        self.oversampling = max(int(oversampling), 1)
+
+        self.values = {}        # {channel: raw value}
+        self.timestamps = {}    # {channel: time.monotonic() of the value}
+        self._fds = {}
+
+        self._thread = None
+        self._running_event = Event()
+
+    @staticmethod
+    def channel_path(channel):
+        return "%s/in_voltage%d_raw" % (_ADC_PATH, channel)
+
+    def start(self):
+        for channel in self.channels:
+            try:
+                self._fds[channel] = os.open(self.channel_path(channel),
+                                             os.O_RDONLY)
+            except OSError as e:
+                logging.warn('Unable to open ADC channel {}: {!s}'.format(
+                    channel, e))
+
+        self.sample()
+
+        self._running_event.clear()
+        self._thread = Thread(target=self._loop, name='adc-sampler')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds = {}
+
+    exit = stop
+
+    def read(self, channel):
+        """
+        Return the median of oversampling raw reads of channel.
+        """
+
+        fd = self._fds[channel]
+        samples = sorted(int(os.pread(fd, 16, 0)) for i in
+                         range(self.oversampling))
+        return samples[len(samples) // 2]
+
+    def sample(self):
+        for channel in self._fds:
+            try:
+                self.values[channel] = self.read(channel)
+                self.timestamps[channel] = time.monotonic()
+            except (OSError, ValueError) as e:
+                logging.warn('Unable to read ADC channel {}: {!s}'.format(
+                    channel, e))
+
+    def _loop(self):
+        while not self._running_event.wait(self.interval):
+            self.sample()
+
+
 class Thermistor(object):
 
     temp_table = transpose(temp_chart['NTCLE100E3103JB0'])
     mutex = Lock()
 
-    def __init__(self, pin, name):
+    # Degrees by raw ADC value, None for a broken connection
+    _lut = None
+
+    def __init__(self, pin, name, sampler=None):
         self.broken_resistor = 200000
 
+        self.channel = pin
         self.pin = "%s/in_voltage%d_raw" % (_ADC_PATH, pin)
         self.name = name
+        self.sampler = sampler
+
+    @classmethod
+    def lut(cls):
+        """
+        Return the raw ADC value to degrees lookup table, built from the
+        chart on first use.
+        """
+
+        if cls._lut is None:
+            conv = cls(0, 'lut')
+            lut = []
+            for raw in range(ADC_MAX + 1):
+                try:
+                    lut.append(conv.raw_to_degrees(raw))
+                except ValueError:
+                    lut.append(None)
+            cls._lut = tuple(lut)
+        return cls._lut
 
     @property
     def temperature(self):
+        if self.sampler is not None:
+            try:
+                raw = self.sampler.values[self.channel]
+            except KeyError:
+                logging.warn("Unable to get temperature from %s" % self.name)
+                return -1.0
+            return self.degrees(raw)
+
         temp = -1.0
         Thermistor.mutex.acquire()
 
         try:
             with open(self.pin, "r") as f:
-                voltage = (float(f.read().rstrip()) / 4095.0) * 1.8
-                res_val = self.voltage_to_resistance(voltage)
-                temp = self.resistance_to_degrees(res_val)
+                temp = self.degrees(int(f.read().rstrip()))
         except IOError as e:
             logging.warn("Unable to get temperature from %s" % self.name)
             logging.exception(e)
@@ -53,27 +164,39 @@ class Thermistor(object):
 
         return temp
 
+    def degrees(self, raw):
+        temp = self.lut()[raw]
+        if temp is None:
+            raise ValueError('Resistance value is off limit for raw value '
+                             '{}. Possible broken connection'.format(raw))
+        return temp
+
+    def raw_to_degrees(self, raw):
+        voltage = (float(raw) / ADC_MAX) * ADC_VREF
+        return self.resistance_to_degrees(self.voltage_to_resistance(voltage))
+
     def resistance_to_degrees(self, resistor_val):
         if resistor_val > self.broken_resistor:
             raise ValueError('Resistance value is off limit. Possible broken connection')
 
-        idx = -1
-        for i, v in enumerate(Thermistor.temp_table[1]):
-            if v - resistor_val <= 0:
-                idx = i
-                break
+        temps, resistances = Thermistor.temp_table
 
-        if idx == -1:
-            raise KeyError('Unable to find temperature for {}'.format(resistor_val))
+        # Out of the chart reads as its limits
+        if resistor_val >= resistances[0]:
+            return float(temps[0])
+        if resistor_val <= resistances[-1]:
+            return float(temps[-1])
 
-        Ta = (Thermistor.temp_table[0][idx] - Thermistor.temp_table[0][idx-1])
-        Tb = (Thermistor.temp_table[1][idx-1] - Thermistor.temp_table[1][idx])
-        Ta /= Tb
-        Tb = Thermistor.temp_table[0][idx-1] - Ta * Thermistor.temp_table[1][idx]
+        for idx, v in enumerate(resistances):
+            if v <= resistor_val:
+                break
 
-        return Ta * resistor_val + Tb
+        # Linear between the chart points around the resistance
+        slope = (temps[idx] - temps[idx-1]) / \
+            (resistances[idx-1] - resistances[idx])
+        return temps[idx] - (resistor_val - resistances[idx]) * slope
 
     def voltage_to_resistance(self, v_sense):
-        if v_sense == 0 or (abs(v_sense - 1.8) < 0.001):
+        if v_sense == 0 or (abs(v_sense - ADC_VREF) < 0.001):
             return 10000000.0
-        return 4700.0 / ((1.8 / v_sense) - 1.0)
+        return 4700.0 / ((ADC_VREF / v_sense) - 1.0)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+from ertza.configparser import ConfigParser
+from ertza.processors.osc import OscMessage, OscAddress
+from ertza.processors.osc.admission import AdmissionControl
+from ertza.processors.osc.admission import ADMIT, DROP, REJECT
+
+
+def _message(path, hostname='10.0.0.1'):
+    return OscMessage(path, sender=OscAddress(hostname=hostname))
+
+
+class Test_AdmissionControl(object):
+    def setup_method(self, method):
+        self.config = ConfigParser()
+        self.config.read_dict({'osc': {
+            'rate_limit': '10',
+            'rate_limit_burst': '5',
+            'rate_limit_config': '2',
+        }})
+        self.ac = AdmissionControl(self.config['osc'])
+
+    def test_sender_limit(self):
+        results = [self.ac.admit(_message('/machine/get')) for i in range(8)]
+        assert results == [ADMIT] * 5 + [REJECT, DROP, DROP]
+
+        # Other senders have their own bucket
+        assert self.ac.admit(_message('/machine/get', '10.0.0.2')) == ADMIT
+
+        st = self.ac.stats
+        assert (st.admitted, st.dropped, st.rejected) == (6, 3, 1)
+
+    def test_class_limit(self):
+        results = [self.ac.admit(_message('/config/get')) for i in range(3)]
+        assert results == [ADMIT, REJECT, DROP]
+        assert self.ac.admit(_message('/machine/get')) == ADMIT
+
+    def test_bypass(self):
+        self.ac.is_trusted = lambda hostname: hostname == '10.0.0.1'
+        for i in range(20):
+            assert self.ac.admit(_message('/slave/get/ok')) == ADMIT
+        assert self.ac.stats.bypassed == 20
+
+        for i in range(5):
+            self.ac.admit(_message('/machine/get', '10.0.0.2'))
+        assert self.ac.admit(_message('/slave/get/ok', '10.0.0.2')) != ADMIT
+
+    def test_no_reply(self):
+        self.config.set('osc', 'rate_limit_reply', 'no')
+        ac = AdmissionControl(self.config['osc'])
+        assert not ac.reply
+        results = [ac.admit(_message('/machine/get')) for i in range(6)]
+        assert results == [ADMIT] * 5 + [DROP]
+
+    def test_bundle(self):
+        bundle = [_message('/machine/set'), _message('/config/get'),
+                  _message('/machine/get')]
+        assert self.ac.admit_bundle(bundle) == ADMIT
+        assert self.ac.stats.admitted == 3
+
+        # 2 tokens left in the sender bucket, none for /config: the whole
+        # bundle is refused
+        assert self.ac.admit_bundle(bundle) == REJECT
+        assert self.ac.admit_bundle(bundle[:1] * 3) == DROP
+        assert self.ac.admit_bundle(bundle[:1] * 2) == ADMIT
+        assert self.ac.stats.dropped == 6
+
+        self.ac.is_trusted = lambda hostname: True
+        assert self.ac.admit_bundle([_message('/slave/get/ok')] * 10) == ADMIT
+        assert self.ac.stats.bypassed == 10
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import struct
+
 import pytest
 
 from ertza.commands import AbstractCommand, OscCommand, SerialCommand
+from ertza.commands.abstract_commands import CommandRegistry
 from ertza.machine import AbstractMachine
 from ertza.processors.osc.message import OscAddress, OscMessage
 from ertza.processors.serial.message import SerialCommandString
@@ -128,3 +131,186 @@ class Test_SerialCommand(object):
         c = self.cmd.send('test', False)
         assert c.tobytes == b'ExmEisla\x00\x1eYYWWPPPPNNNNtest:\x00\r\n'
         assert len(c) == 30
+
+
+class Test_CommandRegistry(object):
+    def test_registered(self, monkeypatch):
+        # Commands defined here are registered in a copy of the registry
+        monkeypatch.setattr(CommandRegistry, 'Commands',
+                            dict(CommandRegistry.Commands))
+
+        class RegisteredCommand(OscCommand):
+            alias = '/test/registered'
+
+        assert OscCommand.registered()['/test/registered'] is RegisteredCommand
+        assert '/test/registered' not in SerialCommand.registered()
+        assert MockOscCommand not in OscCommand.registered().values()
+
+    def test_not_leaked(self):
+        assert '/test/registered' not in CommandRegistry.Commands
+
+
+class Test_SerialMachineSetMany(object):
+    class FakeFrontend(object):
+        def output_value(self, key, value):
+            return min(value, 10.) if isinstance(value, float) else value
+
+        def input_value(self, key, value):
+            return value
+
+    class FakeMachine(object):
+        def __init__(self):
+            self.keys = []
+            self.config = type('Config', (), {'version': 0})()
+            self.driver = type('Driver', (), {})()
+            self.driver.frontend = Test_SerialMachineSetMany.FakeFrontend()
+
+        def __setitem__(self, key, value):
+            if key == 'machine:acceleration' and value < 0:
+                raise ValueError('Negative acceleration')
+            self.keys.append((key, value))
+
+    def setup_method(self, method):
+        from ertza.commands.serial.machine import MachineSetMany
+
+        self.replies = []
+        self.fm = self.FakeMachine()
+        self.cmd = MachineSetMany(None)
+        self.cmd.machine = self.fm
+        self.cmd.send = lambda *args, **kwargs: self.replies.append(args)
+
+    def frame(self, *args):
+        m = SerialCommandString()
+        m += 'machine.set_many'
+        for a in args:
+            m += a
+        return SerialCommandString(cmd_bytes=m.tobytes)
+
+    def test_set_many(self):
+        # 58. packs as b'\x00\x00hB', 1.5 as b'\x00\x00\xc0?'
+        c = self.frame('machine.velocity_ref', 58.,
+                       'machine.acceleration', 1.5,
+                       'machine.command.go', True)
+        self.cmd.execute(c)
+
+        assert self.fm.keys == [('machine:velocity_ref', 58.),
+                                ('machine:acceleration', 1.5),
+                                ('machine:command:go', True)]
+        assert self.replies == [('machine.set_many.ok',
+                                 b'machine.velocity_ref', 10.,
+                                 b'machine.acceleration', 1.5,
+                                 b'machine.command.go', True)]
+        assert self.cmd.lane_for(c) == 'control'
+
+        c = self.frame('machine.velocity_ref', 1., 'machine.command.stop', True)
+        assert self.cmd.lane_for(c) == 'safety'
+        c = self.frame('machine.velocity_ref', 1., 'machine.command.enable',
+                       True)
+        assert self.cmd.lane_for(c) == 'control'
+        c = self.frame('machine.velocity_ref', 1., 'machine.command.enable',
+                       False)
+        assert self.cmd.lane_for(c) == 'safety'
+
+    def test_value_with_separator(self):
+        # 1.6259864e-19 packs as b':\x00\x00 '
+        v = struct.unpack('<f', b':\x00\x00 ')[0]
+        c = self.frame('machine.acceleration', v, 'machine.command.go', True)
+        self.cmd.execute(c)
+        assert self.fm.keys == [('machine:acceleration', v),
+                                ('machine:command:go', True)]
+
+    def test_invalid(self):
+        for c in (self.frame('machine.velocity_ref', 1., 'machine.foo', 1.),
+                  self.frame('machine.velocity_ref', 1., 'machine.command.go'),
+                  self.frame('machine.velocity_ref', 1., 'machine.command.go',
+                             1)):
+            self.replies = []
+            self.cmd.execute(c)
+            assert self.fm.keys == []
+            assert self.replies[0][0] == 'machine.set_many.error'
+            assert self.cmd.lane_for(c) == 'normal'
+
+    def test_codecs(self):
+        from ertza.commands.serial.machine import MachineSet
+
+        codecs = MachineSet._codecs
+        assert codecs['machine:command:control_mode'][0].format in \
+            ('<i', b'<i')
+        assert codecs['machine:jog'][1] is float
+        assert codecs['machine:command:clear_errors'][1] is bool
+        assert 'machine:velocity' not in codecs
+        assert 'machine:status:drive_ready' not in codecs
+
+    def test_echo_cache(self):
+        frontend = self.FakeFrontend()
+        calls = []
+
+        def output_value(key, value):
+            calls.append(key)
+            return frontend.output_value(key, value)
+
+        self.fm.driver.frontend.output_value = output_value
+        for i in range(3):
+            self.cmd.execute(self.frame('machine.velocity_ref', 58.))
+        assert calls == ['velocity_ref']
+        assert self.replies[-1][-1] == 10.
+
+        self.fm.config.version += 1
+        self.cmd.execute(self.frame('machine.velocity_ref', 58.))
+        assert calls == ['velocity_ref'] * 2
+
+    def test_failed(self):
+        c = self.frame('machine.velocity_ref', 1., 'machine.acceleration', -1.,
+                       'machine.command.go', True)
+        self.cmd.execute(c)
+        assert self.fm.keys == [('machine:velocity_ref', 1.)]
+        assert self.replies == [('machine.set_many.error',
+                                 b'machine.acceleration',
+                                 'Negative acceleration')]
+
+
+class Test_OscSlaveSet(object):
+    def test_lane(self):
+        from ertza.commands.osc.slave import SlaveSet
+
+        cmd = SlaveSet(None)
+        for key, value, lane in (('machine:velocity_ref', 1., 'control'),
+                                 ('machine:acceleration', 1., 'control'),
+                                 ('machine:command:stop', True, 'safety'),
+                                 ('machine:command:enable', True, 'control'),
+                                 ('machine:command:enable', False, 'safety')):
+            c = OscMessage('/slave/set', 'uuid', key, value,
+                           sender=OscAddress(hostname='127.0.0.1'))
+            assert cmd.lane_for(c) == lane
+
+
+class Test_OscMachineSet(object):
+    def test_lane(self):
+        from ertza.commands.osc.machine import MachineSet
+
+        cmd = MachineSet(None)
+        for key, value, lane in (('machine:velocity_ref', 1., 'setpoint'),
+                                 ('machine:command:go', True, 'control'),
+                                 ('machine:command:stop', True, 'safety'),
+                                 ('machine:command:enable', True, 'control'),
+                                 ('machine:command:enable', False, 'safety')):
+            c = OscMessage('/machine/set', key, value,
+                           sender=OscAddress(hostname='127.0.0.1'))
+            assert cmd.lane_for(c) == lane
+
+
+class Test_SerialMachineSet(object):
+    def test_lane(self):
+        from ertza.commands.serial.machine import MachineSet
+
+        cmd = MachineSet(None)
+        for key, value, lane in (('machine.velocity_ref', 1., 'setpoint'),
+                                 ('machine.command.stop', True, 'safety'),
+                                 ('machine.command.enable', True, 'control'),
+                                 ('machine.command.enable', False, 'safety')):
+            m = SerialCommandString()
+            m += 'machine.set'
+            m += key
+            m += value
+            c = SerialCommandString(cmd_bytes=m.tobytes)
+            assert cmd.lane_for(c) == lane
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import shutil
+import tempfile
+
+from ertza.configparser import ConfigParser
+from ertza.drivers.fake.driver import FakeDriver
+from ertza.machine.config_watch import ConfigWatcher
+
+
+class _FakeMachine(object):
+    def __init__(self, config):
+        self.config = config
+        self.driver = FakeDriver({})
+        self.driver.frontend.load_config(config, 'motor')
+        self.pushed = []
+
+        set_many = self.driver.set_many
+
+        def _set_many(pairs):
+            self.pushed.append(pairs)
+            return set_many(pairs)
+
+        self.driver.set_many = _set_many
+
+
+class Test_ConfigWatcher(object):
+    def setup_method(self, method):
+        self.base_path = os.path.dirname(os.path.realpath(__file__))
+        self.profile_path = tempfile.mkdtemp()
+        self.write_profile(acceleration=100, entq_kp=1.5)
+
+        self.cf = ConfigParser('{}/test.conf'.format(self.base_path))
+        self.cf.load_profile('watched', profile_path=self.profile_path)
+        self.machine = _FakeMachine(self.cf)
+        self.watcher = ConfigWatcher(self.machine, [self.profile_path])
+
+    def teardown_method(self, method):
+        self.watcher.stop()
+        shutil.rmtree(self.profile_path)
+
+    def write_profile(self, name='watched', **options):
+        with open(os.path.join(self.profile_path, name + '.conf'), 'w') as f:
+            f.write('[motor]\n')
+            for k, v in options.items():
+                f.write('{} = {}\n'.format(k, v))
+
+    def test_reload(self):
+        path = os.path.join(self.profile_path, 'watched.conf')
+        assert self.watcher.reload([path]) == []
+
+        self.write_profile(acceleration=200, entq_kp=1.5, max_acceleration=150)
+        assert self.watcher.reload([path]) == ['acceleration']
+        assert self.machine.pushed == [[('acceleration', 200.)]]
+        assert self.machine.driver.fake_data['acceleration'] == (150.,)
+        assert self.cf.get('motor', 'acceleration') == '200'
+
+        # Limits change the value sent to the drive
+        self.write_profile(acceleration=200, entq_kp=1.5, max_acceleration=180)
+        assert self.watcher.reload([path]) == ['acceleration']
+
+    def test_not_loaded(self):
+        self.write_profile('other', acceleration=300)
+        path = os.path.join(self.profile_path, 'other.conf')
+        assert self.watcher.reload([path]) == []
+        assert self.machine.pushed == []
+
+    def test_inotify(self):
+        self.watcher.start()
+        self.write_profile(acceleration=100, entq_kp=2.5, entq_ki=0.2)
+
+        for i in range(40):
+            if self.machine.pushed:
+                break
+            time.sleep(0.05)
+        assert self.machine.pushed == [[('entq_ki', 0.2), ('entq_kp', 2.5)]]
@@ -5,6 +5,7 @@ import pytest
 import os
 
 from ertza.configparser import ConfigParser, NoSectionError, NoOptionError
+from ertza.configparser import ProfileError
 
 
 class Test_ConfigParser(object):
@@ -53,3 +54,151 @@ class Test_ConfigParser(object):
 
         self.cf['machine']['force_serialnumber'] = '1111'
         assert self.cf['machine']['force_serialnumber'] == '1111'
+
+    def test_view(self):
+        view = self.cf.view
+        assert view['machine']['test_variant'] == '2'
+        assert view['machine']['test_profile'] == '3'
+        assert self.cf.view is view
+
+        with pytest.raises(TypeError):
+            view['machine']['test_profile'] = '4'
+
+        version = self.cf.version
+        self.cf['machine']['test_view'] = '5'
+        assert self.cf.version > version
+        assert self.cf.view is not view
+        assert self.cf.view['machine']['test_view'] == '5'
+        assert self.cf.get('machine', 'test_view') == '5'
+
+        version = self.cf.version
+        self.cf.profile_set('machine', 'test_profile', '6')
+        assert self.cf.version > version
+        assert self.cf.get('machine', 'test_profile') == '6'
+        assert self.cf.getint('machine', 'test_profile') == 6
+
+    def test_section_cache(self):
+        assert self.cf['machine'] is self.cf['machine']
+
+        from ertza.drivers import DriverFrontend
+        fe = DriverFrontend()
+        fe.load_config(self.cf)
+        self.cf.profile_set('motor', 'max_velocity', '100')
+        assert fe.max_velocity == 100.
+        self.cf.profile_set('motor', 'max_velocity', '200')
+        assert fe.max_velocity == 200.
+
+
+class Test_ProfileCache(object):
+    def setup_method(self, method):
+        self.base_path = os.path.dirname(os.path.realpath(__file__))
+        self.cf = ConfigParser('{}/test.conf'.format(self.base_path))
+
+    def test_load(self):
+        path = '{}/profile.conf'.format(self.base_path)
+        assert self.cf.preload_profiles(['profile'],
+                                        profile_path=self.base_path) == \
+            ['profile']
+        assert path in self.cf.profiles
+
+        parser = self.cf.profiles.get(path, 'profile')
+        self.cf.load_profile('profile', profile_path=self.base_path)
+        assert self.cf.profile is parser
+        assert self.cf.get('machine', 'test_profile') == '3'
+
+        # Modified in memory, loading it again reads the file
+        self.cf.profile_set('motor', 'acceleration', '12.5')
+        assert path not in self.cf.profiles
+        self.cf.load_profile('profile', profile_path=self.base_path)
+        assert self.cf.profile is not parser
+        assert not self.cf.profile.has_option('motor', 'acceleration')
+
+    def test_values(self, tmpdir):
+        f = tmpdir.join('typed.conf')
+        f.write('[motor]\nacceleration = 12.5\ninvert = y\n'
+                'control_mode = 2\nentq_kp = bad\n')
+        mtime = os.stat(str(f)).st_mtime
+
+        values = self.cf.profiles.values(str(f), 'typed')
+        assert values == {('motor', 'acceleration'): 12.5,
+                          ('motor', 'invert'): True,
+                          ('motor', 'control_mode'): 2}
+        assert self.cf.profiles.values(str(f), 'typed') is values
+
+        # Invalidated by the modification time
+        f.write('[motor]\nacceleration = 10\n')
+        os.utime(str(f), (mtime + 1, mtime + 1))
+        assert self.cf.profiles.values(str(f), 'typed') == \
+            {('motor', 'acceleration'): 10.}
+
+    def test_typed_values(self, tmpdir, monkeypatch):
+        for name, acceleration in (('fast', '12.5'), ('slow', '2')):
+            tmpdir.join('{}.conf'.format(name)).write(
+                '[motor]\nacceleration = {}\ninvert = true\n'
+                'control_mode = bad\n'.format(acceleration))
+        self.cf.preload_profiles(['fast', 'slow'], profile_path=str(tmpdir))
+
+        from ertza.configparser import ProfileCache
+        real_convert = ProfileCache.convert
+
+        def convert(vtype, value):
+            converted.append(value)
+            return real_convert(vtype, value)
+
+        monkeypatch.setattr(ProfileCache, 'convert', staticmethod(convert))
+
+        from ertza.drivers import DriverFrontend
+        fe = DriverFrontend()
+        fe.load_config(self.cf)
+        for name, acceleration in (('fast', 12.5), ('slow', 2.)) * 2:
+            converted = []
+            self.cf.load_profile(name, profile_path=str(tmpdir))
+            assert self.cf.typed_values('motor')['acceleration'] == \
+                acceleration
+            assert fe.acceleration == acceleration
+            assert fe.invert is True
+            # Only the invalid value is converted again
+            assert converted == ['bad']
+
+        # Values set in memory are converted
+        self.cf.profile_set('motor', 'acceleration', '3')
+        assert fe.acceleration == 3.
+        assert '3' in converted
+
+    def test_missing(self):
+        with pytest.raises(ProfileError):
+            self.cf.preload_profiles(['missing'], profile_path=self.base_path)
+
+
+class Test_ConfigSave(object):
+    def setup_method(self, method):
+        self.base_path = os.path.dirname(os.path.realpath(__file__))
+
+    def test_save(self, tmpdir):
+        custom = tmpdir.join('custom.conf')
+        custom.write('[machine]\ncustom = 1\n')
+
+        cf = ConfigParser('{}/test.conf'.format(self.base_path), str(custom))
+        cf.load_profile('profile', profile_path=self.base_path)
+        cf.set('machine', 'custom', '2')
+        cf.set('machine', 'force_serialnumber', '1234')
+
+        done = []
+        request = cf.save(callback=done.append)
+        assert request.wait(5)
+        assert done == [request]
+        assert request.error is None and request.latency >= 0
+
+        saved = ConfigParser(str(custom))
+        assert dict(saved.items('machine', raw=True)) == {
+            'custom': '2',
+            'force_serialnumber': '1234',
+            'profile': 'profile',
+        }
+        assert tmpdir.listdir() == [custom]
+
+    def test_error(self, tmpdir):
+        cf = ConfigParser('{}/test.conf'.format(self.base_path))
+        request = cf.save(str(tmpdir.join('missing', 'custom.conf')))
+        assert request.wait(5)
+        assert isinstance(request.error, OSError)
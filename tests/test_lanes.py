@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+import time
+from threading import Event
+
+import pytest
+
+from ertza.processors.abstract_message import MessageBundle
+from ertza.processors.abstract_processor import AbstractProcessor
+from ertza.processors.abstract_processor import ProcessorAliasError
+from ertza.processors.lanes import Lane, LaneFullError
+
+
+class Test_Lane(object):
+    def setup_method(self, method):
+        self.done = []
+        self.gate = Event()
+
+        def handler(item):
+            self.gate.wait(2)
+            self.done.append(item)
+
+        self.handler = handler
+
+    def test_fifo(self):
+        lane = Lane('normal', self.handler, maxsize=4)
+        lane.start()
+        for i in range(4):
+            lane.put(i)
+        time.sleep(0.05)    # First item is being executed
+
+        lane.put(4)
+        with pytest.raises(LaneFullError):
+            lane.put(5)
+
+        self.gate.set()
+        time.sleep(0.1)
+        lane.exit()
+
+        assert self.done == [0, 1, 2, 3, 4]
+        assert lane.stats.processed == 5
+        assert lane.stats.dropped == 1
+        assert lane.stats.max_depth == 4
+
+    def test_latest_wins(self):
+        lane = Lane('setpoint', self.handler, maxsize=4, coalesce=True)
+        lane.start()
+        lane.put(('velocity_ref', 0), key='velocity_ref')
+        time.sleep(0.05)
+
+        for i in range(1, 10):
+            lane.put(('velocity_ref', i), key='velocity_ref')
+            lane.put(('torque_ref', i), key='torque_ref')
+
+        self.gate.set()
+        time.sleep(0.1)
+        lane.exit()
+
+        assert self.done == [('velocity_ref', 0), ('velocity_ref', 9),
+                             ('torque_ref', 9)]
+        assert lane.stats.coalesced == 16
+
+    def test_barriers(self):
+        lane = Lane('control', self.handler, maxsize=16, coalesce=True)
+        lane.start()
+        lane.put('busy')
+        time.sleep(0.05)
+
+        lane.put(('velocity_ref', 1), key='velocity_ref')
+        lane.put(('velocity_ref', 2), key='velocity_ref')
+        lane.put('command:go')
+        lane.put(('velocity_ref', 3), key='velocity_ref')
+        lane.put(('velocity_ref', 4), key='velocity_ref')
+        lane.put('command:set_home')
+
+        self.gate.set()
+        time.sleep(0.1)
+        lane.exit()
+
+        assert self.done == ['busy', ('velocity_ref', 2), 'command:go',
+                             ('velocity_ref', 4), 'command:set_home']
+
+    def test_purge(self):
+        lane = Lane('control', self.handler, maxsize=16, coalesce=True)
+        lane.start()
+        lane.put('busy')
+        time.sleep(0.05)
+
+        lane.put(('velocity_ref', 1), key='velocity_ref')
+        lane.put('command:go')
+        lane.put(('velocity_ref', 2), key='velocity_ref')
+        assert lane.purge() == [('velocity_ref', 1), 'command:go',
+                                ('velocity_ref', 2)]
+
+        # Coalesced slots are purged too
+        lane.put(('velocity_ref', 3), key='velocity_ref')
+        lane.put(('velocity_ref', 4), key='velocity_ref')
+
+        self.gate.set()
+        time.sleep(0.1)
+        lane.exit()
+
+        assert self.done == ['busy', ('velocity_ref', 4)]
+        assert lane.stats.purged == 3
+
+
+class Test_ProcessorLanes(object):
+    class FakeCommand(object):
+        def __init__(self, lane, done):
+            self.lane, self.done = lane, done
+            self.errors = []
+
+        def lane_for(self, c):
+            return self.lane
+
+        def execute(self, c):
+            self.done.append(c.command)
+            if c.command.startswith('busy'):
+                time.sleep(0.1)
+
+        def error(self, c, *args):
+            self.errors.append((c.command,) + args)
+
+    class FakeMessage(object):
+        def __init__(self, command, *args):
+            self.command, self.args = command, args
+
+    def processor(self, done):
+        p = AbstractProcessor(None, None, None)
+        p.commands = {
+            'busy': self.FakeCommand('control', done),
+            'setpoint': self.FakeCommand('setpoint', done),
+            'go': self.FakeCommand('control', done),
+            'stop': self.FakeCommand('safety', done),
+            'get': self.FakeCommand('normal', done),
+            'busy_get': self.FakeCommand('normal', done),
+            'save': self.FakeCommand('slow', done),
+            'ping': self.FakeCommand('inline', done),
+        }
+        for name, workers, maxsize, coalesce in p.Lanes:
+            p.lanes[name] = Lane(name, p._execute, workers, maxsize, coalesce)
+            p.lanes[name].start()
+        return p
+
+    def bundle(self, *aliases):
+        return MessageBundle(self.FakeMessage(a, 'velocity_ref')
+                             for a in aliases)
+
+    def test_safety_purges_control(self):
+        done = []
+        p = self.processor(done)
+
+        p.execute(self.FakeMessage('busy'))
+        time.sleep(0.02)    # Being executed
+        for alias in ('setpoint', 'go', 'stop'):
+            p.execute(self.FakeMessage(alias, 'velocity_ref'))
+        time.sleep(0.3)
+        p.exit()
+
+        assert done == ['busy', 'stop']
+        assert p.commands['go'].errors == [('go', 'cancelled')]
+        assert p.commands['setpoint'].errors == [('setpoint', 'cancelled')]
+
+    def test_normal_order(self):
+        done = []
+        p = self.processor(done)
+
+        p.execute(self.FakeMessage('busy_get'))
+        p.execute(self.FakeMessage('get'))
+        time.sleep(0.2)
+        p.exit()
+
+        assert done == ['busy_get', 'get']
+
+    def test_bundle_order(self):
+        done = []
+        p = self.processor(done)
+
+        # Executed on this thread
+        p.execute(self.bundle('ping', 'ping'))
+        # Runs on the control lane, as a single item
+        p.execute(self.bundle('get', 'setpoint', 'save', 'go', 'ping'))
+        time.sleep(0.1)
+
+        assert p.lanes['control'].stats.processed == 1
+        assert p.lanes['normal'].stats.processed == 0
+        p.exit()
+        assert done == ['ping', 'ping',
+                        'get', 'setpoint', 'save', 'go', 'ping']
+
+    def test_bundle_purge(self):
+        done = []
+        p = self.processor(done)
+
+        p.execute(self.FakeMessage('busy'))
+        time.sleep(0.02)    # Being executed
+        p.execute(self.bundle('setpoint', 'go'))
+        p.execute(self.FakeMessage('stop'))
+        time.sleep(0.3)
+        p.exit()
+
+        assert done == ['busy', 'stop']
+        assert p.commands['go'].errors == [('go', 'cancelled')]
+        assert p.commands['setpoint'].errors == [('setpoint', 'cancelled')]
+
+    def test_bundle_unknown(self):
+        done = []
+        p = self.processor(done)
+
+        with pytest.raises(ProcessorAliasError):
+            p.execute(self.bundle('get', 'unknown'))
+        time.sleep(0.05)
+        p.exit()
+        assert done == []
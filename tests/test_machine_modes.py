@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ertza.machine.modes import StandaloneMachineMode
+
+
+class _Driver(object):
+    def get_attribute_map(self):
+        return {'velocity': (float, 'r'), 'position': (int, 'r')}
+
+    def __getitem__(self, key):
+        if key == 'position':
+            raise ValueError('Unreadable')
+        return 10.
+
+
+class _ManyDriver(_Driver):
+    def get_many(self, keys):
+        return [self.missing for k in keys]
+
+
+class _FakeMachine(object):
+    def __init__(self, driver):
+        self.driver = driver
+
+
+class Test_StandaloneGetMany(object):
+    def setup_method(self, method):
+        # Driver attributes are added to the map of the class
+        StandaloneMachineMode.MachineMap = dict(
+            StandaloneMachineMode.MachineMap)
+
+    def teardown_method(self, method):
+        del StandaloneMachineMode.MachineMap
+
+    def test_per_key(self):
+        mode = StandaloneMachineMode(_FakeMachine(_Driver()))
+        velocity, position = mode.get_many(['velocity', 'position'])
+        assert velocity == 10.
+        assert isinstance(position, ValueError)
+
+    def test_driver_error(self):
+        mode = StandaloneMachineMode(_FakeMachine(_ManyDriver()))
+        with pytest.raises(AttributeError):
+            mode.get_many(['velocity'])
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import time
+import socket
+from threading import Event
+
+from ertza.drivers.osc.driver import OscDriver
+from ertza.drivers.osc.exceptions import OscDriverTimeout
+from ertza.machine import SlaveTelemetryMirror
+from ertza.machine.slave import SlaveRequest
+
+
+class _Reply(object):
+    def __init__(self, path, *args):
+        self.path, self.args = path, args
+
+
+class _FakeSlaveMachine(object):
+    """
+    Slave replying at once to get requests, or never for missing keys.
+    """
+
+    def __init__(self, serialnumber, values):
+        self.serialnumber = serialnumber
+        self.values = values
+        self.requests = []
+
+    def get(self, key, **kwargs):
+        rq = SlaveRequest(key, getitem=True, event=Event(), **kwargs)
+        self.requests.append(rq)
+        if key in self.values:
+            value = self.values[key]
+            path = '/slave/get/error' if isinstance(value, Exception) \
+                else '/slave/get/ok'
+            rq.reply = _Reply(path, 'uuid', key, value)
+        return rq
+
+
+class _FakeMachine(object):
+    def __init__(self, *slaves):
+        self.slave_machines = {(sm.serialnumber, None): sm for sm in slaves}
+
+
+class _RecordingEvent(Event):
+    def __init__(self):
+        super().__init__()
+        self.was_set = False
+
+    def set(self):
+        self.was_set = True
+        super().set()
+
+
+class Test_SlaveTelemetryMirror(object):
+    def setup_method(self, method):
+        self.slave = _FakeSlaveMachine('0001', {
+            'velocity': 10.,
+            'position': 1000,
+            'error_code': ValueError('Unreadable'),
+        })
+        self.mirror = SlaveTelemetryMirror(
+            _FakeMachine(self.slave),
+            keys=('velocity', 'position', 'error_code', 'torque'),
+            interval=0.05, timeout=0.1)
+
+    def teardown_method(self, method):
+        self.mirror.stop()
+
+    def test_poll(self):
+        t0 = time.time()
+        values = self.mirror.poll(self.slave)
+
+        # Errors and missing replies are left out
+        assert values == {'velocity': 10., 'position': 1000}
+        # All requests are sent before waiting, with the poll timeout
+        assert [rq.item for rq in self.slave.requests] == \
+            ['velocity', 'position', 'error_code', 'torque']
+        assert all(rq.poll_timeout == 0.1 for rq in self.slave.requests)
+        assert time.time() - t0 < 0.3
+
+        state = self.mirror.state('0001')['0001']
+        assert state['velocity'][0] == 10.
+        assert t0 <= state['velocity'][1] <= time.time()
+        assert 'torque' not in state
+
+    def test_stale(self):
+        self.mirror.poll(self.slave)
+        polled_at = self.mirror.state()['0001']['velocity'][1]
+
+        # The slave stops answering, the last value is kept with its time
+        self.slave.values = {}
+        assert self.mirror.poll(self.slave) == {}
+        assert self.mirror.state()['0001']['velocity'] == (10., polled_at)
+
+    def test_push_and_loop(self):
+        self.mirror.update('0002', {'velocity': 5.}, timestamp=1.)
+        assert self.mirror.state('0002') == {'0002': {'velocity': (5., 1.)}}
+
+        self.mirror.start()
+        end = time.time() + 1
+        while time.time() < end and len(self.slave.requests) < 8:
+            time.sleep(0.01)
+        self.mirror.stop()
+        assert len(self.slave.requests) >= 8
+
+
+class Test_OscDriverPoll(object):
+    def setup_method(self, method):
+        # Slave that never answers
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+
+        self.driver = OscDriver({
+            'target_address': '127.0.0.1',
+            'target_port': self.sock.getsockname()[1],
+            'timeout': 0.05,
+        }, None)
+        self.driver.timeout_event = _RecordingEvent()
+        self.driver.init_pipes()
+
+    def teardown_method(self, method):
+        self.sock.close()
+
+    def test_poll_timeout(self):
+        rq = self.driver.get('velocity', poll_timeout=0.02, event=Event())
+        assert rq.event.wait(1)
+        assert isinstance(rq.exception, OscDriverTimeout)
+        assert not self.driver.timeout_event.was_set
+
+        rq = self.driver.get('velocity', event=Event())
+        assert rq.event.wait(1)
+        assert self.driver.timeout_event.was_set
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+from ertza.drivers.netdata_maps import MicroflexE100Map, netdata_ranges
+
+
+class Test_NetdataRanges(object):
+    def test_ranges(self):
+        m = MicroflexE100Map
+        netdata = [m[k].netdata for k in ('position', 'velocity', 'torque',
+                                          'effort', 'current_ratio')]
+        netdata += [m['status']['drive_ready'].netdata,
+                    m['status']['timeout'].netdata]
+
+        ranges = [(first, [nd.addr for nd in run])
+                  for first, run in netdata_ranges(netdata)]
+        assert ranges == [(0, [0]), (51, [51, 52]), (59, [59, 60, 61])]
+
+    def test_max_length(self):
+        m = MicroflexE100Map
+        netdata = [m[k].netdata for k in ('velocity', 'position',
+                                          'position_target')]
+
+        ranges = [[nd.addr for nd in run]
+                  for first, run in netdata_ranges(netdata, 2)]
+        assert ranges == [[51, 52], [53]]
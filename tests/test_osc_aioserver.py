@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import socket
+
+import pytest
+
+from ertza.configparser import ConfigParser
+from ertza.processors.osc.aioserver import AsyncOscServer
+
+
+def _outlet(identifier):
+    def coro():
+        while True:
+            (yield)
+    c = coro()
+    next(c)
+    return c
+
+
+class Test_AsyncOscServer(object):
+    def setup_method(self, method):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('0.0.0.0', 0))
+        self.port = self.sock.getsockname()[1]
+
+        self.config = ConfigParser()
+        self.config.read_dict({'osc': {'listen_port': str(self.port)}})
+
+    def teardown_method(self, method):
+        self.sock.close()
+
+    def test_start_error(self):
+        server = AsyncOscServer(_outlet, self.config['osc'])
+        with pytest.raises(OSError):
+            server.start()
+        assert not server.running
+        assert not server._t.is_alive()
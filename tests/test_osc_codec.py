@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ertza.processors.osc.codec import encode_message, decode_message
+from ertza.processors.osc.codec import OscCodecError
+from ertza.processors.osc.codec import encode_bundle, decode_bundle, is_bundle
+from ertza.processors.osc.codec import time_to_timetag, timetag_to_time
+from ertza.processors.osc.codec import IMMEDIATE
+
+
+class Test_OscCodec(object):
+    def test_encode(self):
+        assert encode_message('/test') == b'/test\x00\x00\x00,\x00\x00\x00'
+        assert encode_message('/test', (1,)) == \
+            b'/test\x00\x00\x00,i\x00\x00\x00\x00\x00\x01'
+        assert encode_message('/test', ('abcd',)) == \
+            b'/test\x00\x00\x00,s\x00\x00abcd\x00\x00\x00\x00'
+        assert encode_message('/test', (0.5,)) == \
+            b'/test\x00\x00\x00,f\x00\x00?\x00\x00\x00'
+        assert encode_message('/test', (True, False, None)) == \
+            b'/test\x00\x00\x00,TFN\x00\x00\x00\x00'
+
+    def test_roundtrip(self):
+        args = (1, 2.5, 'velocity_ref', b'\x01\x02\x03', True, False, None,
+                2 ** 40)
+        data = encode_message('/machine/set', args)
+        path, types, dargs = decode_message(data)
+
+        assert path == '/machine/set'
+        assert types == 'ifsbTFNh'
+        assert dargs == args
+
+    def test_explicit_types(self):
+        data = encode_message('/test', (1, 2), types='fd')
+        assert decode_message(data) == ('/test', 'fd', (1.0, 2.0))
+
+        with pytest.raises(OscCodecError):
+            encode_message('/test', (1, 2), types='f')
+
+    def test_malformed(self):
+        with pytest.raises(OscCodecError):
+            decode_message(b'/test')
+
+        with pytest.raises(OscCodecError):
+            decode_message(b'/test\x00\x00\x00,i\x00\x00\x00\x00')
+
+        with pytest.raises(OscCodecError):
+            decode_message(b'/test\x00\x00\x00,x\x00\x00')
+
+    def test_bundle(self):
+        m1 = encode_message('/machine/set', ('velocity_ref', 100.))
+        m2 = encode_message('/machine/set', ('command:go', True))
+        nested = encode_bundle((m2,))
+        data = encode_bundle((m1, nested))
+
+        assert is_bundle(data)
+        assert not is_bundle(m1)
+
+        timetag, messages = decode_bundle(data)
+        assert timetag == IMMEDIATE
+        assert messages == [('/machine/set', 'sf', ('velocity_ref', 100.)),
+                            ('/machine/set', 'sT', ('command:go', True))]
+
+        with pytest.raises(OscCodecError):
+            decode_bundle(data[:-4])
+
+        # Elements are decoded within their size only
+        for element in (b'/tes', b'/test\x00\x00\x00,s\x00\x00abcd',
+                        b'/test\x00\x00\x00,i\x00\x00\x00\x00',
+                        b'/test\x00\x00\x00,b\x00\x00\x00\x00\x00\x08'):
+            with pytest.raises(OscCodecError):
+                decode_bundle(encode_bundle((element, m1)))
+
+    def test_timetag(self):
+        assert timetag_to_time(IMMEDIATE) is None
+        assert time_to_timetag(0) == 2208988800 << 32
+        assert abs(timetag_to_time(time_to_timetag(1500000000.25)) -
+                   1500000000.25) < 1e-6
+
+        timetag, _ = decode_bundle(encode_bundle((), time_to_timetag(10.5)))
+        assert timetag_to_time(timetag) == 10.5
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import socket
+import logging
+from threading import Thread
+
+from ertza.commands.osc.loggging import OscLogHandler
+from ertza.processors.osc.codec import decode_bundle
+
+
+class Test_OscLogHandler(object):
+    def setup_method(self, method):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(2)
+        self.port = self.sock.getsockname()[1]
+        self.handler = None
+
+    def teardown_method(self, method):
+        if self.handler is not None:
+            self.handler.close()
+        self.sock.close()
+
+    def start(self, **kwargs):
+        self.handler = OscLogHandler(None, '127.0.0.1', self.port, **kwargs)
+        self.handler.setFormatter(logging.Formatter('%(message)s'))
+
+    def emit(self, msg, *args):
+        self.handler.emit(logging.LogRecord(
+            'ertza.test', logging.INFO, __file__, 0, msg, args, None))
+
+    def receive(self):
+        data = self.sock.recv(4096)
+        timetag, messages = decode_bundle(data)
+        return len(data), [(path, args) for path, types, args in messages]
+
+    def test_bundle(self):
+        self.start(rate=5.)
+        values = [1]
+        self.emit('first %s', values)
+        # Records are formatted when emitted, not when sent
+        values.append(2)
+        self.emit('second')
+
+        size, messages = self.receive()
+        assert messages == [('/log/entry', ('first [1]',)),
+                            ('/log/entry', ('second',))]
+
+    def test_packet_size(self):
+        self.start(rate=5.)
+        for i in range(5):
+            self.emit('{}'.format(i) * 500)
+
+        received = []
+        while len(received) < 5:
+            size, messages = self.receive()
+            assert size <= OscLogHandler.max_packet_size
+            received += messages
+        assert [args[0][0] for path, args in received] == \
+            ['0', '1', '2', '3', '4']
+
+    def test_dropped(self):
+        self.start(buffer_size=4, rate=5.)
+        for i in range(10):
+            self.emit('record {}'.format(i))
+
+        size, messages = self.receive()
+        assert self.handler.dropped == 6
+        assert messages == [('/log/dropped', (6,))] + [
+            ('/log/entry', ('record {}'.format(i),)) for i in range(6, 10)]
+
+        # Reported once
+        self.emit('record 10')
+        size, messages = self.receive()
+        assert messages == [('/log/entry', ('record 10',))]
+
+    def test_dropped_threads(self):
+        self.start(buffer_size=16, rate=1.)
+        threads = [Thread(target=lambda: [self.emit('record')
+                                          for i in range(1000)])
+                   for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert self.handler.dropped == 4000 - 16
+        size, messages = self.receive()
+        assert messages[0] == ('/log/dropped', (4000 - 16,))
+        assert len(messages) == 17
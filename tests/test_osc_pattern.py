@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ertza.processors.osc.pattern import AliasTrie, OscPatternError
+from ertza.processors.osc.pattern import compile_pattern, is_pattern
+
+
+ALIASES = (
+    '/alive',
+    '/machine/get',
+    '/machine/get_many',
+    '/machine/set',
+    '/machine/sync/set',
+    '/slave/get/ok',
+    '/slave/set/ok',
+    '/slave/set/error',
+)
+
+
+class Test_OscPattern(object):
+    def setup_method(self, method):
+        self.trie = AliasTrie(ALIASES)
+
+    def test_literal(self):
+        assert not is_pattern('/machine/get')
+        assert self.trie.match('/machine/get') == ['/machine/get']
+        assert self.trie.match('/machine') == []
+        assert self.trie.match('/machine/get/ok') == []
+
+    def test_wildcards(self):
+        assert self.trie.match('/machine/*') == \
+            ['/machine/get', '/machine/get_many', '/machine/set']
+        assert self.trie.match('/machine/?et') == \
+            ['/machine/get', '/machine/set']
+        assert self.trie.match('/*/*/ok') == ['/slave/get/ok', '/slave/set/ok']
+        assert self.trie.match('/machine/get*') == \
+            ['/machine/get', '/machine/get_many']
+
+    def test_brackets(self):
+        assert self.trie.match('/machine/[gs]et') == \
+            ['/machine/get', '/machine/set']
+        assert self.trie.match('/machine/[a-h]et') == ['/machine/get']
+        assert self.trie.match('/machine/[!g]et') == ['/machine/set']
+        assert self.trie.match('/slave/set/{ok,error}') == \
+            ['/slave/set/error', '/slave/set/ok']
+
+    def test_invalid(self):
+        with pytest.raises(OscPatternError):
+            self.trie.match('/machine/[get')
+        with pytest.raises(OscPatternError):
+            self.trie.match('/machine/{get,set')
+        with pytest.raises(OscPatternError):
+            self.trie.match('machine/*')
+
+    def test_cache(self):
+        assert compile_pattern('/machine/*') is compile_pattern('/machine/*')
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from ertza.processors.serial.framer import SerialFramer
+from ertza.processors.serial.message import SerialCommandString
+
+
+def _frame(data, serial_number='YYWWPPPPNNNN'):
+    SerialCommandString.SerialNumber = serial_number
+    s = SerialCommandString()
+    s += data
+    return s.tobytes
+
+
+class Test_SerialFramer(object):
+    def setup_method(self, method):
+        self.framer = SerialFramer(size=256)
+
+    def test_frames(self):
+        frames = [_frame('machine.get:velocity'), _frame('identify')]
+        assert self.framer.feed(b''.join(frames)) == frames
+
+        data = b''.join(frames)
+        assert self.framer.feed(data[:5]) == []
+        assert self.framer.feed(data[5:50]) == [frames[0]]
+        assert self.framer.feed(data[50:]) == [frames[1]]
+        assert len(self.framer) == 0
+
+    def test_binary_data(self):
+        # \r\n in arguments doesn't end the frame
+        f = _frame('machine.set:velocity_ref')
+        s = SerialCommandString(cmd_bytes=f)
+        s += 2573    # b'\r\n\x00\x00'
+        f = s.tobytes
+        assert b'\r\n\x00' in f
+        assert self.framer.feed(f) == [f]
+
+    def test_resync(self):
+        f = _frame('identify')
+        assert self.framer.feed(b'garbage\r\n' + f + b'Exm' + f) == [f, f]
+        assert self.framer.dropped == 12
+
+        # Bad length: the packet up to the next frame end is returned
+        bad = f[:8] + b'\x00\x30' + f[10:]
+        assert self.framer.feed(bad + f) == [bad, f]
+
+    def test_overflow(self):
+        f = _frame('identify')
+        assert self.framer.feed(b'x' * 300) == []
+        assert self.framer.feed(f * 3) == [f] * 3
+        assert self.framer.dropped == 300
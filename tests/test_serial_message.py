@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ertza.processors.serial.message import SerialCommandString
+from ertza.processors.serial.message import SerialCommandError
+
+
+class Test_SerialCommandString(object):
+    def setup_method(self, method):
+        SerialCommandString.SerialNumber = 'YYWWPPPPNNNN'
+
+    def frame(self, *args):
+        s = SerialCommandString()
+        for a in args:
+            s += a
+        return s
+
+    def test_encode(self):
+        s = self.frame('machine.set', 'velocity_ref', 1.5, True, 7)
+        data = b'machine.set:velocity_ref:\x00\x00\xc0?:\x01:\x07\x00\x00\x00'
+
+        assert s.tobytes == b'ExmEisla' + bytes((0, 22 + len(data) + 2)) + \
+            b'YYWWPPPPNNNN' + data + b'\r\n'
+        assert len(s) == s.length == len(s.tobytes)
+
+    def test_roundtrip(self):
+        s = self.frame('machine.set', 'velocity_ref', -3)
+        r = SerialCommandString(cmd_bytes=s.tobytes)
+
+        assert r.tobytes == s.tobytes
+        assert r.command == b'machine.set'
+        assert r.args == (b'velocity_ref', b'\xfd\xff\xff\xff')
+        assert r['serial_number'] == b'YYWWPPPPNNNN'
+        assert r.length == len(s)
+
+        # The buffer is reused, shorter and longer frames are packed again
+        r['data'] = b'identify'
+        assert r.tobytes[22:] == b'identify\r\n'
+        assert r.length == 32
+        r += 'x' * 100
+        assert r.tobytes.endswith(b'xxx\r\n')
+        assert r.length == 32 + 101
+
+    def test_errors(self):
+        f = self.frame('identify').tobytes
+
+        with pytest.raises(SerialCommandError):
+            SerialCommandString(cmd_bytes=b'ExmX' + f[4:])
+        with pytest.raises(SerialCommandError):
+            SerialCommandString(cmd_bytes=f[:20])
+        with pytest.raises(SerialCommandError):
+            SerialCommandString(cmd_bytes=f[:-2])
+        with pytest.raises(ValueError):
+            self.frame('machine.set', None)
+
+        # Other protocols are explicit
+        s = SerialCommandString(protocol=b'OtherTag')
+        s += 'identify'
+        r = SerialCommandString(cmd_bytes=s.tobytes, protocol=b'OtherTag')
+        assert r.command == b'identify'
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import math
+import struct
+from binascii import crc_hqx
+
+from ertza.processors.serial.stream import SerialStream, StreamFrame
+
+
+class Test_SerialStream(object):
+    def test_frame(self):
+        stream = SerialStream(None, None, ('velocity', 'status:drive_enable'),
+                              'fi', 10)
+        assert SerialStream.frame_size(2) == 14
+
+        f = stream.frame((1.5, True)).tobytes
+        assert len(f) == 14
+        assert f[:2] == StreamFrame.Sync
+        assert struct.unpack('<Hfi', f[2:12]) == (0, 1.5, 1)
+        assert struct.unpack('<H', f[12:])[0] == crc_hqx(f[2:12], 0xffff)
+
+        # Unreadable keys, sequence number
+        f = stream.frame((ValueError(), None)).tobytes
+        seq, v, i = struct.unpack('<Hfi', f[2:12])
+        assert seq == 1 and math.isnan(v) and i == 0
+
+        stream.seq = 0xffff
+        stream.frame((0., 0))
+        assert stream.seq == 0
+
+    def test_formats(self):
+        assert SerialStream.format_for(1.) == 'f'
+        assert SerialStream.format_for(1) == 'i'
+        assert SerialStream.format_for(False) == 'i'
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import time
+from threading import Lock
+
+from ertza.async_utils import Channel, coroutine
+from ertza.configparser import ConfigParser
+from ertza.machine.exceptions import SlaveMachineError
+from ertza.machine.machine import Machine
+from ertza.machine.slave import Slave
+
+
+class _Reply(object):
+    def __init__(self, *args):
+        self.args = args
+
+
+class _FakeSlaveMachine(object):
+    """
+    Slave answering pings after a delay, from answer_after seconds on.
+    """
+
+    def __init__(self, serialnumber, answer_after=0., ping_delay=0.01):
+        self.slave = Slave(serialnumber, '10.0.0.{}'.format(serialnumber[-1]),
+                           'Fake', 'velocity', {})
+        self.driver = self
+        self.answer_at = time.time() + answer_after
+        self.ping_delay = ping_delay
+
+        self.outlet = self._outlet()
+        self.started = False
+        self.pings = self.active = self.max_active = 0
+        self._lock = Lock()
+
+    @property
+    def serialnumber(self):
+        return self.slave.serialnumber
+
+    @coroutine
+    def _outlet(self):
+        while True:
+            (yield)
+
+    def ping(self):
+        with self._lock:
+            self.pings += 1
+            self.active += 1
+            self.max_active = max(self.active, self.max_active)
+        try:
+            time.sleep(self.ping_delay)
+            if time.time() < self.answer_at:
+                raise SlaveMachineError('No answer')
+            return self.ping_delay * 1000
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def get(self, key, block=False):
+        return _Reply(None, key, self.serialnumber)
+
+    def start(self):
+        self.started = True
+
+    def exit(self):
+        pass
+
+
+class Test_SlaveBringUp(object):
+    def setup_method(self, method):
+        self.m = Machine()
+        self.m.config = ConfigParser()
+        self.m.config.read_dict({'slaves': {
+            'startup_timeout': '0.1',
+            'late_join_interval': '0.05',
+        }})
+        self.m.slave_ping_interval = 0.02
+
+    def teardown_method(self, method):
+        self.m._slaves_bringup_event.set()
+        if self.m._late_join_thread is not None:
+            self.m._late_join_thread.join()
+        Channel._Channels.pop('slave_machines', None)
+
+    def add(self, sm):
+        self.m.slave_machines[(sm.serialnumber, sm.slave.address)] = sm
+        return (sm.serialnumber, sm.slave.address)
+
+    def wait_admitted(self, key, timeout=2):
+        end = time.time() + timeout
+        while time.time() < end:
+            if key in self.m.slave_machines:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_timeout_and_late_join(self):
+        up = self.add(_FakeSlaveMachine('0001'))
+        late = self.add(_FakeSlaveMachine('0002', answer_after=0.3))
+
+        results = self.m.load_slaves()
+        assert results[up][0]
+        assert not results[late][0]
+        assert up in self.m.slave_machines
+        assert late in self.m.pending_slaves
+
+        assert self.wait_admitted(late)
+        assert not self.m.pending_slaves
+        assert self.m.slave_machines[late].started
+        assert self.m.get_slave(serialnumber='0002') is \
+            self.m.slave_machines[late]
+
+    def test_no_concurrent_bring_up(self):
+        # The first ping outlasts the startup timeout, the late join loop
+        # must wait for it before pinging again
+        sm = _FakeSlaveMachine('0001', answer_after=0.5, ping_delay=0.4)
+        key = self.add(sm)
+
+        results = self.m.load_slaves()
+        assert results[key] == (False, 'timeout')
+        assert key in self.m.pending_slaves
+
+        assert self.wait_admitted(key)
+        assert sm.max_active == 1
+        assert sm.pings >= 2
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import time
+from threading import Event
+
+import pytest
+
+from ertza.machine import TelemetrySubscriptions
+
+
+class _FakeMachine(object):
+    def __init__(self):
+        self.reads = {}
+
+    def get(self, key):
+        if key == 'bad':
+            raise KeyError(key)
+        self.reads[key] = self.reads.get(key, 0) + 1
+        return self.reads[key]
+
+    def get_many(self, keys):
+        values = []
+        for k in keys:
+            try:
+                values.append(self.get(k))
+            except KeyError as e:
+                values.append(e)
+        return values
+
+
+class Test_TelemetrySubscriptions(object):
+    def setup_method(self, method):
+        self.machine = _FakeMachine()
+        self.subs = TelemetrySubscriptions(self.machine, ttl=0.5, max_rate=100)
+
+    def teardown_method(self, method):
+        self.subs.stop()
+
+    def test_shared_sampling(self):
+        received = {'a': [], 'b': []}
+        done = Event()
+
+        def push(name):
+            def cb(values):
+                received[name].append(values)
+                if len(received['a']) >= 3 and len(received['b']) >= 3:
+                    done.set()
+            return cb
+
+        self.subs.subscribe('a', ('velocity', 'bad'), 50, push('a'))
+        self.subs.subscribe('b', ('velocity', 'torque'), 50, push('b'))
+        self.subs.start()
+        assert done.wait(2)
+        self.subs.stop()
+
+        assert received['a'][0] == [('velocity', 1)]
+        assert received['b'][0] == [('velocity', 1), ('torque', 1)]
+        # One read per tick, not one per subscriber
+        assert self.machine.reads['velocity'] <= \
+            max(len(received['a']), len(received['b']))
+
+    def test_expiry(self):
+        self.subs.subscribe('a', ('velocity',), 100, lambda v: None)
+        self.subs.start()
+        assert len(self.subs) == 1
+
+        time.sleep(0.7)
+        assert len(self.subs) == 0
+
+        self.subs.subscribe('a', ('velocity',), 100, lambda v: None)
+        assert self.subs.unsubscribe('a')
+        assert not self.subs.unsubscribe('a')
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            self.subs.subscribe('a', (), 10, None)
+        with pytest.raises(ValueError):
+            self.subs.subscribe('a', ('velocity',), 0, None)
+
+    def test_sample_error(self):
+        received = []
+        done = Event()
+        get_many = self.machine.get_many
+        failures = [RuntimeError('Driver timeout')] * 2
+
+        def failing_get_many(keys):
+            if failures:
+                raise failures.pop()
+            return get_many(keys)
+
+        def cb(values):
+            received.append(values)
+            done.set()
+
+        self.machine.get_many = failing_get_many
+        self.subs.subscribe('a', ('velocity',), 100, cb)
+        self.subs.start()
+        assert done.wait(1)
+
+        assert not failures
+        assert received[0] == [('velocity', 1)]
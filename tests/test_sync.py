@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from threading import Timer
+
+import pytest
+
+from ertza.async_utils import Channel, coroutine
+from ertza.commands import OscCommand
+from ertza.configparser import ConfigParser
+from ertza.drivers.fake.driver import FakeDriver
+from ertza.machine import SyncBarrier, MachineError
+from ertza.machine.machine import Machine
+from ertza.machine.modes import MasterMachineMode
+from ertza.machine.slave import Slave
+from ertza.processors import OscProcessor
+from ertza.processors.osc.message import OscAddress, OscMessage
+
+
+class _TimedDriver(FakeDriver):
+    def __init__(self):
+        super().__init__({})
+        self.set_times = {}
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.set_times[key] = time.monotonic()
+
+
+class _FakeSlaveMachine(object):
+    """
+    Slave answering sync requests like SlaveSyncArm and SlaveSyncRelease,
+    releasing after its one way latency.
+    """
+
+    def __init__(self, serialnumber, latency):
+        self.slave = Slave(serialnumber, None, None, None, None)
+        self.driver = self
+        self.outlet = self
+        self.latency = 2 * latency      # Round trip
+        self.timeout = 0.5
+
+        self.axis = _TimedDriver()
+        self.barrier = SyncBarrier()
+        self.barrier.spin_time = 0
+        self.armed = []
+        self.timers = []
+
+    def send(self, rq):
+        if rq.path == '/slave/sync/arm':
+            token, *args = rq.args
+            self.armed = list(zip(args[0::2], args[1::2]))
+            self.barrier.arm(token, self._set, self.armed)
+            rq.event.set()
+        elif rq.path == '/slave/sync/release':
+            # Released relative to the reception time of a link with a
+            # constant latency, whenever the timer thread actually runs
+            token, delay = rq.args
+            received = time.monotonic() + self.latency / 2
+            t = Timer(self.latency / 2, self.barrier.release,
+                      args=(token, received + delay))
+            t.start()
+            self.timers.append(t)
+
+    def _set(self, pairs):
+        for k, v in pairs:
+            self.axis[k] = v
+
+    def __str__(self):
+        return self.slave.serialnumber
+
+
+class Test_MachineSyncSet(object):
+    # One way latency of each slave
+    latencies = (0.002, 0.010, 0.025)
+
+    def setup_method(self, method):
+        self.m = Machine()
+        # Axes are threads of one process here, spinning until the release
+        # time would take the CPU from the others
+        self.m.sync_barrier.spin_time = 0
+        self.m.driver = _TimedDriver()
+        self.m.operating_mode = 'master'
+        self.m.config = ConfigParser('{}/test.conf'.format(
+            os.path.dirname(__file__)))
+
+        self.slaves = []
+        for i, l in enumerate(self.latencies):
+            sm = _FakeSlaveMachine('000{}'.format(i + 1), l)
+            self.m.slave_machines[sm.slave.serialnumber] = sm
+            self.slaves.append(sm)
+        self.m._machine_keys = MasterMachineMode(self.m)
+
+    def teardown_method(self, method):
+        Channel._Channels.pop('slave_machines', None)
+
+    def test_release_skew(self):
+        self.m.sync_set('machine:velocity_ref', 10., 'machine:command:go', True)
+        for sm in self.slaves:
+            for t in sm.timers:
+                t.join()
+
+        axes = [self.m.driver] + [sm.axis for sm in self.slaves]
+        times = [d.set_times['command:go'] for d in axes]
+        assert max(times) - min(times) < 0.005
+        assert all(d.read_fake_data('command', 'go') for d in axes)
+
+    def test_slave_values(self):
+        self.m.config.add_section('slave_0001')
+        self.m.config.set('slave_0001', 'velocity_ref_mode', 'multiply')
+        self.m.config.set('slave_0001', 'velocity_ref_value', '2')
+        # No value configured, the master value is sent
+        self.m.config.add_section('slave_0002')
+        self.m.config.set('slave_0002', 'velocity_ref_mode', 'multiply')
+
+        self.m.sync_set('machine:velocity_ref', 10.)
+        for sm in self.slaves:
+            for t in sm.timers:
+                t.join()
+
+        assert [sm.armed for sm in self.slaves] == [
+            [('velocity_ref', 20.)],
+            [('velocity_ref', 10.)],
+            [('velocity_ref', 10.)],
+        ]
+        assert self.m.driver.set_times['velocity_ref']
+
+
+class Test_SyncBarrier(object):
+    def test_errors(self):
+        barrier = SyncBarrier(timeout=0.05)
+        with pytest.raises(MachineError):
+            barrier.release('token')
+
+        barrier.arm('old', lambda: None)
+        assert 'old' in barrier
+        time.sleep(0.1)
+        barrier.arm('new', lambda: None)
+        assert 'old' not in barrier
+        assert len(barrier) == 1
+
+        assert barrier.cancel('new')
+        assert not barrier.cancel('new')
+
+
+class Test_SlaveSyncCommands(object):
+    class FakeMachine(object):
+        slave_mode = True
+
+        def __init__(self):
+            self.sync_barrier = SyncBarrier()
+            self.sets = []
+
+        def set(self, key, value, tick=False):
+            self.sets.append((key, value, time.monotonic()))
+            return value
+
+    def setup_method(self, method):
+        self.machine = self.FakeMachine()
+        OscCommand.machine = self.machine
+        self.replies = []
+
+        @coroutine
+        def outlet(identifier):
+            while True:
+                self.replies.append((yield).path)
+
+        self.processor = OscProcessor(outlet)
+        self.processor.start()
+
+    def teardown_method(self, method):
+        self.processor.exit()
+        OscCommand.machine = None
+
+    def execute(self, path, *args):
+        self.processor.execute(OscMessage(
+            path, *args, sender=OscAddress(hostname='127.0.0.1')))
+
+    def test_release_lane(self):
+        self.execute('/slave/sync/arm', 'uuid', 'tk', 'machine:command:go', 1)
+        assert self.replies == ['/slave/sync/arm/ok']
+
+        released_at = time.monotonic() + 0.2
+        self.execute('/slave/sync/release', 'uuid', 'tk', 0.2)
+        self.execute('/slave/set', 'uuid', 'machine:velocity_ref', 10.)
+        time.sleep(0.05)
+        self.execute('/slave/set', 'uuid', 'machine:command:stop', True)
+        time.sleep(0.05)
+
+        # Neither cancelled nor delayed by the release wait
+        assert [k for k, v, t in self.machine.sets] == \
+            ['machine:velocity_ref', 'machine:command:stop']
+        assert '/slave/set/error' not in self.replies
+
+        time.sleep(0.25)
+        key, value, t = self.machine.sets[-1]
+        assert key == 'machine:command:go'
+        assert t >= released_at
+        assert self.replies[-1] == '/slave/sync/release/ok'
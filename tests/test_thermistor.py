@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ertza.thermistor import ADCSampler, Thermistor
+
+
+class Test_Thermistor(object):
+    def setup_class(self):
+        self.th = Thermistor(0, 'TH0')
+
+    def test_resistance_to_degrees(self):
+        assert self.th.resistance_to_degrees(10000) == 25.
+        assert self.th.resistance_to_degrees(12487.744) == 20.
+        assert self.th.resistance_to_degrees(
+            (10000 + 10448.923) / 2) == pytest.approx(24.5)
+
+        # Out of the chart
+        assert self.th.resistance_to_degrees(30000) == 10.
+        assert self.th.resistance_to_degrees(100) == 150.
+
+        with pytest.raises(ValueError):
+            self.th.resistance_to_degrees(250000)
+
+    def test_lut(self):
+        lut = Thermistor.lut()
+        assert len(lut) == 4096
+        assert Thermistor.lut() is lut
+
+        for raw in range(0, 4096, 7):
+            try:
+                assert lut[raw] == self.th.raw_to_degrees(raw)
+            except ValueError:
+                assert lut[raw] is None
+
+        assert self.th.degrees(2000) == lut[2000]
+        with pytest.raises(ValueError):
+            self.th.degrees(0)
+
+
+class Test_ADCSampler(object):
+    def test_sampler(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(ADCSampler, 'channel_path', staticmethod(
+            lambda channel: str(tmpdir.join('in_voltage{}_raw'.format(channel)))))
+
+        tmpdir.join('in_voltage0_raw').write('2000\n')
+        sampler = ADCSampler([0, 1, 0], interval=60, oversampling=3)
+        sampler.start()
+        try:
+            assert sampler.channels == [0, 1]
+            assert sampler.values == {0: 2000}
+
+            th = Thermistor(0, 'TH0', sampler)
+            assert th.temperature == Thermistor.lut()[2000]
+            assert Thermistor(1, 'TH1', sampler).temperature == -1.
+
+            # Files are kept open and read again
+            tmpdir.join('in_voltage0_raw').write('3000\n')
+            sampler.sample()
+            assert th.temperature == Thermistor.lut()[3000]
+        finally:
+            sampler.stop()
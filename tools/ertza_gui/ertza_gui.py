@@ -141,11 +141,36 @@ class ErtzaOSCServer(lo.ServerThread):
 
 class ErtzaActions(object):
     REFRESH_VALUES = ('disable', '500 ms', '1 s', '2 s', '5 s')
+    REFRESH_PERIODS = (None, .5, 1., 2., 5.)
+    SUBSCRIPTION_RENEW = 4
+
+    STATUS_KEYS = (
+        'machine:status:drive_ready', 'machine:status:drive_enable',
+        'machine:status:drive_input', 'machine:status:motor_brake',
+        'machine:status:motor_temp', 'machine:status:timeout',
+
+        'machine:error_code', 'machine:jog',
+        'machine:torque_ref', 'machine:velocity_ref',
+        'machine:torque_rise_time', 'machine:torque_fall_time',
+        'machine:acceleration', 'machine:deceleration',
+        'machine:entq_kp', 'machine:entq_kp_vel',
+        'machine:entq_ki', 'machine:entq_kd',
+
+        'machine:velocity', 'machine:position',
+        'machine:position_target', 'machine:position_remaining',
+        'machine:encoder_ticks', 'machine:encoder_velocity',
+        'machine:velocity_error', 'machine:follow_error',
+        'machine:torque', 'machine:current_ratio',
+        'machine:effort',
+
+        'machine:drive_temp', 'machine:dropped_frames',
+    )
 
     def __init__(self, master):
         self.master = master
         self.connected = False
         self.osc_server = None
+        self.status_timer = None
 
         self.status = OrderedDictTrigger()
         self.profile_options = OrderedDictTrigger()
@@ -173,6 +198,11 @@ class ErtzaActions(object):
             # Ignore identify requests
             return
 
+        if '/machine/subscribe/reply' in path:
+            for k, v in zip(args[::2], args[1::2]):
+                self.status[k] = v
+            return
+
         if '/ok' in path:
             if self.config_get('debug', False):
                 a = ' '.join(map(repr, args))
@@ -268,30 +298,29 @@ class ErtzaActions(object):
         self.send('/version')
 
     def request_status(self):
-        st = (
-            'machine:status:drive_ready', 'machine:status:drive_enable',
-            'machine:status:drive_input', 'machine:status:motor_brake',
-            'machine:status:motor_temp', 'machine:status:timeout',
-
-            'machine:error_code', 'machine:jog',
-            'machine:torque_ref', 'machine:velocity_ref',
-            'machine:torque_rise_time', 'machine:torque_fall_time',
-            'machine:acceleration', 'machine:deceleration',
-            'machine:entq_kp', 'machine:entq_kp_vel',
-            'machine:entq_ki', 'machine:entq_kd',
-
-            'machine:velocity', 'machine:position',
-            'machine:position_target', 'machine:position_remaining',
-            'machine:encoder_ticks', 'machine:encoder_velocity',
-            'machine:velocity_error', 'machine:follow_error',
-            'machine:torque', 'machine:current_ratio',
-            'machine:effort',
-
-            'machine:drive_temp', 'machine:dropped_frames',
-        )
-        for s in st:
+        for s in self.STATUS_KEYS:
             self.send('/machine/get', s)
 
+    def set_status_refresh_interval(self, index):
+        self._config['status_refresh_interval'] = index
+        if self.status_timer is not None:
+            self.status_timer.stop()
+            self.status_timer = None
+
+        if not index:
+            self.send('/machine/unsubscribe')
+            return
+
+        rate = 1. / self.REFRESH_PERIODS[index]
+        subscribe = functools.partial(self.send, '/machine/subscribe',
+                                      *(self.STATUS_KEYS + (rate,)))
+        subscribe()
+
+        # Renew the subscription before it expires on the machine
+        self.status_timer = QtCore.QTimer()
+        self.status_timer.timeout.connect(subscribe)
+        self.status_timer.start(self.SUBSCRIPTION_RENEW * 1000)
+
     def drive_cancel(self):
         self.send('/debug/drive/drive_cancel', 1)
 
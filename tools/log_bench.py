@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the per-message overhead of debug logging in hot paths.
+
+Compares, with the debug level enabled and disabled:
+  * eager: logging.debug('Received %s from %s' % (m, m.sender))
+  * event: events.debug('received', sender=m.sender, message=m)
+  * none: no logging at all
+
+Usage: log_bench.py [-n MESSAGES]
+"""
+
+import sys
+import os
+import timeit
+import logging
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ertza.events import EventLogger
+from ertza.processors.osc.message import OscMessage, OscAddress
+
+logger = logging.getLogger('bench')
+events = EventLogger('bench')
+
+
+def eager(m):
+    logger.debug('Received %s from %s' % (m, m.sender))
+
+
+def event(m):
+    events.debug('received', sender=m.sender, message=m)
+
+
+def none(m):
+    pass
+
+
+def bench(n):
+    m = OscMessage('/machine/get', 'velocity',
+                   sender=OscAddress(hostname='10.0.0.1', port=6969))
+    results = {}
+    for name, f in (('none', none), ('eager', eager), ('event', event)):
+        t = min(timeit.repeat(lambda: f(m), number=n, repeat=5))
+        results[name] = t / n * 1e9
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=100000)
+    args = parser.parse_args()
+
+    logging.basicConfig(stream=open(os.devnull, 'w'))
+
+    for level in (logging.INFO, logging.DEBUG):
+        logger.setLevel(level)
+        results = bench(args.n)
+        print('Debug {}:'.format('on' if level == logging.DEBUG else 'off'))
+        for name in ('none', 'eager', 'event'):
+            print('  {:<6} {:8.0f} ns/message'.format(name, results[name]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark ertza OSC servers on loopback.
+
+For each backend (liblo and asyncio), measures:
+  * throughput: messages/s decoded and handed to the outlet while a client
+    floods /machine/get requests
+  * latency: round trip of a request answered directly from the outlet
+
+Usage: osc_bench.py [-n MESSAGES] [-b liblo|asyncio]
+"""
+
+import sys
+import os
+import time
+import socket
+import argparse
+from threading import Event
+from multiprocessing import Process
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ertza.async_utils import coroutine
+from ertza.processors.osc.codec import encode_message, decode_message
+from ertza.processors.osc.message import OscMessage
+
+LISTEN_PORT = 17969
+REPLY_PORT = 17970
+
+
+class _Config(dict):
+    def get(self, key, fallback=None):
+        return dict.get(self, key, fallback)
+
+
+def get_server_class(backend):
+    if backend == 'asyncio':
+        from ertza.processors.osc.aioserver import AsyncOscServer
+        return AsyncOscServer
+    from ertza.processors.osc.server import OscServer
+    return OscServer
+
+
+def _flood(packet, target, count):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for i in range(count):
+        sock.sendto(packet, target)
+    sock.close()
+
+
+def bench(backend, count):
+    state = {'received': 0, 'echo': False, 'first': 0, 'last': 0}
+    done = Event()
+    server_ref = []
+
+    @coroutine
+    def outlet(name):
+        while True:
+            m = (yield)
+            if state['echo']:
+                server_ref[0].send_message(
+                    OscMessage('/bench/ok', *m.args,
+                               receiver=m.sender))
+                continue
+            now = time.perf_counter()
+            if not state['received']:
+                state['first'] = now
+            state['last'] = now
+            state['received'] += 1
+            if state['received'] >= count:
+                done.set()
+
+    # Admission control would rate limit the flood
+    conf = _Config(listen_port=LISTEN_PORT, reply_port=REPLY_PORT,
+                   rate_limit=0)
+    server = get_server_class(backend)(outlet, conf)
+    server_ref.append(server)
+    server.start()
+
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+    client.bind(('127.0.0.1', REPLY_PORT))
+    client.settimeout(1)
+    time.sleep(0.2)
+    while True:     # Flush the /alive broadcast if any
+        try:
+            client.setblocking(False)
+            client.recv(4096)
+        except (BlockingIOError, socket.timeout):
+            break
+    client.settimeout(1)
+
+    packet = encode_message('/machine/get', ('velocity',))
+    target = ('127.0.0.1', LISTEN_PORT)
+
+    # Throughput: flood from another process so the client doesn't compete
+    # with the server for the GIL. Packets dropped by the kernel when the
+    # server can't keep up are not counted: rate is measured between the
+    # first and the last message handed to the outlet.
+    flooder = Process(target=_flood, args=(packet, target, count))
+    flooder.start()
+    flooder.join()
+    done.wait(2)
+    received = state['received']
+    elapsed = state['last'] - state['first']
+    rate = (received - 1) / elapsed if elapsed else float('nan')
+
+    # Latency: ping-pong
+    state['echo'] = True
+    samples = []
+    for i in range(min(count, 2000)):
+        t0 = time.perf_counter()
+        client.sendto(encode_message('/bench', (i,)), target)
+        try:
+            data = client.recv(4096)
+        except socket.timeout:
+            continue
+        samples.append(time.perf_counter() - t0)
+        decode_message(data)
+
+    server.close()
+    client.close()
+
+    samples.sort()
+    med = samples[len(samples) // 2] * 1e6 if samples else float('nan')
+    p99 = samples[int(len(samples) * 0.99)] * 1e6 if samples else float('nan')
+    print('{:8s} {:>10.0f} msg/s   latency median {:>7.1f} us  p99 {:>7.1f} us '
+          '({} msgs received, {} round trips)'.format(
+              backend, rate, med, p99, received, len(samples)))
+
+
+def _run(backend, count):
+    try:
+        bench(backend, count)
+    except ImportError as e:
+        print('{:8s} skipped: {!s}'.format(backend, e))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='osc_bench')
+    parser.add_argument('-n', type=int, default=20000, help='number of messages')
+    parser.add_argument('-b', '--backend', action='append',
+                        choices=('liblo', 'asyncio'))
+    args = parser.parse_args()
+
+    # One process per backend, liblo only frees its port on exit
+    for backend in args.backend or ('liblo', 'asyncio'):
+        p = Process(target=_run, args=(backend, args.n))
+        p.start()
+        p.join()
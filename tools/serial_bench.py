@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark serial framing over a pty pair.
+
+Writes bursts of frames on the master side of a pty and splits what is
+read on the slave side, with SerialFramer and with the former bytes
+concatenation and recursive framer.
+
+Usage: serial_bench.py [-n FRAMES] [-b BURST]
+"""
+
+import sys
+import os
+import time
+import tty
+import argparse
+from threading import Thread
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ertza.processors.serial.framer import SerialFramer
+from ertza.processors.serial.message import SerialCommandString
+
+CMD_END = SerialCommandString.CmdEnd
+
+
+class ConcatFramer(object):
+    """
+    Former framer of SerialServer.
+    """
+
+    def __init__(self):
+        self.data_buffer = b''
+
+    def feed(self, data):
+        self.data_buffer += data
+        frames = []
+        self.find_serial_packets(frames)
+        return frames
+
+    def find_serial_packets(self, frames):
+        pos = self.data_buffer.find(CMD_END)
+        if pos >= 0:
+            packet, self.data_buffer = self.data_buffer[:pos+2], \
+                self.data_buffer[pos+2:]
+            frames.append(packet)
+            self.find_serial_packets(frames)
+
+
+def frame():
+    s = SerialCommandString()
+    s += 'machine.set:velocity_ref'
+    s += 1500.
+    return s.tobytes
+
+
+def writer(fd, data, burst):
+    step = len(frame()) * burst
+    for i in range(0, len(data), step):
+        os.write(fd, data[i:i + step])
+
+
+def bench(framer, n, burst):
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    data = frame() * n
+
+    t = Thread(target=writer, args=(master, data, burst))
+    start = time.perf_counter()
+    t.start()
+
+    count = 0
+    while count < n:
+        count += len(framer.feed(os.read(slave, 4096)))
+    duration = time.perf_counter() - start
+
+    t.join()
+    os.close(master)
+    os.close(slave)
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=50000)
+    parser.add_argument('-b', '--burst', type=int, default=64,
+                        help='frames written at once')
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), args.burst * 4))
+    for name, framer in (('bytearray', SerialFramer()),
+                         ('concat', ConcatFramer())):
+        duration = bench(framer, args.n, args.burst)
+        print('{:<10} {:10.0f} frames/s'.format(name, args.n / duration))
+
+
+if __name__ == '__main__':
+    main()